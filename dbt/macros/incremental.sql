@@ -0,0 +1,37 @@
+{#
+    Restrict the raw files read by an incremental model to the seasons that need refreshing.
+
+    On full refreshes (and on the first run of a model) all seasons are read. On incremental runs
+    only the seasons listed in the `incremental_seasons` var are read or, if the var is not set,
+    the latest season that is already in the model, which is the only one that changes between
+    regular runs. Reprocessed rows replace existing ones with the same unique key.
+
+    To refresh an older season without rebuilding everything, pass it explicitly
+        dbt build --vars '{"incremental_seasons": [2023, 2024]}'
+
+    An empty list means no season changed, so no raw rows are read. `make prepare_local` sets the
+    var to the seasons whose raw files changed since the last build, as recorded in the raw data
+    manifest (see transfermarkt_datasets/core/manifest.py).
+
+    Arguments:
+      - season_expression: the expression that holds the season of a raw row.
+      - season_column: the model column that holds the season in the already built model.
+#}
+{% macro incremental_season_filter(season_expression, season_column='season') %}
+
+  {% if is_incremental() %}
+    {% set seasons = var('incremental_seasons', none) %}
+    {% if seasons is not none and seasons | length == 0 %}
+      and false
+    {% elif seasons %}
+      and {{ season_expression }} in (
+        {%- for season in seasons -%}
+          '{{ season }}'{% if not loop.last %}, {% endif %}
+        {%- endfor -%}
+      )
+    {% else %}
+      and {{ season_expression }} >= (select max({{ season_column }}) from {{ this }})
+    {% endif %}
+  {% endif %}
+
+{% endmacro %}
@@ -1,5 +1,11 @@
 {#
-    Export a model to the prep folder in a CSV format.
+    Export a model to the prep folder in CSV and Parquet formats.
+
+    The gzipped CSV is kept as the canonical, portable export. The Parquet
+    file carries typed, compressed row groups so that readers can skip the
+    parsing and type inference steps and push predicates down to the scan.
+    The column statistics of the model are written next to them, so that
+    readers can get row counts, value ranges and samples without a scan.
 
     Arguments:
       - relation: the model to be exported.
@@ -10,11 +16,50 @@
   {{ log(model_config) }}
 
   {% if model_config.enabled %}
-      {% call statement(name, fetch_result=True) %}
+      {% call statement('export_csv', fetch_result=True) %}
         COPY {{ relation }} TO '../data/prep/{{ model.name }}.csv.gz' (HEADER, DELIMITER ',', COMPRESSION gzip)
       {% endcall %}
+      {% call statement('export_parquet', fetch_result=True) %}
+        COPY {{ relation }} TO '../data/prep/{{ model.name }}.parquet' (FORMAT PARQUET, COMPRESSION zstd, ROW_GROUP_SIZE 122880)
+      {% endcall %}
+      {% call statement('export_stats', fetch_result=True) %}
+        COPY ({{ column_stats_query(relation) }}) TO '../data/prep/{{ model.name }}.stats.json' (FORMAT JSON)
+      {% endcall %}
   {% else %}
       SELECT 1
   {% endif %}
 
 {% endmacro %}
+
+{#
+    Summarize every column of a relation in one row: row count, null count,
+    min and max values, approximate distinct count and a few sample values.
+    Must be kept in sync with `stats_query` in transfermarkt_datasets/core/stats.py.
+
+    Arguments:
+      - relation: the relation to be summarized.
+      - sample_size: the number of sample values kept for each column.
+#}
+{% macro column_stats_query(relation, sample_size=3) %}
+
+  SELECT * EXCLUDE (position) FROM (
+  {% for column in adapter.get_columns_in_relation(relation) %}
+    SELECT
+      {{ loop.index0 }} AS position,
+      '{{ column.name }}' AS "column",
+      '{{ column.dtype }}' AS "type",
+      count(*) AS "rows",
+      count(*) - count("{{ column.name }}") AS "nulls",
+      CAST(min("{{ column.name }}") AS VARCHAR) AS "min",
+      CAST(max("{{ column.name }}") AS VARCHAR) AS "max",
+      least(approx_count_distinct("{{ column.name }}"), count("{{ column.name }}")) AS "distinct",
+      (
+        SELECT list(CAST(value AS VARCHAR))
+        FROM (SELECT DISTINCT "{{ column.name }}" AS value FROM {{ relation }} WHERE "{{ column.name }}" IS NOT NULL LIMIT {{ sample_size }})
+      ) AS "sample_values"
+    FROM {{ relation }}
+    {% if not loop.last %}UNION ALL{% endif %}
+  {% endfor %}
+  ) ORDER BY position
+
+{% endmacro %}
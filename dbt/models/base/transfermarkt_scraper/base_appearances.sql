@@ -1,47 +1,53 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = 'appearance_id',
+    incremental_strategy = 'delete+insert'
+    )
+}}
 with
     json_appearances as (
 
-        select json(value) as json_row from {{ source("transfermarkt_scraper", "appearances") }}
+        select
+            *,
+            str_split(filename, '/')[5] as season
+
+        from {{ source("transfermarkt_scraper", "appearances") }}
+
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]") }}
 
     ),
     all_appearances as (
         
         select
 
-            (str_split(json_extract_string(json_row, '$.href'), '/')[5])::integer
-            as player_id,
-            coalesce(
-                (
-                    str_split(json_extract_string(json_row, '$.result.href'), '/')[5]
-                )::integer,
-                -1
-            ) as game_id,
+            (str_split(href, '/')[5])::integer as player_id,
+            coalesce((str_split(result.href, '/')[5])::integer, -1) as game_id,
             (game_id || '_' || player_id) as appearance_id,
-            json_extract_string(json_row, '$.competition_code') as competition_id,
-            (str_split(json_extract_string(json_row, '$.for.href'), '/')[5])::integer
-            as player_club_id,
+            season,
+            competition_code as competition_id,
+            (str_split("for".href, '/')[5])::integer as player_club_id,
             case
-                when len(json_extract_string(json_row, '$.goals')) = 0
+                when len(goals) = 0
                 then 0
-                else json_extract_string(json_row, '$.goals')::integer
+                else goals::integer
             end as goals,
             case
-                when len(json_extract_string(json_row, '$.assists')) = 0
+                when len(assists) = 0
                 then 0
-                else json_extract_string(json_row, '$.assists')::integer
+                else assists::integer
             end as assists,
             case
-                when len(json_extract_string(json_row, '$.minutes_played')) = 0
+                when len(minutes_played) = 0
                 then 0
-                else (json_extract_string(json_row, '$.minutes_played')[:-1])::integer
+                else (minutes_played[:-1])::integer
             end as minutes_played,
             (
-                (len(json_extract_string(json_row, '$.yellow_cards')) > 0)::integer + (
-                    len(json_extract_string(json_row, '$.second_yellow_cards')) > 0
-                )::integer
+                (len(yellow_cards) > 0)::integer
+                + (len(second_yellow_cards) > 0)::integer
             ) as yellow_cards,
             case
-                when len(json_extract_string(json_row, '$.red_cards')) > 0 then 1 else 0
+                when len(red_cards) > 0 then 1 else 0
             end as red_cards
 
         from json_appearances
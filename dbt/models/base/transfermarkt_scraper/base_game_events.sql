@@ -1,20 +1,30 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = 'game_id',
+    incremental_strategy = 'delete+insert'
+    )
+}}
 with
     json_game_events as (
 
         select
-            json(value) as json_row,
+            events,
             str_split(filename, '/')[5] as season,
-            (str_split(json_extract_string(json_row, '$.href'), '/')[5]) as game_id,
+            (str_split(href, '/')[5]) as game_id,
             row_number() over (partition by game_id order by season desc) as n
             
         from {{ source("transfermarkt_scraper", "games") }}
 
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]") }}
+
     ),
 unnested as (
 
     select
-        unnest(json_transform(json_extract(json_row, '$.events'), '["JSON"]')) as json_row,
-        game_id
+        unnest(events) as game_event,
+        game_id,
+        season
     from json_game_events
 
     where n = 1
@@ -23,13 +33,14 @@ unnested as (
 
 select distinct
     game_id,
-    (json_row -> 'minute')::integer as "minute",
-    (json_row ->> 'type') as "type",
-    str_split(json_row -> 'club' ->> 'href', '/')[5]::integer as club_id,
-    str_split(json_row -> 'player' ->> 'href', '/')[5]::integer as player_id,
-    (json_row -> 'action' ->> 'description') as description,
-    str_split(json_row -> 'action' -> 'player_in' ->> 'href', '/')[5]::integer as player_in_id,
-    str_split(json_row -> 'action' -> 'player_assist' ->> 'href', '/')[5]::integer as player_assist_id
+    (game_event."minute")::integer as "minute",
+    game_event."type" as "type",
+    str_split(game_event.club.href, '/')[5]::integer as club_id,
+    str_split(game_event.player.href, '/')[5]::integer as player_id,
+    game_event."action".description as description,
+    str_split(game_event."action".player_in.href, '/')[5]::integer as player_in_id,
+    str_split(game_event."action".player_assist.href, '/')[5]::integer as player_assist_id,
+    season
 
 from unnested
 
@@ -1,22 +1,33 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = 'game_id',
+    incremental_strategy = 'delete+insert'
+    )
+}}
 with
     json_game_lineups as (
 
         select
-            json(value) as raw_json_row,
+            home_club,
+            away_club,
             str_split(filename, '/')[5] as season,
-            json_extract_string(raw_json_row, '$.game_id')::integer as game_id,
+            game_id::integer as game_id,
             row_number() over (partition by game_id order by season desc) as n
 
         from {{ source("transfermarkt_scraper", "game_lineups") }}
-        
+
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]") }}
+
     ),
     home_club_starting_lineup as (
 
         select
-            unnest(json_transform(json_extract(raw_json_row, '$.home_club.starting_lineup'), '["JSON"]')) as json_row,
-            (str_split(json_extract_string(raw_json_row, '$.home_club.href'), '/')[5])::integer as club_id,
+            unnest(home_club.starting_lineup) as player,
+            (str_split(home_club.href, '/')[5])::integer as club_id,
             'starting_lineup' as "type",
-            game_id
+            game_id,
+            season
         from json_game_lineups
 
         where n = 1
@@ -25,10 +36,11 @@ with
     home_club_substitutes as (
 
         select
-            unnest(json_transform(json_extract(raw_json_row, '$.home_club.substitutes'), '["JSON"]')) as json_row,
-            (str_split(json_extract_string(raw_json_row, '$.home_club.href'), '/')[5])::integer as club_id,
+            unnest(home_club.substitutes) as player,
+            (str_split(home_club.href, '/')[5])::integer as club_id,
             'substitutes' as "type",
-            game_id
+            game_id,
+            season
         from json_game_lineups
 
         where n = 1
@@ -37,10 +49,11 @@ with
     away_club_starting_lineup as (
 
         select
-            unnest(json_transform(json_extract(raw_json_row, '$.away_club.starting_lineup'), '["JSON"]')) as json_row,
-            (str_split(json_extract_string(raw_json_row, '$.away_club.href'), '/')[5])::integer as club_id,
+            unnest(away_club.starting_lineup) as player,
+            (str_split(away_club.href, '/')[5])::integer as club_id,
             'starting_lineup' as "type",
-            game_id
+            game_id,
+            season
         from json_game_lineups
 
         where n = 1
@@ -49,10 +62,11 @@ with
     away_club_substitutes as (
 
         select
-            unnest(json_transform(json_extract(raw_json_row, '$.away_club.substitutes'), '["JSON"]')) as json_row,
-            (str_split(json_extract_string(raw_json_row, '$.away_club.href'), '/')[5])::integer as club_id,
+            unnest(away_club.substitutes) as player,
+            (str_split(away_club.href, '/')[5])::integer as club_id,
             'substitutes' as "type",
-            game_id
+            game_id,
+            season
         from json_game_lineups
 
         where n = 1
@@ -74,10 +88,11 @@ select
     game_id,
     club_id,
     "type",
-    (json_row ->> 'number') as "number",
-    (str_split((json_row ->> 'href'), '/')[5])::integer as player_id,
-    (json_row ->> 'name') as "player_name",
-    (json_row ->> 'team_captain')::integer as "team_captain",
-    (json_row ->> 'position') as "position",
+    player."number" as "number",
+    (str_split(player.href, '/')[5])::integer as player_id,
+    player."name" as "player_name",
+    (player.team_captain)::integer as "team_captain",
+    player."position" as "position",
+    season,
 
 from all_game_lineups
@@ -1,27 +1,38 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = 'game_id',
+    incremental_strategy = 'delete+insert'
+    )
+}}
 with
     json_game_lineups as (
 
         select
-            json(value) as json_row,
             str_split(filename, '/')[5] as season,
-            json_extract_string(json_row, '$.game_id') as game_id,
-            json_extract_string(json_row, '$.home_club.formation') as home_club_formation,
-            json_extract_string(json_row, '$.away_club.formation') as away_club_formation,
+            game_id,
+            home_club.formation as home_club_formation,
+            away_club.formation as away_club_formation,
             row_number() over (partition by game_id order by season desc) as n
 
         from {{ source("transfermarkt_scraper", "game_lineups") }}
 
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]") }}
+
     ),
     json_raw_games as (
 
         select
-            json(value) as json_row,
+            * exclude ("date"),
+            "date" as date_str,
             str_split(filename, '/')[5] as season,
-            (str_split(json_extract_string(json_row, '$.href'), '/')[5]) as game_id,
+            (str_split(href, '/')[5]) as game_id,
             row_number() over (partition by game_id order by season desc) as n
 
         from {{ source("transfermarkt_scraper", "games") }}
 
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]") }}
+
     ),
     json_games as (
 
@@ -39,47 +50,44 @@ with
 
 select
     game_id,
-    (str_split(json_extract_string(json_row, '$.parent.href'), '/')[5]) as competition_id,
+    (str_split(parent.href, '/')[5]) as competition_id,
     season,
-    json_extract_string(json_row, '$.matchday') as round,
+    matchday as round,
     case
-        when json_extract_string(json_row, '$.date') != 'null' then
-        strptime(json_extract_string(json_row, '$.date'), '%a, %m/%d/%y')::date
+        when date_str != 'null' then
+        strptime(date_str, '%a, %m/%d/%y')::date
         else null
     end as date,
-    (str_split(json_extract_string(json_row, '$.home_club.href'), '/')[5])::integer as home_club_id,
-    (str_split(json_extract_string(json_row, '$.away_club.href'), '/')[5])::integer
-    as away_club_id,
+    (str_split(home_club.href, '/')[5])::integer as home_club_id,
+    (str_split(away_club.href, '/')[5])::integer as away_club_id,
     case
-        when (json_row ->> 'result') != '-:-'
-        then (str_split(json_row ->> 'result', ':')[1])::integer 
+        when result != '-:-'
+        then (str_split(result, ':')[1])::integer 
     end as home_club_goals,
     case
-        when trim(json_row ->> 'result') != '-:-'
-        then (str_split(json_row ->> 'result', ':')[2])::integer
+        when trim(result) != '-:-'
+        then (str_split(result, ':')[2])::integer
     end as away_club_goals,
     case
         when
-            (json_extract_string(json_row, '$.home_club_position') = 'null')
-            or (json_extract_string(json_row, '$.home_club_position') = '')
+            (home_club_position = 'null')
+            or (home_club_position = '')
         then -1
-        else (str_split_regex(json_extract_string(json_row, '$.home_club_position'), '[\s]+'))[2]::integer
+        else (str_split_regex(home_club_position, '[\s]+'))[2]::integer
     end as home_club_position,
     case
         when
-            (json_extract_string(json_row, '$.away_club_position') = 'null')
-            or (json_extract_string(json_row, '$.away_club_position') = '')
+            (away_club_position = 'null')
+            or (away_club_position = '')
         then -1
-        else regexp_extract(json_extract_string(json_row, '$.away_club_position'), '\s([0-9]+)')::integer
+        else regexp_extract(away_club_position, '\s([0-9]+)')::integer
     end as away_club_position,
-    json_extract_string(json_row, '$.home_manager.name') as home_club_manager_name,
-    json_extract_string(json_row, '$.away_manager.name') as away_club_manager_name,
-    json_extract_string(json_row, '$.stadium') as stadium,
-    replace(str_split(json_row ->> 'attendance', 'Attendance: ')[2], '.', '')::integer as attendance,
-    json_extract_string(json_row, '$.referee') as referee,
-    (
-        'https://www.transfermarkt.co.uk' || json_extract_string(json_row, '$.href')
-    ) as url,
+    home_manager."name" as home_club_manager_name,
+    away_manager."name" as away_club_manager_name,
+    stadium,
+    replace(str_split(attendance, 'Attendance: ')[2], '.', '')::integer as attendance,
+    referee,
+    ('https://www.transfermarkt.co.uk' || href) as url,
     home_club_formation,
     away_club_formation
 
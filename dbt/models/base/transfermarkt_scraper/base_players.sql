@@ -1,53 +1,63 @@
+{{
+  config(
+    materialized = 'incremental',
+    unique_key = 'player_id',
+    incremental_strategy = 'delete+insert'
+    )
+}}
 with
     json_players as (
 
         select
+            * exclude ("name", last_name),
+            "name" as first_name_str,
+            last_name as last_name_str,
             str_split(filename, '/')[5] as season,
-            json(value) as json_row,
-            (str_split(json_extract_string(json_row, '$.href'), '/')[5])::integer as player_id,
+            (str_split(href, '/')[5])::integer as player_id,
             row_number() over (partition by player_id order by season desc) as n
         
         from {{ source("transfermarkt_scraper", "players") }}
-        
+
+        where true {{ incremental_season_filter("str_split(filename, '/')[5]", "last_season") }}
 
     )
 
 select
     player_id,
     case
-        when len(trim(json_extract_string(json_row, '$.name'))) = 0
+        when len(trim(first_name_str)) = 0
         then null
-        else trim(json_extract_string(json_row, '$.name'))
+        else trim(first_name_str)
     end as first_name,
     case
-        when len(trim(json_extract_string(json_row, '$.last_name'))) = 0
+        when len(trim(last_name_str)) = 0
         then null
-        else trim(json_extract_string(json_row, '$.last_name'))
+        else trim(last_name_str)
     end as last_name,
     trim(coalesce(first_name, '') || ' ' || coalesce(last_name, '')) as name,
     season as last_season,
     coalesce(
-        str_split(json_extract_string(json_row, '$.parent.href'), '/')[5], -1
+        str_split(parent.href, '/')[5], -1
     ) as current_club_id,
-    json_extract_string(json_row, '$.code') as player_code,
-    trim(json_extract_string(json_row, '$.place_of_birth.country')) as country_of_birth,
-    trim(json_extract_string(json_row, '$.place_of_birth.city')) as city_of_birth,
-    trim(json_extract_string(json_row, '$.citizenship')) as country_of_citizenship,
+    code as player_code,
+    trim(place_of_birth.country) as country_of_birth,
+    trim(place_of_birth.city) as city_of_birth,
+    trim(citizenship) as country_of_citizenship,
 
     case
-        when json_extract_string(json_row, '$.date_of_birth') not in ('N/A', 'null', '')
+        when date_of_birth not in ('N/A', 'null', '')
         then 
             case
-                when length(json_extract_string(json_row, '$.date_of_birth')) = 4
-                then cast(json_extract_string(json_row, '$.date_of_birth') || '-01-01' as date)  -- Assume first day of the year if only year is given
-                else strptime(json_extract_string(json_row, '$.date_of_birth'), '%b %d, %Y')  -- Handles full date like "Jan 01, 2000"
+                when length(date_of_birth) = 4
+                then cast(date_of_birth || '-01-01' as date)  -- Assume first day of the year if only year is given
+                else strptime(date_of_birth, '%b %d, %Y')  -- Handles full date like "Jan 01, 2000"
             end
         else null
     end as date_of_birth,
     
     case
-        when json_extract_string(json_row, '$.position') = 'Goalkeeper' then 'Goalkeeper'
-        else str_split(json_extract_string(json_row, '$.position'), ' - ')[2]
+        when "position" = 'Goalkeeper' then 'Goalkeeper'
+        else str_split("position", ' - ')[2]
     end as sub_position,
     case
         when
@@ -78,18 +88,18 @@ select
         else 'Missing'
     end as position,
     case
-        when json_extract_string(json_row, '$.foot') in ('N/A', 'null')
+        when foot in ('N/A', 'null')
         then null
-        else json_extract_string(json_row, '$.foot')
+        else foot
     end as foot,
-    case when json_row ->> 'height' != 'null'
-    then trim(regexp_replace((json_row ->> 'height')[:4], '[,\s´]', ''))::integer
+    case when height != 'null'
+    then trim(regexp_replace((height)[:4], '[,\s´]', ''))::integer
     else null
     end as height_in_cm,
-    {{ parse_contract_expiration_date("json_row ->> 'contract_expires'")}} as contract_expiration_date,
-    json_row -> 'player_agent' ->> 'name' as agent_name,
-    json_extract_string(json_row, '$.image_url') as image_url,
-    'https://www.transfermarkt.co.uk' || json_extract_string(json_row, '$.href') as url
+    {{ parse_contract_expiration_date("contract_expires")}} as contract_expiration_date,
+    player_agent."name" as agent_name,
+    image_url as image_url,
+    'https://www.transfermarkt.co.uk' || href as url
 
 from json_players
 
@@ -21,7 +21,7 @@ select
         'player_assist_id'
     ]) }} as game_event_id,
     games_cte."date",
-    game_events_cte.* 
+    game_events_cte.* exclude (season)
 
 from game_events_cte
 
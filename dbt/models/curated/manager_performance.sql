@@ -0,0 +1,43 @@
+with club_games_cte as (
+
+    select * from {{ ref('club_games') }}
+
+),
+games_cte as (
+
+    select * from {{ ref('games') }}
+
+),
+clubs_cte as (
+
+    select * from {{ ref('clubs') }}
+
+)
+
+select
+    club_games_cte.club_id,
+    games_cte.season,
+    club_games_cte.own_manager_name,
+    games_cte.competition_type,
+    clubs_cte.name as club_name,
+    clubs_cte.domestic_competition_id as club_domestic_competition_id,
+    cast(count(*) as integer) as games,
+    cast(sum(club_games_cte.is_win) as integer) as wins
+
+from club_games_cte
+
+left join games_cte using(game_id)
+
+left join clubs_cte using(club_id)
+
+-- games without a known manager or competition type can not be attributed
+where club_games_cte.own_manager_name is not null
+    and games_cte.competition_type is not null
+
+group by
+    club_games_cte.club_id,
+    games_cte.season,
+    club_games_cte.own_manager_name,
+    games_cte.competition_type,
+    clubs_cte.name,
+    clubs_cte.domestic_competition_id
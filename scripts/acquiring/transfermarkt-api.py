@@ -3,21 +3,36 @@ https://www.transfermarkt.com/ceapi/marketValueDevelopment/graph/{player_id}
 https://www.transfermarkt.co.uk/ceapi/transferHistory/list/{player_id}
 
 Usage:
-    python transfermarkt-api.py --seasons=<seasons>
+    python transfermarkt-api.py --seasons=<seasons> [--concurrency=10] [--connections-per-host=5]
+        [--rate=20] [--max-retries=5] [--cache-dir=.cache/transfermarkt-api] [--cache-ttl=12]
+
+Market values and transfers are requested concurrently through a single pool of keep-alive
+connections. Requests are sent with a bounded concurrency and rate and retried with exponential backoff.
+Each distinct player is requested once across all seasons in the run, and responses are stored in
+a local cache (--cache-dir) from which the files of every season are written. An interrupted run
+can be resumed by running the same command again: players that are fresh in the cache (--cache-ttl)
+are not requested again.
 
 Note that the will look for the players asset from the transfermarkt-scraper acquirer under
     data/raw/transfermarkt-scraper/{season}/players.json.gz
 """
 
 import pathlib
-from typing import List
+from collections import Counter
+from typing import List, Tuple
 import json
 import gzip
 import argparse
 
 import aiohttp
 import asyncio
+import time
 
+from transfermarkt_datasets.core.fetch import (
+  Fetcher,
+  JsonLinesWriter,
+  ResponseCache
+)
 from transfermarkt_datasets.core.utils import (
   read_config,
   seasons_list
@@ -47,125 +62,269 @@ def get_player_ids(season: int) -> List[int]:
 
     players_asset_path = f"data/raw/transfermarkt-scraper/{season}/players.json.gz"
 
-    # read lines from a zipped file
+    # read lines from a zipped file, keeping only the ids
     with gzip.open(players_asset_path, mode="r") as z:
-        players = [json.loads(line) for line in z.readlines()]
-
-    player_ids = [
-        int(player["href"].split("/")[-1])
-        for player in players
-    ]
+        player_ids = [
+            int(json.loads(line)["href"].split("/")[-1])
+            for line in z
+        ]
     logging.info(f"Fetched {len(player_ids)} player ids from {players_asset_path}")
 
     return player_ids
 
-# helper function to fetch data from API
-async def fetch_data(session, url, player_id):
-    """Fetch data from the API for a given URL and player ID.
+def api_fetcher(concurrency: int, rate: float, max_retries: int) -> Fetcher:
+    """Get a fetcher for the API with the given limits.
 
     Args:
-        session (aiohttp.ClientSession): The aiohttp session
-        url (str): The API URL
-        player_id (int): The player ID
+        concurrency (int): Maximum number of requests in flight
+        rate (float): Maximum number of requests per second
+        max_retries (int): Retries for requests that fail with transient errors
 
     Returns:
-        dict: The API response and player ID
+        Fetcher: The fetcher
     """
-    headers = {
-        'Content-Type': 'application/json',
-        'User-Agent': USER_AGENT
-    }
+    return Fetcher(
+        concurrency=concurrency,
+        rate=rate,
+        max_retries=max_retries,
+        headers={
+            'Content-Type': 'application/json',
+            'User-Agent': USER_AGENT
+        }
+    )
+
+async def fetch_to_cache(
+    fetcher: Fetcher,
+    session: aiohttp.ClientSession,
+    cache: ResponseCache,
+    api_url: str,
+    player_ids: List[int],
+    progress: Counter) -> dict:
+    """Fetch data from the API for each player id that is not fresh in the cache, storing the
+    responses in the cache as they arrive.
+
+    Since responses are cached as soon as they arrive, an interrupted run resumes where it left off
+    when it is run again within the cache TTL.
 
-    async with session.get(url=url, headers=headers, ssl=False) as response:
-        try:
-            json = await response.json()
-            return {"response": json, "player_id": player_id}
-        except aiohttp.ContentTypeError as e:
-            logging.error(f"Failed to fetch data for player {player_id}: {e}")
-            return {"response": None, "player_id": player_id}
+    Args:
+        fetcher (Fetcher): The fetcher used for the requests
+        session (aiohttp.ClientSession): The session used for the requests
+        cache (ResponseCache): The response cache
+        api_url (str): The API URL, to which the player id is appended
+        player_ids (List[int]): List of player ids
+        progress (Counter): Counter of requests "pending" and "done", shared by all endpoints
+
+    Returns:
+        dict: Number of players fetched, failed and "cached" (not requested, as they were fresh in the cache)
+    """
+    requests = [
+        (player_id, api_url + str(player_id))
+        for player_id in player_ids
+        if not cache.is_fresh(api_url + str(player_id))
+    ]
+    progress["pending"] += len(requests)
+
+    def on_result(player_id, response):
+        cache.put(api_url + str(player_id), response)
+        progress["done"] += 1
+
+    stats = await fetcher.fetch_all(session, requests, on_result)
+
+    stats["cached"] = len(player_ids) - len(requests)
+
+    if stats["failed"] > 0:
+        logging.warning(f"Failed to fetch {stats['failed']} players from {api_url}, run again to retry them")
+
+    return stats
+
+async def report_progress(progress: Counter, started_at: float, interval: float = 30.0) -> None:
+    """Log the combined progress and throughput of all endpoints every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        elapsed = time.monotonic() - started_at
+        logging.info(
+            f"Fetched {progress['done']}/{progress['pending']} responses "
+            f"({progress['done'] / elapsed:.1f} responses/s)"
+        )
 
 # for each player id, get the market value data from the API
-async def get_market_values(player_ids: List[int]) -> List[dict]:
+async def get_market_values(
+    fetcher: Fetcher,
+    session: aiohttp.ClientSession,
+    cache: ResponseCache,
+    player_ids: List[int],
+    progress: Counter) -> dict:
     """Get the market value data from the API for each player id.
 
     Args:
+        fetcher (Fetcher): The fetcher used for the requests
+        session (aiohttp.ClientSession): The session used for the requests
+        cache (ResponseCache): The response cache
         player_ids (List[int]): List of player ids
+        progress (Counter): Counter of requests pending and done
 
     Returns:
-        List[dict]: List of dicts with market value data
+        dict: Number of players fetched, failed and cached
     """
 
     logging.info(f"Requesting market values for {len(player_ids)} players")
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_data(session, MARKET_VALUES_API + str(player_id), player_id) for player_id in player_ids]
-
-        # Use asyncio.gather to execute the tasks concurrently
-        responses = await asyncio.gather(*tasks)
-
-    return responses
+    return await fetch_to_cache(fetcher, session, cache, MARKET_VALUES_API, player_ids, progress)
 
 # for each player id, get the transfer history data from the API
-async def get_transfers(player_ids: List[int]) -> List[dict]:
+async def get_transfers(
+    fetcher: Fetcher,
+    session: aiohttp.ClientSession,
+    cache: ResponseCache,
+    player_ids: List[int],
+    progress: Counter) -> dict:
     """Get the transfer history data from the API for each player id.
 
     Args:
+        fetcher (Fetcher): The fetcher used for the requests
+        session (aiohttp.ClientSession): The session used for the requests
+        cache (ResponseCache): The response cache
         player_ids (List[int]): List of player ids
+        progress (Counter): Counter of requests pending and done
 
     Returns:
-        List[dict]: List of dicts with transfer history data
+        dict: Number of players fetched, failed and cached
     """
 
     logging.info(f"Requesting transfer history for {len(player_ids)} players")
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_data(session, TRANSFERS_API + str(player_id), player_id) for player_id in player_ids]
+    return await fetch_to_cache(fetcher, session, cache, TRANSFERS_API, player_ids, progress)
+
+async def get_player_data(
+    fetcher: Fetcher,
+    cache: ResponseCache,
+    player_ids: List[int],
+    connections_per_host: int) -> Tuple[dict, dict]:
+    """Get the market value and the transfer history data for each player id.
 
-        # Use asyncio.gather to execute the tasks concurrently
-        responses = await asyncio.gather(*tasks)
+    Both endpoints are requested concurrently, in the same event loop and through a single
+    session, whose connection pool keeps connections alive and reuses them across requests.
+    The fetcher limits (concurrency and rate) apply to both endpoints together.
 
-    return responses
+    Args:
+        fetcher (Fetcher): The fetcher used for the requests
+        cache (ResponseCache): The response cache
+        player_ids (List[int]): List of player ids
+        connections_per_host (int): Maximum number of open connections to each API host
 
-def persist_data(data: List[dict], path: str) -> None:
-    """Persist the data to a file.
+    Returns:
+        Tuple[dict, dict]: Market values and transfers stats
+    """
+    progress = Counter()
+    started_at = time.monotonic()
+
+    connector = aiohttp.TCPConnector(
+        limit=fetcher.concurrency,
+        limit_per_host=connections_per_host,
+        keepalive_timeout=60,
+        ttl_dns_cache=600
+    )
+    async with aiohttp.ClientSession(connector=connector) as session:
+        reporter = asyncio.create_task(report_progress(progress, started_at))
+        try:
+            market_values_stats, transfers_stats = await asyncio.gather(
+                get_market_values(fetcher, session, cache, player_ids, progress),
+                get_transfers(fetcher, session, cache, player_ids, progress)
+            )
+        finally:
+            reporter.cancel()
+
+    elapsed = time.monotonic() - started_at
+    logging.info(
+        f"Fetched {progress['done']} responses in {elapsed:.1f}s "
+        f"({progress['done'] / max(elapsed, 1e-6):.1f} responses/s): "
+        f"market values {market_values_stats}, transfers {transfers_stats}"
+    )
+
+    return market_values_stats, transfers_stats
+
+def persist_data(
+    cache: ResponseCache,
+    api_url: str,
+    player_ids: List[int],
+    path: str,
+    run_started_at: float) -> int:
+    """Write the cached responses for a list of player ids to a gzipped JSON lines file.
+
+    Only responses that were fresh in the cache when the run started are written, which are the
+    ones fetched in this run and the ones it did not request again because they were fresh. So the
+    file never mixes the data of this run with stale data from earlier runs, however long the run takes.
 
     Args:
-        data (List[dict]): List of dicts with data to persist
+        cache (ResponseCache): The response cache
+        api_url (str): The API URL, to which the player id is appended
+        player_ids (List[int]): List of player ids
         path (str): Path where to store the data
-    """
-    with open(path, "w") as f:
-        f.writelines(json.dumps(item) + "\n" for item in data)
+        run_started_at (float): UNIX timestamp of the start of the run
 
-def run_for_season(season: int) -> None:
-    """Run all steps for a given season.
+    Returns:
+        int: Number of players written. Players that could not be fetched are missing from the file.
+    """
+    written = 0
+    with JsonLinesWriter(path) as writer:
+        for player_id in player_ids:
+            key = api_url + str(player_id)
+            if not cache.is_fresh(key, at=run_started_at):
+                continue
+            writer.write({"response": cache.get(key), "player_id": player_id})
+            written += 1
+
+    if written < len(player_ids):
+        logging.warning(
+            f"{len(player_ids) - written} players are missing from {path} as they could not be fetched"
+        )
+
+    # remove files in the uncompressed format used by previous versions of this script, so that
+    # the season is not loaded twice
+    pathlib.Path(path).with_suffix("").unlink(missing_ok=True)
+
+    return written
+
+def run_for_seasons(
+    seasons: List[int],
+    fetcher: Fetcher,
+    cache: ResponseCache,
+    connections_per_host: int) -> None:
+    """Run all steps for a list of seasons.
+
+    Both endpoints return the whole history of a player, so each distinct player is requested once
+    no matter in how many of the seasons it appears, and the season files are then written from
+    the cached responses.
 
     Args:
-        season (int): The season to process
+        seasons (List[int]): The seasons to process
+        fetcher (Fetcher): The fetcher used for the requests
+        cache (ResponseCache): The response cache
+        connections_per_host (int): Maximum number of open connections to each API host
     """
-    target_market_values_path = f"data/raw/transfermarkt-api/{season}/market_values.json"
-    target_transfers_path = f"data/raw/transfermarkt-api/{season}/transfers.json"
-
-    logging.info(f"Starting player data acquisition for season {season}")
 
-    # create target directories if they do not exist
-    pathlib.Path(target_market_values_path).parent.mkdir(parents=True, exist_ok=True)
-    pathlib.Path(target_transfers_path).parent.mkdir(parents=True, exist_ok=True)
+    # get player IDs for each season
+    season_player_ids = {season: get_player_ids(season) for season in seasons}
+    player_ids = sorted(set().union(*season_player_ids.values()))
 
-    # get player IDs for the season
-    player_ids = get_player_ids(season)
+    logging.info(
+        f"Starting player data acquisition for {len(player_ids)} distinct players "
+        f"in seasons {list(seasons)}"
+    )
 
-    # collect market values and transfers for players in SEASON
-    market_values = asyncio.run(get_market_values(player_ids))
-    transfers = asyncio.run(get_transfers(player_ids))
+    # collect market values and transfers for all distinct players
+    run_started_at = time.time()
+    asyncio.run(get_player_data(fetcher, cache, player_ids, connections_per_host))
 
-    # filter out player ids in responses that are not in the original list
-    transfers = [item for item in transfers if item["player_id"] in player_ids]
+    # fan out the responses to the files of each season
+    for season, player_ids in season_player_ids.items():
+        target_market_values_path = f"data/raw/transfermarkt-api/{season}/market_values.json.gz"
+        target_transfers_path = f"data/raw/transfermarkt-api/{season}/transfers.json.gz"
 
-    logging.info(f"Persisting market values and transfers for season {season}")
+        logging.info(f"Persisting market values and transfers for season {season}")
 
-    # persist market values and transfers to files
-    persist_data(market_values, target_market_values_path)
-    persist_data(transfers, target_transfers_path)
+        persist_data(cache, MARKET_VALUES_API, player_ids, target_market_values_path, run_started_at)
+        persist_data(cache, TRANSFERS_API, player_ids, target_transfers_path, run_started_at)
 
 parser = argparse.ArgumentParser()
 parser.add_argument(
@@ -174,10 +333,50 @@ parser.add_argument(
   default="2024",
   type=str
 )
+parser.add_argument(
+  '--concurrency',
+  help="Maximum number of requests to the API in flight",
+  default=10,
+  type=int
+)
+parser.add_argument(
+  '--rate',
+  help="Maximum number of requests to the API per second",
+  default=20.0,
+  type=float
+)
+parser.add_argument(
+  '--connections-per-host',
+  help="Maximum number of open connections to each of the API hosts",
+  default=5,
+  type=int
+)
+parser.add_argument(
+  '--max-retries',
+  help="Number of retries for requests that fail with transient errors",
+  default=5,
+  type=int
+)
+parser.add_argument(
+  '--cache-dir',
+  help="Directory where the API responses are cached",
+  default=".cache/transfermarkt-api",
+  type=str
+)
+parser.add_argument(
+  '--cache-ttl',
+  help="Hours after which a cached API response is requested again",
+  default=12.0,
+  type=float
+)
 
 parsed = parser.parse_args()
 
 expanded_seasons = seasons_list(parsed.seasons)
 
-for season in expanded_seasons:
-    run_for_season(season)
+run_for_seasons(
+    expanded_seasons,
+    api_fetcher(parsed.concurrency, parsed.rate, parsed.max_retries),
+    ResponseCache(parsed.cache_dir, ttl=parsed.cache_ttl * 3600),
+    parsed.connections_per_host
+)
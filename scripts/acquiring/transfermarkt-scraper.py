@@ -19,12 +19,14 @@ import argparse
 import sys
 from typing import List
 
-from twisted.internet import reactor, defer
+from twisted.internet import reactor
 from scrapy.crawler import CrawlerRunner
 
 from scrapy.utils.project import get_project_settings
 from scrapy.settings import Settings
 
+from transfermarkt_datasets.core.manifest import Manifest
+from transfermarkt_datasets.core.scheduler import schedule_crawls
 from transfermarkt_datasets.core.utils import (
   read_config,
   submit_batch_job_and_wait,
@@ -33,7 +35,11 @@ from transfermarkt_datasets.core.utils import (
 
 import logging
 
-acquire_config = read_config()["acquire"]
+config = read_config()
+acquire_config = config["acquire"]
+
+# past seasons are frozen: once acquired they are not scraped again unless explicitly requested
+current_season = max(config["defintions"]["seasons"])
 
 logging.config.dictConfig(
   acquire_config["logging"]
@@ -96,7 +102,7 @@ class Asset():
       asset.set_parent()
     return assets
 
-def acquire_on_local(asset, seasons):
+def acquire_on_local(asset, seasons, max_parallel, refresh_frozen):
 
   def assets_list(assets: str) -> List[Asset]:
     """Generate the ordered list of Assets to be scraped based on the provided string.
@@ -117,48 +123,65 @@ def acquire_on_local(asset, seasons):
     
     return assets
 
-  def issue_crawlers_and_wait(assets, seasons, settings):
+  def issue_crawlers_and_wait(assets, seasons, settings, max_parallel, refresh_frozen):
     """Create and submit scrapy crawlers to the reactor, and block until they've completed.
+    Each completed crawl is recorded in the raw data manifest.
 
     Args:
         assets (List[Asset]): List of assets to be scraped.
         seasons (List[int]): List of season to be scraped.
         settings (dict): Crawler setting.
+        max_parallel (int): Maximum number of crawlers running at the same time.
+        refresh_frozen (bool): Scrape past seasons that are already in the manifest too.
     """
 
     # https://docs.scrapy.org/en/latest/topics/practices.html#running-multiple-spiders-in-the-same-process
 
     runner = CrawlerRunner(settings)
 
-    # https://twistedmatrix.com/documents/13.2.0/api/twisted.internet.defer.inlineCallbacks.html
-    @defer.inlineCallbacks
-    def crawl():
-      for season in seasons:
-        # if there's no path created yet for this season create one
-        season_path = pathlib.Path(f"data/raw/transfermarkt-scraper/{season}")
-        if not season_path.exists():
-          season_path.mkdir(parents=True)
-
-        for asset_obj in assets:
-          # TODO: ideally, let transfermark-scraper handle destination file truncation via a setting instead of doing it here
-          # checkout https://foroayuda.es/scrapy-sobrescribe-los-archivos-json-en-lugar-de-agregar-el-archivo/
-          file_path = asset_obj.file_path(season)
-          if file_path.exists():
-            os.remove(str(file_path))
-          logging.info(
-            f"Schedule {asset_obj.name} for season {season}"
-          )
-          yield runner.crawl(
-            asset_obj.name,
-            parents=asset_obj.parent.file_full_path(season),
-            season=season
-          )
-
-      reactor.stop()
-    
-    crawl()
+    def crawl(season, asset_obj):
+      # if there's no path created yet for this season create one
+      season_path = pathlib.Path(f"data/raw/transfermarkt-scraper/{season}")
+      season_path.mkdir(parents=True, exist_ok=True)
+
+      # TODO: ideally, let transfermark-scraper handle destination file truncation via a setting instead of doing it here
+      # checkout https://foroayuda.es/scrapy-sobrescribe-los-archivos-json-en-lugar-de-agregar-el-archivo/
+      file_path = asset_obj.file_path(season)
+      if file_path.exists():
+        os.remove(str(file_path))
+      logging.info(
+        f"Schedule {asset_obj.name} for season {season}"
+      )
+      scraped = runner.crawl(
+        asset_obj.name,
+        parents=asset_obj.parent.file_full_path(season),
+        season=season
+      )
+      return scraped.addCallback(lambda _: record(season, asset_obj))
+
+    def record(season, asset_obj):
+      changed = manifest.record(season, asset_obj.name)
+      manifest.save()
+      entry = manifest.get(season, asset_obj.name)
+      logging.info(
+        f"Recorded {asset_obj.name} for season {season} in the manifest "
+        f"({entry['rows']} rows, {'changed' if changed else 'unchanged'})"
+      )
+
+    def is_frozen(season, asset_obj):
+      return not refresh_frozen and manifest.is_frozen(season, asset_obj.name, current_season)
+
+    manifest = Manifest()
+    failed = []
+    done = schedule_crawls(crawl, assets, seasons, max_parallel, skip=is_frozen)
+    done.addCallback(failed.extend)
+    done.addBoth(lambda _: reactor.stop())
     reactor.run()
-  
+
+    if failed:
+      logging.error(f"Some crawls did not complete: {failed}")
+      sys.exit(1)
+
   # get seasons and assets list
   expanded_seasons = seasons_list(seasons)
   expanded_assets = assets_list(asset)
@@ -167,7 +190,7 @@ def acquire_on_local(asset, seasons):
   settings = scrapy_config()
   
   # create crawlers and wait until they complete
-  issue_crawlers_and_wait(expanded_assets, expanded_seasons, settings)
+  issue_crawlers_and_wait(expanded_assets, expanded_seasons, settings, max_parallel, refresh_frozen)
 
 parser = argparse.ArgumentParser()
 
@@ -183,6 +206,17 @@ parser.add_argument(
   default="2024",
   type=str
 )
+parser.add_argument(
+  '--max-parallel',
+  help="Maximum number of crawlers running at the same time. Crawlers for different seasons run in parallel",
+  default=4,
+  type=int
+)
+parser.add_argument(
+  '--refresh-frozen',
+  help="Scrape past seasons again even if they are already acquired, as recorded in the raw data manifest",
+  action='store_true'
+)
 
 arguments = parser.parse_args()
 acquire_on_local(**vars(arguments))
@@ -0,0 +1,68 @@
+"""
+Measure the cold start of the dataset: the time it takes to import transfermarkt_datasets.core.dataset
+and construct a Dataset in a fresh interpreter, and which heavy dependencies get imported on the way.
+
+Usage:
+    python scripts/benchmarks/import-time.py --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# dependencies that should only be imported when they are actually used
+HEAVY_MODULES = ["boto3", "frictionless", "duckdb", "scrapy", "streamlit"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from transfermarkt_datasets.core.dataset import Dataset
+imported = time.perf_counter()
+Dataset()
+constructed = time.perf_counter()
+print(json.dumps({
+  "import": imported - start,
+  "construct": constructed - imported,
+  "modules": [name for name in %r if name in sys.modules]
+}))
+""" % HEAVY_MODULES
+
+def measure(runs: int) -> dict:
+  """Run the probe in `runs` fresh interpreters and return the median timings, in milliseconds."""
+  results = []
+  for _ in range(runs):
+    output = subprocess.run(
+      [sys.executable, "-c", PROBE],
+      check=True,
+      capture_output=True,
+      text=True
+    ).stdout
+    results.append(json.loads(output.splitlines()[-1]))
+
+  return {
+    "import_ms": round(statistics.median(result["import"] for result in results) * 1000, 1),
+    "construct_ms": round(statistics.median(result["construct"] for result in results) * 1000, 1),
+    "heavy_modules": results[-1]["modules"]
+  }
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--runs', help='Number of fresh interpreters to measure', default=5, type=int)
+parser.add_argument(
+  '--max-construct-ms',
+  help='Exit with an error if constructing a Dataset takes longer than this',
+  default=None,
+  type=float
+)
+
+args = parser.parse_args()
+
+stats = measure(args.runs)
+print(
+  f"import: {stats['import_ms']}ms, Dataset(): {stats['construct_ms']}ms, "
+  f"heavy modules imported: {stats['heavy_modules'] or 'none'}"
+)
+
+if args.max_construct_ms is not None and stats["construct_ms"] > args.max_construct_ms:
+  sys.exit(1)
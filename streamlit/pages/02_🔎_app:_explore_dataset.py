@@ -4,6 +4,7 @@ import pandas as pd
 from utils import (
     load_td,
     draw_asset,
+    draw_asset_browser,
     draw_dataset_er_diagram,
     draw_dataset_index
 )
@@ -44,3 +45,5 @@ for asset_name, asset in td.assets.items():
 
 
 draw_dataset_index(td)
+
+draw_asset_browser(td)
@@ -30,8 +30,9 @@ st.markdown("""
 
 # pull up assets to be used in the calculations
 
-players: pd.DataFrame = td.assets["cur_players"].prep_df
-player_valuations: pd.DataFrame = td.assets["cur_player_valuations"].prep_df
+players: pd.DataFrame = td.assets["cur_players"].load_from_prep(
+    columns=["player_id", "name", "market_value_in_eur"]
+)
 
 # define define values for script arguments
 
@@ -44,32 +45,39 @@ with st.expander("Baseline Filters"):
         value=10
     )
 
+    # the options are the players that match the search, rather than all the players in the dataset
+    player_query = st.text_input(label="Search players")
+    default_player_names = list(top_n_players(players, top_n))
+    selected_player_names = st.session_state.get("player_names", default_player_names)
+    matching_player_names = (
+        td.search("cur_players", player_query, k=20)["name"].tolist() if player_query else []
+    )
+
     player_names = st.multiselect(
         label="Player name",
-        options=players["name"].unique(),
-        default=top_n_players(players, top_n)
+        options=list(dict.fromkeys(selected_player_names + default_player_names + matching_player_names)),
+        default=default_player_names,
+        key="player_names"
     )
 
 # create a data mart with all required measures and dimensions
 # for the base mart we use a "player valuation" granularity
+# players are filtered by name before they are joined, so only the selected players valuations are read
 
-mart = player_valuations.merge(
-    players[["player_id", "name"]],
-    how="left",
-    on="player_id"
+mart = td.mart(
+    "cur_player_valuations",
+    joins=["cur_players"],
+    columns=["date", "market_value_in_eur", "cur_players.name"],
+    filters=[("cur_players.name", "in", player_names)]
 )
 
-baselined_mart = mart[
-    (mart["name"].isin(player_names))
-]
-
 # most valuesd players
 
 st.header("Most valued Players")
 
 
 most_valued_players = (
-    baselined_mart
+    mart
         .sort_values(by="date")
         .groupby("name")
         .tail(1)
@@ -93,7 +101,7 @@ st.plotly_chart(
 st.header("Time progression")
 
 fig = px.line(
-    mart[mart["name"].isin(player_names)],
+    mart,
     x="date",
     y="market_value_in_eur",
     color="name"
@@ -20,14 +20,15 @@ st.markdown("""
 """)
 
 # pull up assets to be used in the calculations
+# games and wins are pre-aggregated by club, season, manager and competition type in the
+# `manager_performance` asset, so the page doesn't need to join all club games on every rerun,
+# and the filter options come from the catalog and the column statistics
 
-competitions = td.assets["cur_competitions"].prep_df
-club_games = td.assets["cur_club_games"].prep_df
-games = td.assets["cur_games"].prep_df.copy()
-clubs = td.assets["cur_clubs"].prep_df
-
-# TODO: it's kind of annoying that this does not come in with the correct type already
-games["season"] = pd.to_datetime(games["season"], format="%Y")
+competition_ids_options = td.mart("cur_competitions", columns=["competition_id"])["competition_id"]
+manager_options = td.mart(
+    "cur_manager_performance", columns=["own_manager_name"], distinct=True
+)["own_manager_name"].sort_values()
+season_stats = td.get_stats("cur_manager_performance").loc["season"]
 
 # define the set of leagues to be used in the app
 
@@ -45,15 +46,14 @@ with st.expander("Baseline Filters"):
 
     competition_ids = col1.multiselect(
         "Domestic competition IDs",
-        options=competitions["competition_id"].unique(),
+        options=competition_ids_options,
         default=DEFAULT_COMPETITIONS
     )
 
-    all_seasons = games["season"].dt.year.unique()
     seasons_limits = col2.slider(
         label="Seasons",
-        min_value=int(min(all_seasons)),
-        max_value=int(max(all_seasons)),
+        min_value=int(season_stats["min"]),
+        max_value=int(season_stats["max"]),
         step=1,
         value=DEFAULT_SEASONS
     )
@@ -61,7 +61,7 @@ with st.expander("Baseline Filters"):
 
     managers = col1.multiselect(
         label="Managers",
-        options=club_games["own_manager_name"].unique(),
+        options=manager_options,
         default=DEFAULT_MANAGERS
     )
 
@@ -69,30 +69,18 @@ with st.expander("Baseline Filters"):
         col2.number_input('Minimum number of games played in a season', value=DEFAULT_MIN_GAMES)
     )
 
-# create a data mart with all required measures and dimensions
-# for the base mart we use a "club game" granularity
-
-mart = club_games.merge(
-        games,
-        how="left",
-        on="game_id"
-    ).merge(
-        clubs[["club_id", "name", "domestic_competition_id"]].rename(
-            columns={
-                "name": "club_name",
-                "domestic_competition_id": "club_domestic_competition_id"
-            }
-        ),
-        how="left",
-        on="club_id"
-    )
+# only the rows that match the filters are read from the pre-aggregated asset
 
-baselined_mart = mart[
-    (mart["season"].dt.year.isin(seasons)) &
-    (mart["club_domestic_competition_id"].isin(competition_ids)) & 
-    (mart["own_manager_name"].isin(managers)) &
-    (mart["competition_type"].isin(DEFAULT_COMPETITION_TYPES))
-]
+baselined_mart = td.mart(
+    "cur_manager_performance",
+    columns=["club_name", "season", "own_manager_name", "competition_type", "games", "wins"],
+    filters=[
+        ("season", "in", seasons),
+        ("club_domestic_competition_id", "in", competition_ids),
+        ("own_manager_name", "in", managers),
+        ("competition_type", "in", DEFAULT_COMPETITION_TYPES)
+    ]
+)
 
 # manager perfomance is evaluated on its win percentage
 # we want to calculate manages win percentage by season and competition type
@@ -101,14 +89,14 @@ managers_win_pct_per_season = (
     baselined_mart
         .groupby(by=[
                 "club_name", "season", "own_manager_name", "competition_type"
-            ])["is_win"]
-        .agg(func=["count", "sum"])
+            ], observed=True)[["games", "wins"]]
+        .sum()
         .reset_index()
 )
 managers_win_pct_per_season.rename(
     columns={
-        "count": "total_games",
-        "sum": "total_wins",
+        "games": "total_games",
+        "wins": "total_wins",
     },
     inplace=True
 )
@@ -126,10 +114,10 @@ managers_win_pct_per_season = managers_win_pct_per_season[
 
 managers_win_pct_comparative = (
     managers_win_pct_per_season[
-        managers_win_pct_per_season["season"].dt.year.isin(seasons) &
+        managers_win_pct_per_season["season"].isin(seasons) &
         managers_win_pct_per_season["own_manager_name"].isin(managers)
     ]
-        .groupby(["own_manager_name", "competition_type"])["pct_win"]
+        .groupby(["own_manager_name", "competition_type"], observed=True)["pct_win"]
         .mean()
         .reset_index()
 )
@@ -159,7 +147,7 @@ st.subheader(
 managers_win_pct_perf_by_season = (
     managers_win_pct_per_season.groupby(
         ["season", "own_manager_name", "club_name"]
-    )["total_games", "total_wins"].sum()
+    )[["total_games", "total_wins"]].sum()
     .reset_index()
 )
 
@@ -169,7 +157,7 @@ managers_win_pct_perf_by_season["pct_win"] = (
 
 st.altair_chart(
     altair_chart=alt.Chart(managers_win_pct_perf_by_season).mark_bar().encode(
-        x="year(season):T",
+        x="season:O",
         y="own_manager_name:N",
         color=alt.Color(
             shorthand="pct_win",
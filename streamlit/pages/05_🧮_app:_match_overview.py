@@ -18,13 +18,10 @@ st.markdown("""
 """)
 
 # pull up assets to be used in the calculations
-games = td.assets["cur_games"].prep_df.copy()
+games = td.assets["cur_games"].prep_df
 competitions = td.assets["cur_competitions"].prep_df
 club_games = td.assets["cur_club_games"].prep_df
 
-# TODO: it's kind of annoying that this does not come in with the correct type already
-games["season"] = games["season"].astype(int)
-
 # create initial mart
 mart = games
 
@@ -1,10 +1,7 @@
 import streamlit as st
 import os
 import sys
-import gc
 import pandas as pd 
-import duckdb 
-from io import BytesIO
 from datetime import datetime, date 
 from pathlib import Path
 
@@ -34,6 +31,7 @@ except Exception as e_path:
 try:
     from transfermarkt_datasets.core.asset import Asset 
     from transfermarkt_datasets.core.dataset import Dataset 
+    from transfermarkt_datasets.core.export import export_partitions, export_query, EXPORT_FORMATS, EXCEL_MAX_ROWS
     from utils import load_td
 except ImportError as e_import:
     st.error(f"Failed to import required modules: {e_import}")
@@ -50,7 +48,7 @@ if "global_date_filter" in st.session_state:
 st.title("⚽ Transfermarkt Database 7 - EXCEL FIXED")
 
 st.markdown("""
-Explore the Transfermarkt database, apply filters, and export the results to Excel.
+Explore the Transfermarkt database, apply filters, and export the results to Excel, CSV or Parquet.
 """)
 
 # Define Top 5 Leagues and their known competition codes
@@ -76,20 +74,21 @@ except Exception as e_proj_root:
 # (Assumes Asset.prep_path is relative to project root)
 
 def get_asset_prep_path(asset_obj):
+    # Prefer the typed Parquet export over the gzipped CSV when it is available
+    prep_path = asset_obj.prep_parquet_path if asset_obj.has_prep_parquet else asset_obj.prep_path
     # If path is already absolute, return as is
-    if os.path.isabs(asset_obj.prep_path):
-        return asset_obj.prep_path
+    if os.path.isabs(prep_path):
+        return prep_path
     # Otherwise, join with PROJECT_ROOT
-    return os.path.join(PROJECT_ROOT, asset_obj.prep_path)
+    return os.path.join(PROJECT_ROOT, prep_path)
 
 # --- END DYNAMIC PROJECT ROOT DETECTION ---
 
-# Load the dataset object (loads all assets)
-@st.cache_data(ttl=1800, show_spinner=False, max_entries=1)
+# Load the dataset object (assets data is loaded lazily)
+@st.cache_resource(ttl=1800, show_spinner=False, max_entries=1)
 def get_dataset():
     """Load dataset with memory management and path flexibility"""
     try:
-        gc.collect()  # Clean up before loading
         return load_td()
     except Exception as e:
         st.error(f"Failed to load dataset: {e}")
@@ -125,19 +124,14 @@ def load_club_data(_dataset):
     if clubs_asset:
         try:
             # LAZY LOADING: Only load clubs data when explicitly needed for filters
-            # This prevents immediate memory usage on app startup
-            clubs_asset.load_from_prep() 
-            clubs_df_local = clubs_asset.prep_df
-            if clubs_df_local is not None and 'club_id' in clubs_df_local.columns and 'name' in clubs_df_local.columns:
-                available_club_names_local = sorted(clubs_df_local['name'].dropna().unique())
-                temp_id_to_name = clubs_df_local.dropna(subset=['club_id', 'name']).set_index('club_id')['name'].to_dict()
-                club_name_to_id_local = {
-                    name: clubs_df_local[clubs_df_local['name'] == name]['club_id'].iloc[0] 
-                    for name in available_club_names_local
-                }
-                club_id_to_name_local = {
-                    club_id: name for name, club_id in club_name_to_id_local.items()
-                }
+            # Only the two columns of the mapping are read, and the whole mapping is built in a
+            # single pass instead of scanning the clubs once per name
+            clubs_df_local = clubs_asset.load_from_prep(columns=['club_id', 'name'])
+            if clubs_df_local is not None:
+                named_clubs = clubs_df_local.dropna(subset=['club_id', 'name']).drop_duplicates(subset='name')
+                available_club_names_local = sorted(named_clubs['name'].unique())
+                club_name_to_id_local = dict(zip(named_clubs['name'], named_clubs['club_id']))
+                club_id_to_name_local = dict(zip(named_clubs['club_id'], named_clubs['name']))
 
         except FileNotFoundError as e_fnf_club:
             st.warning("⚠️ Club data file not found. Club filtering will be disabled.")
@@ -171,18 +165,18 @@ def get_club_names_for_leagues(
     if not _selected_league_codes:
         return []
 
-    games_asset = _td_dataset.assets.get("cur_games")
-    if not games_asset:
+    if "cur_games" not in _td_dataset.assets:
         st.warning("Games asset ('cur_games') not found in dataset.")
         return []
-    
-    games_file_path = get_asset_prep_path(games_asset)
-    if not os.path.exists(games_file_path):
-        st.warning(f"Games data file not found: {games_file_path}")
+
+    try:
+        games_relation = _td_dataset.catalog.relation("cur_games")
+    except FileNotFoundError as e:
+        st.warning(f"Games data file not found: {e}")
         return []
 
-    # Assuming season column is integer like 2022 for 2022/23 season
-    season_conditions = f"CAST(season AS INTEGER) >= {_start_year} AND CAST(season AS INTEGER) <= {_end_year}"
+    # Season column is integer like 2022 for 2022/23 season
+    season_conditions = f"season >= {_start_year} AND season <= {_end_year}"
 
     # Prepare league codes for SQL IN clause (ensure they are strings)
     league_codes_str = ", ".join([f"'{str(code)}'" for code in _selected_league_codes])
@@ -190,19 +184,17 @@ def get_club_names_for_leagues(
     query = f"""
     SELECT DISTINCT club_id
     FROM (
-        SELECT home_club_id AS club_id FROM read_csv_auto('{str(games_file_path)}')
+        SELECT home_club_id AS club_id FROM {games_relation}
         WHERE competition_id IN ({league_codes_str}) AND {season_conditions}
         UNION ALL
-        SELECT away_club_id AS club_id FROM read_csv_auto('{str(games_file_path)}')
+        SELECT away_club_id AS club_id FROM {games_relation}
         WHERE competition_id IN ({league_codes_str}) AND {season_conditions}
     ) AS combined_clubs
     WHERE club_id IS NOT NULL;
     """
     
     try:
-        con = duckdb.connect(database=':memory:', read_only=False)
-        club_ids_df = con.execute(query).fetchdf()
-        con.close()
+        club_ids_df = _td_dataset.catalog.query(query)
 
         if club_ids_df.empty:
             return []
@@ -225,44 +217,26 @@ def get_club_names_for_leagues(
 # --- End function to get club names for leagues ---
 
 # --- Function to get date range for an asset ---
-@st.cache_data(ttl=1800, show_spinner=False, max_entries=20)
-def get_date_range_for_asset(_asset_obj: Asset, date_column_name: str):
-    file_path = get_asset_prep_path(_asset_obj)
-    if not os.path.exists(file_path):
-        # st.warning(f"Data file not found, cannot determine date range: {file_path}") # Warning can be noisy if file is optional
-        return None, None
-
-    query = f"SELECT MIN(CAST({date_column_name} AS DATE)) AS min_date, MAX(CAST({date_column_name} AS DATE)) AS max_date FROM read_csv_auto('{str(file_path)}')"
-    
+def get_date_range_for_asset(_td_dataset: Dataset, asset_name: str, date_column_name: str):
+    """Get the date bounds of an asset from its column statistics, without scanning the data"""
     try:
-        con = duckdb.connect(database=':memory:', read_only=True)
-        result = con.execute(query).fetchdf()
-        con.close()
-        
-        if not result.empty:
-            min_date_res = result['min_date'].iloc[0]
-            max_date_res = result['max_date'].iloc[0]
-            
-            if pd.NaT is not min_date_res and min_date_res is not None:
-                if isinstance(min_date_res, pd.Timestamp):
-                    min_date_res = min_date_res.date()
-                elif isinstance(min_date_res, datetime): # datetime.datetime object
-                    min_date_res = min_date_res.date()
-            else:
-                min_date_res = None # Explicitly set to None if NaT or None
-
-            if pd.NaT is not max_date_res and max_date_res is not None:
-                if isinstance(max_date_res, pd.Timestamp):
-                    max_date_res = max_date_res.date()
-                elif isinstance(max_date_res, datetime): # datetime.datetime object
-                    max_date_res = max_date_res.date()
-            else:
-                max_date_res = None # Explicitly set to None if NaT or None
-            
-            return min_date_res, max_date_res
+        stats = _td_dataset.get_stats(asset_name)
+    except FileNotFoundError:
+        # Data file not found, cannot determine date range
         return None, None
-    except Exception as e:
+    except Exception:
+        return None, None
+
+    if date_column_name not in stats.index:
         return None, None
+
+    min_date_res = pd.to_datetime(stats.at[date_column_name, "min"], errors="coerce")
+    max_date_res = pd.to_datetime(stats.at[date_column_name, "max"], errors="coerce")
+
+    return (
+        None if pd.isna(min_date_res) else min_date_res.date(),
+        None if pd.isna(max_date_res) else max_date_res.date()
+    )
 # --- End function to get date range ---
 
 
@@ -370,20 +344,25 @@ start_year_for_leagues = current_year - 20
 # --- End League Filter Setup ---
 
 # --- Global Date Filter Setup ---
-# Use broad defaults - do NOT query data files immediately when asset changes
+# Use broad defaults, narrowed to the asset date bounds when its column statistics are available
 global_min_val_for_input = datetime(1990, 1, 1).date()
 global_max_val_for_input = datetime.now().date() 
-initial_date_range_value = [global_min_val_for_input, global_max_val_for_input]
 
 # Set date filter label based on asset type without loading data
 if asset_name in date_filterable_assets:
     date_col_for_asset = date_filterable_assets[asset_name]
     date_filter_label = f"Filter by '{FRIENDLY_COLUMN_NAMES.get(date_col_for_asset, date_col_for_asset)}':"
+
+    # The bounds are read from the statistics written with the prepared files, so this does not
+    # scan the data. Without statistics, they would take a full scan and the defaults are kept.
+    if asset.stats is not None:
+        asset_min_date, asset_max_date = get_date_range_for_asset(td, asset_name, date_col_for_asset)
+        if asset_min_date is not None and asset_max_date is not None:
+            global_min_val_for_input, global_max_val_for_input = asset_min_date, asset_max_date
 else:
     date_filter_label = "Date Filter (asset not date-filterable)"
 
-# Note: We deliberately do NOT call get_date_range_for_asset() here 
-# to avoid loading data files immediately when user changes asset selection
+initial_date_range_value = [global_min_val_for_input, global_max_val_for_input]
 
 # SIMPLIFIED DATE INPUT - Use separate start and end date inputs for reliability
 # This replaces the problematic st.date_input with value as tuple that caused 
@@ -429,7 +408,16 @@ if load_clubs_for_filtering and asset_name in team_filterable_assets:
     # Dynamically populate club list based on selected leagues
     clubs_for_selection = available_club_names # Default to all clubs
 
-    if selected_league_codes:
+    if not selected_league_codes:
+        # Without a league, clubs are picked from a search rather than from the list of all clubs
+        club_query = st.sidebar.text_input("Search clubs:", key=f"club_search_{asset_name}")
+        matching_club_names = (
+            td.search("cur_clubs", club_query, k=20)["name"].tolist() if club_query else []
+        )
+        clubs_for_selection = st.session_state.get(filter_key_club, []) + matching_club_names
+        if not clubs_for_selection:
+            st.sidebar.caption("Type a club name to filter by club.")
+    else:
         # Ensure club_id_to_name is populated (it comes from load_club_data)
         if not club_id_to_name:
             st.sidebar.warning("Club name mapping is not available. Cannot filter by league teams. Showing all clubs.")
@@ -454,7 +442,7 @@ if load_clubs_for_filtering and asset_name in team_filterable_assets:
             options=sorted(list(set(clubs_for_selection))), # Ensure unique and sorted options
             key=filter_key_club
         )
-    else:
+    elif selected_league_codes:
         st.sidebar.info("No clubs available for filtering for the current selection.")
         selected_club_names_ui = []
         
@@ -465,131 +453,10 @@ else:
     st.sidebar.info(f"Club filtering not applicable for the '{ASSET_DISPLAY_NAMES.get(asset_name, asset_name)}' dataset.")
     selected_club_names_ui = []
 
-# Function to process data in chunks for memory efficiency
-def process_data_in_chunks(_asset_obj: Asset, filters: dict, chunk_years: int = 5) -> dict:
-    """Process large datasets in year-based chunks to minimize memory usage"""
-    
-    # Check if this is a date-filterable asset with date range
-    if not filters.get("date_filter_col") or not filters.get("date_range"):
-        # If no date filtering, fall back to regular processing with limits
-        return load_data_with_duckdb(_asset_obj, filters)
-    
-    start_date, end_date = filters["date_range"]
-    start_year = start_date.year
-    end_year = end_date.year
-    
-    # If date range is small enough, process normally
-    if (end_year - start_year) <= chunk_years:
-        return load_data_with_duckdb(_asset_obj, filters)
-    
-    # Process in chunks
-    st.info(f"📦 Large date range detected ({start_year}-{end_year}). Processing in {chunk_years}-year chunks for memory efficiency.")
-    
-    all_chunks = []
-    total_rows = 0
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    chunk_start_year = start_year
-    chunk_count = 0
-    total_chunks = ((end_year - start_year) // chunk_years) + 1
-    
-    try:
-        while chunk_start_year <= end_year:
-            chunk_end_year = min(chunk_start_year + chunk_years - 1, end_year)
-            chunk_count += 1
-            
-            status_text.text(f"Processing chunk {chunk_count}/{total_chunks}: {chunk_start_year}-{chunk_end_year}")
-            
-            # Create chunk-specific filters
-            chunk_filters = filters.copy()
-            chunk_start_date = date(chunk_start_year, 1, 1)
-            chunk_end_date = date(chunk_end_year, 12, 31)
-            
-            # Ensure chunk dates don't exceed original range
-            chunk_start_date = max(chunk_start_date, start_date)
-            chunk_end_date = min(chunk_end_date, end_date)
-            
-            chunk_filters["date_range"] = (chunk_start_date, chunk_end_date)
-            
-            # Process this chunk
-            chunk_result = load_data_with_duckdb(_asset_obj, chunk_filters)
-            
-            if chunk_result['error']:
-                return chunk_result  # Return error immediately
-            
-            chunk_data = chunk_result['data']
-            if not chunk_data.empty:
-                all_chunks.append(chunk_data)
-                total_rows += len(chunk_data)
-                
-                # Clear chunk data from memory immediately after appending
-                del chunk_data
-                gc.collect()
-            
-            # Update progress
-            progress_bar.progress(chunk_count / total_chunks)
-            
-            chunk_start_year += chunk_years
-        
-        progress_bar.progress(1.0)
-        status_text.text("Combining chunks...")
-        
-        # Combine all chunks
-        if all_chunks:
-            combined_data = pd.concat(all_chunks, ignore_index=True)
-            # Clear chunk list from memory
-            del all_chunks
-            gc.collect()
-            
-            status_text.text(f"✅ Processed {total_rows:,} rows across {chunk_count} chunks")
-            return {'data': combined_data, 'query': f"Chunked processing ({chunk_count} chunks)", 'error': None, 'total_rows_available': total_rows}
-        else:
-            status_text.text("No data found in any chunks")
-            return {'data': pd.DataFrame(), 'query': "Chunked processing (no data)", 'error': None, 'total_rows_available': 0}
-            
-    except Exception as e:
-        status_text.text(f"❌ Error during chunked processing: {str(e)}")
-        # Clean up any remaining chunks
-        if 'all_chunks' in locals():
-            del all_chunks
-        gc.collect()
-        return {'data': pd.DataFrame(), 'query': "Chunked processing (failed)", 'error': f"Chunked processing failed: {str(e)}", 'total_rows_available': 0}
-    
-    finally:
-        # Always clean up
-        gc.collect()
-
-# Function to load and filter data using DuckDB
-@st.cache_data(ttl=1800, show_spinner=False, max_entries=5)
-def load_data_with_duckdb(_asset_obj: Asset, filters: dict) -> dict:
-    """Load and filter data with simplified parameter handling and memory management"""
-    file_path = get_asset_prep_path(_asset_obj)
-    if not os.path.exists(file_path):
-        return {'data': pd.DataFrame(), 'query': "", 'error': f"Data file not found: {file_path}", 'row_count': 0}
-
-    # Check file size before attempting to load
-    try:
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        if file_size_mb > 10:  # If file is larger than 10MB, be extra cautious
-            st.warning(f"⚠️ Large data file detected ({file_size_mb:.1f} MB). Processing with conservative limits.")
-    except:
-        pass  # Continue if we can't check file size
-
-    # Dataset-specific memory limits for Streamlit Cloud safety
-    asset_name = getattr(_asset_obj, 'name', 'unknown')
-    DATASET_LIMITS = {
-        'cur_transfers': 25000,  # Transfers dataset is large, be very conservative
-        'cur_player_valuations': 25000,  # Valuations can be large too
-        'cur_appearances': 30000,  # Appearances can be very large
-        'default': 50000  # Default limit for other datasets
-    }
-    
-    MAX_ROWS = DATASET_LIMITS.get(asset_name, DATASET_LIMITS['default'])
-    st.info(f"ℹ️ Using conservative limit of {MAX_ROWS:,} rows for {asset_name} dataset to ensure stability.")
-    
-    query_parts = [f"SELECT * FROM read_csv_auto('{str(file_path)}')"]
+# Function to build the filtered query over an asset in the catalog
+def build_filtered_query(asset_relation: str, filters: dict):
+    """Build the SQL query that applies the UI filters to an asset. Returns a (query, error) tuple"""
+    query_parts = [f"SELECT * FROM {asset_relation}"]
     conditions = []
 
     # Date condition with direct string interpolation (safer for DuckDB)
@@ -601,11 +468,11 @@ def load_data_with_duckdb(_asset_obj: Asset, filters: dict) -> dict:
             if isinstance(start_date, date) and isinstance(end_date, date):
                 start_date_str = start_date.strftime('%Y-%m-%d')
                 end_date_str = end_date.strftime('%Y-%m-%d')
-                conditions.append(f'CAST("{date_filter_col}" AS DATE) >= \'{start_date_str}\' AND CAST("{date_filter_col}" AS DATE) <= \'{end_date_str}\'')
+                conditions.append(f'"{date_filter_col}" >= \'{start_date_str}\' AND "{date_filter_col}" <= \'{end_date_str}\'')
             else:
-                return {'data': pd.DataFrame(), 'query': "", 'error': f"Invalid date types: start={type(start_date)}, end={type(end_date)}", 'row_count': 0}
+                return None, f"Invalid date types: start={type(start_date)}, end={type(end_date)}"
         else:
-            return {'data': pd.DataFrame(), 'query': "", 'error': f"Invalid date range format: {type(date_range)}, length={len(date_range) if hasattr(date_range, '__len__') else 'N/A'}", 'row_count': 0}
+            return None, f"Invalid date range format: {type(date_range)}, length={len(date_range) if hasattr(date_range, '__len__') else 'N/A'}"
 
     # Club condition with direct string interpolation
     if filters.get("club_filter_config") and filters.get("selected_clubs") and filters.get("club_name_map"):
@@ -628,51 +495,77 @@ def load_data_with_duckdb(_asset_obj: Asset, filters: dict) -> dict:
 
     if conditions:
         query_parts.append("WHERE " + " AND ".join(conditions))
-    
-    # Add LIMIT to prevent memory issues in cloud environments
-    # First, let's check if we need to limit the results
-    count_query = f"SELECT COUNT(*) as row_count FROM ({' '.join(query_parts)})"
-    final_query = " ".join(query_parts)
 
-    try:
-        con = duckdb.connect(database=':memory:', read_only=False)
-        
-        # Check row count first to prevent memory issues
-        count_result = con.execute(count_query).fetchdf()
-        row_count = count_result['row_count'].iloc[0] if not count_result.empty else 0
-        
-        # More aggressive limits for known large datasets
-        if asset_name in ['cur_transfers', 'cur_appearances', 'cur_player_valuations']:
-            MAX_QUERY_ROWS = 100000  # Even more conservative for large datasets
-        else:
-            MAX_QUERY_ROWS = 200000  # Standard limit for other datasets
-            
-        if row_count > MAX_QUERY_ROWS:
-            final_query += f" LIMIT {MAX_QUERY_ROWS}"
-            
-        df_result = con.execute(final_query).fetchdf()
-        con.close()
-        gc.collect()
-        return {'data': df_result, 'query': final_query, 'error': None, 'total_rows_available': row_count}
-    
-    except MemoryError as e:
-        if 'con' in locals():
-            con.close()
-        gc.collect()
-        return {'data': pd.DataFrame(), 'query': final_query, 'error': f"Memory error: Dataset too large for available memory. Try applying more filters to reduce data size.", 'total_rows_available': 0}
-    
-    except Exception as e:
-        if 'con' in locals():
-            con.close()
-        gc.collect()
-        error_msg = str(e)
-        if 'memory' in error_msg.lower() or 'out of memory' in error_msg.lower():
-            return {'data': pd.DataFrame(), 'query': final_query, 'error': f"Memory constraint: {error_msg}. Try applying filters to reduce dataset size.", 'total_rows_available': 0}
-        else:
-            return {'data': pd.DataFrame(), 'query': final_query, 'error': f"Query failed: {error_msg}", 'total_rows_available': 0}
-    
-    finally:
-        gc.collect()  # Clean up memory
+    return " ".join(query_parts), None
+
+# Exports of assets with fewer rows than this are run as a single query, as splitting them in
+# date chunks costs more in query overhead than it saves
+PARTITION_MIN_ROWS = 500000
+# Number of years of the date range covered by each chunk of a split export
+DATE_CHUNK_YEARS = 5
+
+# Function to get the date bounds and the row count of an asset, to decide how to split its exports
+def get_partitioning_bounds(_asset_obj: Asset, asset_relation: str, date_column_name: str):
+    """Get the (min date, max date, row count) of an asset, from its column statistics if there are
+    any or else with a single aggregate query on the catalog"""
+    stats = _asset_obj.stats
+    if stats is not None and date_column_name in stats.index:
+        min_date_res = pd.to_datetime(stats.at[date_column_name, "min"], errors="coerce")
+        max_date_res = pd.to_datetime(stats.at[date_column_name, "max"], errors="coerce")
+        row_count = _asset_obj.row_count
+    else:
+        min_date_res, max_date_res, row_count = td.catalog.execute(
+            f'SELECT min("{date_column_name}"), max("{date_column_name}"), count(*) FROM {asset_relation}'
+        ).fetchone()
+        min_date_res, max_date_res = pd.to_datetime(min_date_res), pd.to_datetime(max_date_res)
+
+    if pd.isna(min_date_res) or pd.isna(max_date_res):
+        return None, None, row_count
+    return min_date_res.date(), max_date_res.date(), row_count
+
+# Function to split a filtered query over a wide date range into queries over year-based chunks
+def build_date_partitioned_queries(
+    asset_relation: str,
+    filters: dict,
+    data_date_range=None,
+    row_count: int = None,
+    chunk_years: int = DATE_CHUNK_YEARS):
+    """Build one filtered query per chunk of `chunk_years` years of the date range, in date order.
+    The date range is first narrowed to the dates the asset actually has (`data_date_range`), so
+    that no chunk covers years without data. Returns a (queries, error) tuple, where queries is
+    None if the export is not large enough to be split"""
+    if not filters.get("date_filter_col") or not filters.get("date_range"):
+        return None, None
+    if row_count is not None and row_count < PARTITION_MIN_ROWS:
+        return None, None
+
+    start_date, end_date = filters["date_range"]
+    if data_date_range is not None:
+        data_start_date, data_end_date = data_date_range
+        start_date, end_date = max(start_date, data_start_date), min(end_date, data_end_date)
+        if start_date > end_date:
+            return None, None
+
+    if (end_date.year - start_date.year) <= chunk_years:
+        return None, None
+
+    queries = []
+    for chunk_start_year in range(start_date.year, end_date.year + 1, chunk_years):
+        chunk_end_year = min(chunk_start_year + chunk_years - 1, end_date.year)
+
+        # Ensure chunk dates don't exceed original range
+        chunk_filters = filters.copy()
+        chunk_filters["date_range"] = (
+            max(date(chunk_start_year, 1, 1), start_date),
+            min(date(chunk_end_year, 12, 31), end_date)
+        )
+
+        chunk_query, query_error = build_filtered_query(asset_relation, chunk_filters)
+        if query_error:
+            return None, query_error
+        queries.append((chunk_query, None))
+
+    return queries, None
 
 # Determine filter parameters for the backend function
 # These are determined based on UI selections before the "Prepare" button is necessarily clicked,
@@ -683,20 +576,41 @@ club_config_to_filter = team_filterable_assets.get(asset_name) if available_club
 # Initialize session state for prepared data if not already present
 if 'data_prepared_for_download' not in st.session_state:
     st.session_state.data_prepared_for_download = False
-if 'excel_bytes_for_download' not in st.session_state:
-    st.session_state.excel_bytes_for_download = None
-if 'excel_filename_for_download' not in st.session_state:
-    st.session_state.excel_filename_for_download = ""
+if 'export_file_for_download' not in st.session_state:
+    st.session_state.export_file_for_download = None
+if 'export_filename_for_download' not in st.session_state:
+    st.session_state.export_filename_for_download = ""
+if 'export_mime_for_download' not in st.session_state:
+    st.session_state.export_mime_for_download = ""
+
+def clear_prepared_export():
+    """Release the prepared export file, if any"""
+    if st.session_state.export_file_for_download is not None:
+        st.session_state.export_file_for_download.close()
+    st.session_state.data_prepared_for_download = False
+    st.session_state.export_file_for_download = None
+    st.session_state.export_filename_for_download = ""
+    st.session_state.export_mime_for_download = ""
+
+EXPORT_FORMAT_LABELS = {
+    "Excel (.xlsx)": "xlsx",
+    "CSV (.csv)": "csv",
+    "Parquet (.parquet)": "parquet",
+}
+selected_export_format_label = st.selectbox("Export format:", list(EXPORT_FORMAT_LABELS.keys()))
+export_format = EXPORT_FORMAT_LABELS[selected_export_format_label]
+
+# The size of the asset is read from its column statistics, so showing it does not run a COUNT(*)
+asset_row_count = asset.row_count
+if asset_row_count is not None:
+    st.caption(f"{ASSET_DISPLAY_NAMES.get(asset_name, asset_name)} has {asset_row_count:,} rows before filters.")
+    if export_format == "xlsx" and asset_row_count > EXCEL_MAX_ROWS:
+        st.info("ℹ️ Without narrower filters, this export goes over the Excel worksheet row limit, so rows would be split across several worksheets.")
 
-# --- Button to trigger data loading and Excel preparation ---
+# --- Button to trigger data export preparation ---
 if st.button("Prepare Data for Download", key="prepare_data_button"):
     # Reset flags and data before attempting preparation
-    st.session_state.data_prepared_for_download = False
-    st.session_state.excel_bytes_for_download = None
-    st.session_state.excel_filename_for_download = ""
-    
-    # Force garbage collection before starting
-    gc.collect()
+    clear_prepared_export()
 
     # Prepare filters for DuckDB function based on current UI state
     filters_for_duckdb = {}
@@ -720,150 +634,103 @@ if st.button("Prepare Data for Download", key="prepare_data_button"):
         filters_for_duckdb["selected_clubs"] = selected_club_names_ui
         filters_for_duckdb["club_name_map"] = club_name_to_id
 
-    # Pre-check for large datasets to warn users
-    LARGE_DATASETS = ['cur_transfers', 'cur_appearances', 'cur_player_valuations']
-    if asset_name in LARGE_DATASETS and not filters_for_duckdb.get("date_filter_col") and not filters_for_duckdb.get("selected_clubs"):
-        st.warning(f"⚠️ {asset_name} is a large dataset. For better performance and stability, consider applying date or club filters before preparing data.")
-        if not st.checkbox(f"I understand - proceed with {asset_name} anyway", key=f"proceed_{asset_name}"):
-            st.info("Apply some filters above and try again, or check the box to proceed without filters.")
-            st.stop()
-
     with st.spinner("Preparing data... This may take a moment."):
         try:
-            result_info = load_data_with_duckdb(
-                asset, 
-                filters_for_duckdb
-            )
-        except Exception as e:
-            st.error(f"❌ Error loading data: {str(e)}")
-            st.info("This might be due to memory constraints. Try applying more filters to reduce the dataset size.")
-            gc.collect()
+            asset_relation = td.catalog.relation(asset_name)
+        except FileNotFoundError:
+            st.error(f"Data file not found: {get_asset_prep_path(asset)}")
             st.stop()
 
-        df_filtered = result_info['data']
-        query_executed = result_info['query']
-        error_message = result_info['error']
-        total_rows_available = result_info.get('total_rows_available', len(df_filtered))
+        query_executed, error_message = build_filtered_query(asset_relation, filters_for_duckdb)
+        partition_queries = None
+        if not error_message and filters_for_duckdb.get("date_range"):
+            start_date, end_date = filters_for_duckdb["date_range"]
+            # The bounds of the asset are only needed when the selected range could be split
+            if (end_date.year - start_date.year) > DATE_CHUNK_YEARS:
+                data_min_date, data_max_date, data_row_count = get_partitioning_bounds(asset, asset_relation, date_col_to_filter)
+                partition_queries, error_message = build_date_partitioned_queries(
+                    asset_relation,
+                    filters_for_duckdb,
+                    data_date_range=(data_min_date, data_max_date) if data_min_date is not None else None,
+                    row_count=data_row_count
+                )
 
         if error_message:
             st.error(error_message)
-            if query_executed: # Show query only if one was attempted and is not empty
-                st.code(query_executed, language='sql')
-        elif df_filtered.empty:
-            st.warning("No data matches the current filters. Please adjust filters and try preparing again.")
-            if query_executed:
-                st.code(query_executed, language='sql')
         else:
-            # Show info about data availability
-            if total_rows_available > len(df_filtered):
-                st.info(f"ℹ️ Found {total_rows_available:,} total rows, but limiting query to {len(df_filtered):,} rows for performance.")
-            
-            # Check data size to prevent memory issues in Streamlit Cloud
-            num_rows = len(df_filtered)
-            num_cols = len(df_filtered.columns)
-            estimated_size_mb = (num_rows * num_cols * 8) / (1024 * 1024)  # Rough estimate
-            
-            # Dataset-specific export limits for Streamlit Cloud stability
-            EXPORT_LIMITS = {
-                'cur_transfers': 20000,  # Very conservative for transfers
-                'cur_player_valuations': 20000,  # Conservative for valuations
-                'cur_appearances': 25000,  # Conservative for appearances
-                'default': 40000  # Default limit reduced from 50k
-            }
-            
-            MAX_ROWS_CLOUD = EXPORT_LIMITS.get(asset_name, EXPORT_LIMITS['default'])
-            if num_rows > MAX_ROWS_CLOUD:
-                st.warning(f"⚠️ Dataset is large ({num_rows:,} rows). For stability, limiting export to first {MAX_ROWS_CLOUD:,} rows for {asset_name}.")
-                df_filtered = df_filtered.head(MAX_ROWS_CLOUD)
-                num_rows = len(df_filtered)
-            
-            st.info(f"📊 Preparing {num_rows:,} rows × {num_cols} columns (est. {estimated_size_mb:.1f} MB)")
-            
             try:
-                # Data is good, prepare Excel with memory management
-                export_df = df_filtered.copy()
-                friendly_export_df_columns = [FRIENDLY_COLUMN_NAMES.get(col, col) for col in export_df.columns]
-                export_df.columns = friendly_export_df_columns
-
-                # Use memory-efficient Excel creation
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    export_df.to_excel(writer, index=False, sheet_name='Data')
-                
-                excel_bytes = output.getvalue()
-                output.close()  # Explicitly close BytesIO
-                
-                # Check file size before storing in session state
-                excel_size_mb = len(excel_bytes) / (1024 * 1024)
-                MAX_FILE_SIZE_MB = 100  # Maximum file size for Streamlit Cloud
-                
-                if excel_size_mb > MAX_FILE_SIZE_MB:
-                    del excel_bytes
-                    gc.collect()
-                    st.error(f"❌ Generated file is too large ({excel_size_mb:.1f} MB). Maximum allowed: {MAX_FILE_SIZE_MB} MB. Please apply more filters to reduce data size.")
+                if partition_queries:
+                    # Wide date ranges are split in chunks of years that are queried at the same
+                    # time, each on its own catalog cursor, and written to the file in date order
+                    progress_bar = st.progress(0, text=f"Querying {len(partition_queries)} date chunks in parallel...")
+                    export_file = export_partitions(
+                        td.catalog,
+                        partition_queries,
+                        format=export_format,
+                        column_names=FRIENDLY_COLUMN_NAMES,
+                        on_progress=lambda done, total: progress_bar.progress(done / total, text=f"Written chunk {done}/{total}")
+                    )
                 else:
-                    # Clean up intermediate dataframes
-                    del export_df
-                    del df_filtered
-                    gc.collect()
-                    
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    excel_filename = f"transfermarkt_{asset_name}_{timestamp}.xlsx"
-                    
-                    # Store in session state for download
-                    st.session_state.excel_bytes_for_download = excel_bytes
-                    st.session_state.excel_filename_for_download = excel_filename
-                    st.session_state.data_prepared_for_download = True
-                    
-                    st.success(f"✅ Data prepared successfully! {num_rows:,} rows ready for download (Excel file: {excel_size_mb:.1f} MB)")
-                
-            except MemoryError:
-                st.error("❌ Not enough memory to create Excel file. Try reducing the date range or applying more filters.")
-                gc.collect()
+                    # Results are streamed from DuckDB to a temporary file in batches, so memory
+                    # stays flat regardless of the number of rows exported
+                    export_file = export_query(
+                        td.catalog,
+                        query_executed,
+                        format=export_format,
+                        column_names=FRIENDLY_COLUMN_NAMES
+                    )
             except Exception as e:
-                st.error(f"❌ Error creating Excel file: {str(e)}")
-                gc.collect()
-            finally:
-                # Always clean up memory
-                gc.collect()
+                st.error(f"❌ Error creating export file: {str(e)}")
+                st.code(query_executed, language='sql')
+                st.stop()
+
+            if export_file.rows == 0:
+                export_file.close()
+                st.warning("No data matches the current filters. Please adjust filters and try preparing again.")
+                st.code(query_executed, language='sql')
+            else:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                extension = EXPORT_FORMATS[export_format]["extension"]
+
+                st.session_state.export_file_for_download = export_file
+                st.session_state.export_filename_for_download = f"transfermarkt_{asset_name}_{timestamp}.{extension}"
+                st.session_state.export_mime_for_download = EXPORT_FORMATS[export_format]["mime"]
+                st.session_state.data_prepared_for_download = True
+
+                if export_format == "xlsx" and export_file.rows > EXCEL_MAX_ROWS:
+                    st.info("ℹ️ The export goes over the Excel worksheet row limit, so rows are split across several worksheets.")
+
+                st.success(f"✅ Data prepared successfully! {export_file.rows:,} rows ready for download")
 
 # --- Download button section ---
 # This section is evaluated on every run. The download button appears if data is ready.
-if st.session_state.data_prepared_for_download and st.session_state.excel_bytes_for_download:
+if st.session_state.data_prepared_for_download and st.session_state.export_file_for_download is not None:
     try:
-        excel_size_mb = len(st.session_state.excel_bytes_for_download) / (1024 * 1024)
+        export_file = st.session_state.export_file_for_download
+        export_file.seek(0, os.SEEK_END)
+        export_size_mb = export_file.tell() / (1024 * 1024)
+        export_file.seek(0)
+
+        # The export is written to disk in batches, but Streamlit reads the whole file into memory
+        # to serve it, so the download step holds the export in memory once
         st.download_button(
-            label=f"📥 Download Excel File ({excel_size_mb:.1f} MB)",
-            data=st.session_state.excel_bytes_for_download,
-            file_name=st.session_state.excel_filename_for_download,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="final_download_excel_button",
-            help="Click to download the prepared Excel file"
+            label=f"📥 Download File ({export_size_mb:.1f} MB)",
+            data=export_file,
+            file_name=st.session_state.export_filename_for_download,
+            mime=st.session_state.export_mime_for_download,
+            key="final_download_button",
+            help="Click to download the prepared file"
         )
         
-        # Add a button to clear the prepared data to free memory
-        if st.button("🗑️ Clear Prepared Data", help="Free up memory by clearing the prepared Excel file"):
-            st.session_state.data_prepared_for_download = False
-            st.session_state.excel_bytes_for_download = None
-            st.session_state.excel_filename_for_download = ""
-            gc.collect()
-            st.success("✅ Prepared data cleared. Memory freed up.")
+        # Add a button to clear the prepared data
+        if st.button("🗑️ Clear Prepared Data", help="Remove the prepared export file"):
+            clear_prepared_export()
+            st.success("✅ Prepared data cleared.")
             st.rerun()
             
     except Exception as e:
         st.error(f"❌ Error with download: {str(e)}")
-        # Clear corrupted data
-        st.session_state.data_prepared_for_download = False
-        st.session_state.excel_bytes_for_download = None
-        st.session_state.excel_filename_for_download = ""
-        gc.collect()
+        clear_prepared_export()
         
-elif not st.session_state.data_prepared_for_download and not st.session_state.excel_bytes_for_download:
+elif not st.session_state.data_prepared_for_download:
     st.info("Select your dataset and filters, then click 'Prepare Data for Download'.")
-
-# Clean up memory periodically
-if 'cleanup_counter' not in st.session_state:
-    st.session_state.cleanup_counter = 0
-st.session_state.cleanup_counter += 1
-if st.session_state.cleanup_counter % 10 == 0:  # Every 10 page loads
-    gc.collect()
@@ -5,11 +5,15 @@ import subprocess
 from pathlib import Path
 from io import StringIO
 
+import pandas as pd
+
 from transfermarkt_datasets.core.dataset import Dataset
 from transfermarkt_datasets.core.asset import Asset
 
 # --- Constants ---
 CACHE_TTL_SECONDS = 60 * 60 * 24  # 24 hours
+# Memory budget for the assets data that is kept loaded at any given time (defaults to 1 GiB)
+PREP_CACHE_MAX_BYTES = int(os.getenv("PREP_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
 
 
 # --- Utility Functions ---
@@ -128,7 +132,7 @@ def check_and_pull_data():
     st.success("✅ All data files are available")
     return True
 
-@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner="Loading dataset...")
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, show_spinner="Loading dataset...")
 def load_td():
     """Load the dataset with proper error handling for both local and cloud environments."""
     
@@ -146,12 +150,12 @@ def load_td():
             base_path=str(project_root), 
             config_file=config_file_path,
             assets_root=str(project_root),
-            assets_relative_path="transfermarkt_datasets/assets"
+            assets_relative_path="transfermarkt_datasets/assets",
+            prep_cache_max_bytes=PREP_CACHE_MAX_BYTES
         )
         
-        # DO NOT load assets immediately - this causes memory issues
-        # Assets will be loaded on-demand when user requests data
-        # td.load_assets()  # REMOVED: This was loading all CSV files into memory
+        # Assets are loaded lazily when their prep_df is first accessed, and the least recently
+        # used ones are unloaded when the dataset goes over PREP_CACHE_MAX_BYTES
         
         # Verify key assets are available (just check they exist in the registry)
         if not td.assets:
@@ -212,3 +216,143 @@ def load_club_data(_dataset: Optional[str] = None):
     except Exception as e:
         st.error(f"❌ Failed to load club data: {str(e)}")
         return None
+
+
+def draw_dataset_er_diagram(image: str, caption: str) -> None:
+    """Draw the entity-relationship diagram of the dataset."""
+    image_path = get_project_root() / image
+    if image_path.exists():
+        st.image(str(image_path), caption=caption)
+
+
+def asset_stats(asset: Asset):
+    """Get the column statistics of an asset, or None if it was prepared without them.
+
+    Statistics are written along with the prepared files, so reading them doesn't scan the data.
+    """
+    try:
+        return asset.stats
+    except (OSError, ValueError):
+        return None
+
+
+def draw_asset(asset: Asset) -> None:
+    """Draw the description, size and columns of an asset."""
+    st.header(asset.frictionless_resource_name)
+
+    if asset.description:
+        st.markdown(asset.description)
+
+    stats = asset_stats(asset)
+    if stats is not None and not stats.empty:
+        left, right = st.columns(2)
+        left.metric("Rows", f"{asset.row_count:,}")
+        right.metric("Columns", len(stats))
+
+        # the schema sample values also come from the statistics, so drawing an asset is instant
+        schema = asset.schema_as_dataframe()
+        schema["nulls"] = stats["nulls"].reindex(schema.index)
+        schema["distinct values (approx.)"] = stats["distinct"].reindex(schema.index)
+        schema["min"] = stats["min"].reindex(schema.index)
+        schema["max"] = stats["max"].reindex(schema.index)
+        schema["sample_values"] = schema["sample_values"].map(
+            lambda values: ", ".join(str(value) for value in values)
+        )
+        st.dataframe(schema, use_container_width=True)
+    else:
+        # without statistics, only the schema is shown to avoid reading the whole asset
+        schema = pd.DataFrame(
+            data=dict(
+                description=[field.description for field in asset.schema.fields],
+                type=[field.type for field in asset.schema.fields]
+            ),
+            index=asset.schema.field_names
+        )
+        st.dataframe(schema, use_container_width=True)
+
+    st.markdown("---")
+
+
+def draw_dataset_index(td: Dataset) -> None:
+    """Draw a summary of the public assets in the dataset, with their sizes."""
+    st.subheader("Index")
+
+    rows = []
+    for asset_name, asset in td.assets.items():
+        if not asset.public:
+            continue
+        stats = asset_stats(asset)
+        rows.append({
+            "asset": asset.frictionless_resource_name,
+            "rows": asset.row_count if stats is not None else None,
+            "columns": len(asset.schema.fields),
+            "description": asset.description
+        })
+
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+def draw_asset_browser(td: Dataset, page_size: int = 50) -> None:
+    """Draw a paginated table of the rows of an asset, sorted and filtered on the dataset catalog.
+
+    Only the rows of the page on screen are fetched, so large assets are browsed at the same speed
+    as small ones. The cursors of the pages already visited are kept in the session state, to go
+    back to them.
+    """
+    st.subheader("Browse")
+
+    asset_names = [name for name, asset in td.assets.items() if asset.public]
+    asset_name = st.selectbox("Asset", options=asset_names, key="browse_asset")
+    asset = td.assets[asset_name]
+    field_names = asset.schema.field_names
+
+    left, middle, right = st.columns([2, 1, 1])
+    sort_by = left.selectbox("Sort by", options=field_names, key=f"browse_sort_{asset_name}")
+    descending = middle.checkbox("Descending", key=f"browse_descending_{asset_name}")
+    filters_count = right.number_input(
+        "Filters", min_value=0, max_value=5, value=0, key=f"browse_filters_{asset_name}"
+    )
+
+    filters = []
+    for i in range(int(filters_count)):
+        field_column, operator_column, value_column = st.columns(3)
+        field = field_column.selectbox("Column", options=field_names, key=f"browse_filter_field_{asset_name}_{i}")
+        operator = operator_column.selectbox(
+            "Operator", options=["==", "!=", "<", "<=", ">", ">=", "in"], key=f"browse_filter_operator_{asset_name}_{i}"
+        )
+        value = value_column.text_input(
+            "Value", key=f"browse_filter_value_{asset_name}_{i}", help="Separate values with commas for 'in'"
+        )
+        if value:
+            if operator == "in":
+                filters.append((field, operator, [item.strip() for item in value.split(",")]))
+            else:
+                filters.append((field, operator, value))
+
+    browser = td.browse(asset_name, sort_by=sort_by, descending=descending, filters=filters, page_size=page_size)
+
+    # going back to the first page when the sorting or the filters change
+    browse_state = (asset_name, sort_by, descending, tuple(map(str, filters)))
+    if st.session_state.get("browse_state") != browse_state:
+        st.session_state["browse_state"] = browse_state
+        st.session_state["browse_cursors"] = [None]
+    cursors = st.session_state["browse_cursors"]
+
+    try:
+        page, next_cursor = browser.page(after=cursors[-1])
+        rows = asset.row_count if not filters and asset_stats(asset) is not None else browser.count()
+    except Exception as e:
+        st.error(f"Unable to browse {asset_name}: {e}")
+        return
+
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    previous_column, position_column, next_column = st.columns([1, 3, 1])
+    first_row = (len(cursors) - 1) * page_size
+    position_column.caption(f"Rows {first_row + 1:,} to {first_row + len(page):,} of {rows:,}")
+    if previous_column.button("Previous", disabled=len(cursors) == 1, key="browse_previous"):
+        cursors.pop()
+        st.rerun()
+    if next_column.button("Next", disabled=next_cursor is None, key="browse_next"):
+        cursors.append(next_cursor)
+        st.rerun()
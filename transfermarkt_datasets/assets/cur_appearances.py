@@ -1,5 +1,3 @@
-from frictionless import checks
-
 import pandas as pd
 
 from transfermarkt_datasets.core.asset import Asset
@@ -19,7 +17,7 @@ class CurAppearancesAsset(Asset):
 
     self.schema = Schema(
       fields=[
-        Field(name="appearance_id", type="integer"),
+        Field(name="appearance_id", type="string"),
         Field(name="game_id", type="integer"),
         Field(name="player_id", type="integer"),
         Field(
@@ -34,7 +32,7 @@ class CurAppearancesAsset(Asset):
         ),
         Field(name="date", type="date", tags=["explore"]),
         Field(name="player_name", type="string", tags=["explore"]),
-        Field(name="competition_id", type="string"),
+        Field(name="competition_id", type="string", tags=["categorical"]),
         Field(name="yellow_cards", type="integer"),
         Field(name="red_cards", type="integer"),
         Field(name="goals", type="integer"),
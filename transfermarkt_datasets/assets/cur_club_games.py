@@ -1,6 +1,4 @@
 from typing import List
-from frictionless import checks
-
 from datetime import datetime
 
 import pandas as pd
@@ -49,6 +47,7 @@ class CurClubGamesAsset(Asset):
     self.schema.add_field(Field(
       name="hosting",
       type="string",
+      tags=["categorical"],
       description="'Home' if the game took place at the club home stadium and 'Away' if at its opponent stadium"
     ))
     self.schema.add_field(Field(
@@ -1,5 +1,3 @@
-from frictionless import checks
-
 from datetime import datetime
 
 import pandas as pd
@@ -24,7 +22,7 @@ class CurClubsAsset(Asset):
     self.schema.add_field(Field(name='club_id', type='integer'))
     self.schema.add_field(Field(name='club_code', type='string'))
     self.schema.add_field(Field(name='name', type='string'))
-    self.schema.add_field(Field(name='domestic_competition_id', type='string', tags=["explore"]))
+    self.schema.add_field(Field(name='domestic_competition_id', type='string', tags=["explore", "categorical"]))
     self.schema.add_field(Field(
         name='total_market_value',
         type='number',
@@ -52,7 +50,7 @@ class CurClubsAsset(Asset):
       description="Name of the raw file where the data came from."
       )
     )
-    self.schema.add_field(Field(name='last_season', type='date'))
+    self.schema.add_field(Field(name='last_season', type='integer'))
 
     self.schema.primary_key = ['club_id']
     self.schema.foreign_keys = [
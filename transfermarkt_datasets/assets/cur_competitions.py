@@ -1,5 +1,3 @@
-from frictionless import checks
-
 import pandas as pd
 
 from transfermarkt_datasets.core.asset import RawAsset
@@ -21,8 +19,8 @@ class CurCompetitionsAsset(RawAsset):
     self.schema.add_field(Field(name="competition_id", type="string"))
     self.schema.add_field(Field(name="competition_code", type="string"))
     self.schema.add_field(Field(name="name", type="string"))
-    self.schema.add_field(Field(name="type", type="string"))
-    self.schema.add_field(Field(name="sub_type", type="string"))
+    self.schema.add_field(Field(name="type", type="string", tags=["categorical"]))
+    self.schema.add_field(Field(name="sub_type", type="string", tags=["categorical"]))
     self.schema.add_field(Field(
       name="is_major_national_league",
       type="boolean",
@@ -30,9 +28,9 @@ class CurCompetitionsAsset(RawAsset):
       )
     )
     self.schema.add_field(Field(name="country_id", type="integer"))
-    self.schema.add_field(Field(name="country_name", type="string"))
+    self.schema.add_field(Field(name="country_name", type="string", tags=["categorical"]))
     self.schema.add_field(Field(name="domestic_league_code", type="string"))
-    self.schema.add_field(Field(name="confederation", type="string", tags=["explore"]))
+    self.schema.add_field(Field(name="confederation", type="string", tags=["explore", "categorical"]))
     self.schema.add_field(Field(
         name="url",
         type="string",
@@ -0,0 +1,39 @@
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class CurManagerPerformanceAsset(Asset):
+
+  name = "cur_manager_performance"
+  description = """
+  The `manager_performance` asset contains the number of games played and won by a club in a season, for each
+  of its managers and competition types. It is an aggregate of the `club_games` asset, joined to `games` and `clubs`.
+  """
+  file_name = "manager_performance.csv.gz"
+
+  def __init__(self, *args, **kwargs) -> None:
+    super().__init__(*args, **kwargs)
+
+    self.schema = Schema()
+
+    self.schema.add_field(Field(name='club_id', type='integer'))
+    self.schema.add_field(Field(name='season', type='integer'))
+    self.schema.add_field(Field(name='own_manager_name', type='string', tags=["explore"]))
+    self.schema.add_field(Field(name='competition_type', type='string', tags=["categorical"]))
+    self.schema.add_field(Field(name='club_name', type='string'))
+    self.schema.add_field(Field(name='club_domestic_competition_id', type='string', tags=["categorical"]))
+    self.schema.add_field(Field(
+      name='games',
+      type='integer',
+      description="Number of games played by the club with the manager in the season and competition type."
+    ))
+    self.schema.add_field(Field(
+      name='wins',
+      type='integer',
+      description="Number of those games that the club won."
+    ))
+
+    self.schema.primary_key = ["club_id", "season", "own_manager_name", "competition_type"]
+
+    self.schema.foreign_keys = [
+      {"fields": "club_id", "reference": {"resource": "cur_clubs", "fields": "club_id"}}
+    ]
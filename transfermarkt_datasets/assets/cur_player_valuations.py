@@ -1,5 +1,3 @@
-from frictionless import checks
-
 import pandas as pd
 
 from transfermarkt_datasets.core.asset import Asset
@@ -26,7 +24,7 @@ class CurPlayerValuationsAsset(Asset):
         Field(
           name='player_club_domestic_competition_id',
           type='string',
-          tags=["explore"]
+          tags=["explore", "categorical"]
         )
       ]
     )
@@ -1,5 +1,3 @@
-from frictionless import checks
-
 from transfermarkt_datasets.core.asset import RawAsset
 from transfermarkt_datasets.core.schema import Schema, Field
 
@@ -20,7 +18,7 @@ class CurTransfersAsset(RawAsset):
                 Field(name="player_id", type="integer"),
                 Field(name="player_name", type="string"),
                 Field(name="transfer_date", type="date"),
-                Field(name="transfer_season", type="string"),
+                Field(name="transfer_season", type="string", tags=["categorical"]),
                 Field(name="from_club_id", type="integer"),
                 Field(name="to_club_id", type="integer"),
                 Field(name="from_club_name", type="string", tags=["explore"]),
@@ -1,14 +1,32 @@
-from frictionless import Detector
-from frictionless.resource import Resource
 import pandas as pd
+import os
 import logging
 import logging.config
 
+from transfermarkt_datasets.core.index import (
+  KeyIndex,
+  fingerprint,
+  index_path,
+  load_index,
+  matching,
+  read_rows
+)
 from transfermarkt_datasets.core.schema import Schema
+from transfermarkt_datasets.core.search import NameIndex, load_name_index, search_index_path
+from transfermarkt_datasets.core.stats import STATS_FILE_SUFFIX, read_stats
+from transfermarkt_datasets.core.validation import ValidationReport, validate
+
+from typing import TYPE_CHECKING, List, Optional
+
+# frictionless is only needed to export the asset as a resource, so it is imported on demand
+if TYPE_CHECKING:
+  from frictionless.resource import Resource
 
 from transfermarkt_datasets.core.utils import (
   read_config,
-  get_sample_values
+  get_sample_values,
+  filters_mask,
+  Filter
 )
 
 class FailedAssetValidation(Exception):
@@ -30,6 +48,10 @@ class Asset:
     base_path: str = None) -> None:
 
       self._prep_df = None
+      self._stats = None
+      self._indexes = {}
+      self._name_indexes = {}
+      self.cache = None
       self.settings = settings
       self.log = logging.getLogger("main")
       
@@ -52,6 +74,14 @@ class Asset:
 
   @property
   def prep_df(self):
+    """The prepared dataset as a pandas dataframe.
+    It is loaded from the local prepared files on first access, if they exist.
+    """
+    if self._prep_df is None and self.has_prep_file:
+      self.load_from_prep()
+    elif self.cache is not None:
+      self.cache.touch(self)
+
     return self._prep_df
 
   @prep_df.setter
@@ -75,6 +105,20 @@ class Asset:
     field_names = self.schema.field_names
     self._prep_df = df[field_names]
 
+    if self.cache is not None:
+      self.cache.add(self)
+
+  @property
+  def prep_df_loaded(self) -> bool:
+    return self._prep_df is not None
+
+  def unload(self) -> None:
+    """Release the prepared dataframe from memory. It will be loaded again on next access.
+    """
+    self._prep_df = None
+    if self.cache is not None:
+      self.cache.discard(self)
+
   @property
   def file_name(self) -> str:
     return self.name + ".csv.gz"
@@ -83,20 +127,373 @@ class Asset:
   def file_name_uncompressed(self) -> str:
     return self.file_name.replace(".gz", "")
   
+  @property
+  def file_name_parquet(self) -> str:
+    return self.file_name_uncompressed.replace(".csv", ".parquet")
+
+  @property
+  def file_name_stats(self) -> str:
+    return self.file_name_uncompressed.replace(".csv", STATS_FILE_SUFFIX)
+
   @property
   def prep_path(self) -> str:
     return f"{self.prep_location}/{self.file_name}"
 
+  @property
+  def prep_parquet_path(self) -> str:
+    return f"{self.prep_location}/{self.file_name_parquet}"
+
+  @property
+  def has_prep_parquet(self) -> bool:
+    return os.path.exists(self.prep_parquet_path)
+
+  @property
+  def has_prep_file(self) -> bool:
+    return self.has_prep_parquet or os.path.exists(self.prep_path)
+
+  @property
+  def stats_path(self) -> str:
+    return f"{self.prep_location}/{self.file_name_stats}"
+
+  @property
+  def stats(self) -> Optional[pd.DataFrame]:
+    """The column statistics written along with the prepared files (see `core.stats`), indexed
+    by column name. They are None if the asset was prepared without them.
+    """
+    if not os.path.exists(self.stats_path):
+      return None
+
+    mtime = os.stat(self.stats_path).st_mtime_ns
+    if self._stats is None or self._stats[0] != mtime:
+      self._stats = (mtime, read_stats(self.stats_path))
+
+    return self._stats[1]
+
+  @property
+  def row_count(self) -> Optional[int]:
+    """Number of rows in the prepared asset, from the column statistics."""
+    stats = self.stats
+    if stats is None or stats.empty:
+      return None
+    return int(stats["rows"].iloc[0])
+
+  @property
+  def index_location(self) -> str:
+    # indexes are derived from the prepared files and kept out of data/prep, which is published
+    return os.path.join(os.path.dirname(self.prep_location), "index")
+
+  @property
+  def indexed_fields(self) -> List[str]:
+    """The fields that support point lookups: primary key fields and foreign key fields."""
+    fields = list(self.schema.primary_key)
+    for foreign_key in self.schema.foreign_keys:
+      key_fields = foreign_key["fields"]
+      for name in [key_fields] if isinstance(key_fields, str) else key_fields:
+        if name not in fields:
+          fields.append(name)
+    return fields
+
+  def index(self, field_name: str) -> KeyIndex:
+    """Get the index of a key field, which maps its values to row positions.
+
+    With a Parquet export, the index is built from the key column alone and persisted to
+    `data/index` until the Parquet file changes. Otherwise it is built from the prepared dataframe,
+    which has to be loaded, and it is only kept in memory.
+
+    Args:
+        field_name (str): The name of the field, one of `indexed_fields`.
+
+    Returns:
+        KeyIndex: The index of the field.
+    """
+    if field_name not in self.indexed_fields:
+      raise InvalidPreparedDF(
+        f"{self.name}: {field_name} is not a key field, indexed fields are {self.indexed_fields}"
+      )
+
+    index = self._indexes.get(field_name)
+    if self.has_prep_parquet:
+      if index is None or index.source_fingerprint != fingerprint(self.prep_parquet_path):
+        index = load_index(
+          self.prep_parquet_path,
+          index_path(self.index_location, self.name, field_name),
+          field_name,
+          self.log
+        )
+    elif index is None:
+      index = KeyIndex.from_values(self.prep_df[field_name])
+
+    self._indexes[field_name] = index
+    return index
+
+  def rows_for(self, columns: Optional[List[str]] = None, **keys) -> pd.DataFrame:
+    """Get the rows that hold some key values, without loading the whole asset.
+
+    The rows are found with the index of one of the key fields, and only the Parquet row groups
+    that hold them are read. For example, `rows_for(club_id=131)` or `rows_for(player_id=[1, 2])`.
+
+    Args:
+        columns (List[str], optional): Names of the columns to be read. Defaults to all columns.
+        **keys: Values of key fields, either a single value or a list of values. Rows must match
+          all of them.
+
+    Returns:
+        pd.DataFrame: The matching rows, in file order.
+    """
+    if not keys:
+      raise InvalidPreparedDF(f"{self.name}: rows_for requires at least one key field")
+
+    unknown_fields = (set(keys) | set(columns or [])) - set(self.schema.field_names)
+    if unknown_fields:
+      raise InvalidPreparedDF(
+        f"{self.name}: columns are not part of the schema: {unknown_fields}"
+      )
+
+    indexed_keys = [name for name in keys if name in self.indexed_fields]
+    if not indexed_keys:
+      raise InvalidPreparedDF(
+        f"{self.name}: none of {list(keys)} is a key field, indexed fields are {self.indexed_fields}"
+      )
+
+    lookup_field = indexed_keys[0]
+    index = self.index(lookup_field)
+    positions = index.positions(keys[lookup_field])
+
+    if self.has_prep_parquet:
+      read_columns = None
+      if columns:
+        read_columns = columns + [name for name in keys if name not in columns]
+      df = self.apply_schema_dtypes(
+        read_rows(self.prep_parquet_path, index, positions, read_columns).to_pandas()
+      )
+    else:
+      df = self.prep_df.iloc[positions]
+
+    for name, values in keys.items():
+      if name != lookup_field:
+        df = df[matching(df, name, values)]
+
+    return df[columns or self.schema.field_names].reset_index(drop=True)
+
+  def get(self, **keys) -> Optional[pd.Series]:
+    """Get the row with a primary key, for example `get(player_id=28003)`.
+
+    Args:
+        **keys: The value of each of the primary key fields.
+
+    Returns:
+        pd.Series: The row, or None if there is no row with that primary key.
+    """
+    if set(keys) != set(self.schema.primary_key):
+      raise InvalidPreparedDF(
+        f"{self.name}: get requires the primary key fields {self.schema.primary_key}"
+      )
+
+    rows = self.rows_for(**keys)
+    if rows.empty:
+      return None
+    return rows.iloc[0]
+
+  def name_index(self, field_name: str = "name") -> NameIndex:
+    """Get the trigram index of a text field, for fuzzy searches on it.
+
+    The index is built from the primary key and the text field, and persisted to `data/index`
+    until the prepared file changes.
+
+    Args:
+        field_name (str, optional): The name of the text field. Defaults to "name".
+
+    Returns:
+        NameIndex: The index of the field.
+    """
+    if len(self.schema.primary_key) != 1:
+      raise InvalidPreparedDF(f"{self.name}: name indexes require a single field primary key")
+    if field_name not in self.schema.field_names:
+      raise InvalidPreparedDF(f"{self.name}: {field_name} is not part of the schema")
+
+    source_path = self.prep_parquet_path if self.has_prep_parquet else self.prep_path
+    index = self._name_indexes.get(field_name)
+    if index is None or index.source_fingerprint != fingerprint(source_path):
+      key_field = self.schema.primary_key[0]
+      df = self.load_from_prep(columns=[key_field, field_name])
+      index = load_name_index(
+        source_path,
+        search_index_path(self.index_location, self.name, field_name),
+        df[key_field],
+        df[field_name],
+        self.log
+      )
+      self._name_indexes[field_name] = index
+
+    return index
+
+  def search(self, query: str, k: int = 10, field_name: str = "name") -> pd.DataFrame:
+    """Find the rows whose text field best matches a query, for example the players named like
+    "mbappe". Words that start with the query rank first, so it works for typing ahead.
+
+    Args:
+        query (str): The text to search for.
+        k (int, optional): The maximum number of matches. Defaults to 10.
+        field_name (str, optional): The name of the text field. Defaults to "name".
+
+    Returns:
+        pd.DataFrame: The primary key, the text field and the "score" of the best matches, best first.
+    """
+    matches = self.name_index(field_name).search(query, k)
+    return matches.rename(columns={"key": self.schema.primary_key[0], "name": field_name})
+
   @property
   def frictionless_resource_name(self) -> str:
     return self.file_name_uncompressed.replace(".csv", "")
 
-  def load_from_prep(self):
+  def load_from_prep(
+    self,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[Filter]] = None) -> pd.DataFrame:
     """Load prepared dataset from the local to a pandas dataframe.
+
+    The Parquet export is preferred if present, as it is already typed and avoids
+    decompressing and parsing the whole CSV file. In both cases, column types are
+    driven by the asset schema instead of being inferred from the data.
+
+    A projection of columns and a set of row predicates can be passed in order to read
+    only a slice of the asset. With Parquet files these are pushed down to the reader,
+    so that row groups that do not match the predicates are not read at all. With CSV
+    files, the file is read in chunks that are filtered as they come. Sliced reads are
+    returned and do not replace the asset `prep_df`.
+
+    Args:
+        columns (List[str], optional): Names of the columns to be read. Defaults to all columns.
+        filters (List[Filter], optional): Row predicates in (column, operator, value) form,
+          for example [("season", ">=", 2020)]. Defaults to no filtering.
+
+    Returns:
+        pd.DataFrame: The loaded asset data.
     """
-    self.prep_df = pd.read_csv(
-      filepath_or_buffer=self.prep_path
+    if columns:
+      unknown_columns = set(columns) - set(self.schema.field_names)
+      if unknown_columns:
+        raise InvalidPreparedDF(
+          f"{self.name}: columns are not part of the schema: {unknown_columns}"
+        )
+
+    if self.has_prep_parquet:
+      df = pd.read_parquet(
+        path=self.prep_parquet_path,
+        columns=columns,
+        filters=filters or None
+      )
+      df = self.apply_schema_dtypes(df)
+    else:
+      df = self._read_prep_csv(columns, filters)
+
+    if columns is None and not filters:
+      self.prep_df = df
+      return self._prep_df
+    elif columns:
+      return df[columns]
+    else:
+      return df
+
+  def _read_prep_csv(
+    self,
+    columns: Optional[List[str]],
+    filters: Optional[List[Filter]],
+    chunksize: int = 250000) -> pd.DataFrame:
+
+    read_columns = list(columns) if columns else list(self.schema.field_names)
+    filter_columns = [column for column, _, _ in (filters or [])]
+    read_columns += [column for column in filter_columns if column not in read_columns]
+
+    dtypes = {
+      name: dtype
+      for name, dtype in self.schema.pandas_dtypes.items()
+      if name in read_columns
+    }
+    parse_dates = [
+      name for name in self.schema.date_field_names if name in read_columns
+    ]
+
+    if not filters:
+      return pd.read_csv(
+        filepath_or_buffer=self.prep_path,
+        usecols=columns,
+        dtype=dtypes,
+        parse_dates=parse_dates
+      )
+
+    chunks = []
+    reader = pd.read_csv(
+      filepath_or_buffer=self.prep_path,
+      usecols=read_columns,
+      dtype=dtypes,
+      parse_dates=parse_dates,
+      chunksize=chunksize
     )
+    with reader:
+      for chunk in reader:
+        chunks.append(
+          chunk.loc[filters_mask(chunk, filters), columns or chunk.columns]
+        )
+
+    if not chunks:
+      return pd.DataFrame(columns=columns or read_columns)
+
+    df = pd.concat(chunks, ignore_index=True)
+    # categories are inferred per chunk, so make them uniform after the concat
+    return self.apply_schema_dtypes(df)
+
+  def apply_schema_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+    """Cast the columns of a dataframe to the types defined in the asset schema.
+
+    Args:
+        df (pd.DataFrame): The dataframe to be casted.
+
+    Returns:
+        pd.DataFrame: A dataframe with schema types.
+    """
+    dtypes = {
+      name: dtype
+      for name, dtype in self.schema.pandas_dtypes.items()
+      if name in df.columns
+    }
+    df = df.astype(dtypes)
+
+    for name in self.schema.date_field_names:
+      if name in df.columns:
+        df[name] = pd.to_datetime(df[name])
+
+    return df
+
+  def validate(
+    self,
+    df: Optional[pd.DataFrame] = None,
+    raise_exception: bool = True) -> ValidationReport:
+    """Validate the asset data against its schema: field types and formats, required fields
+    and primary key uniqueness.
+
+    Args:
+        df (pd.DataFrame, optional): The data to be validated. Defaults to the prepared file, read
+          as it is on disk (without casting to the schema types, which would hide type errors).
+        raise_exception (bool, optional): Raise if any check fails. Defaults to True.
+
+    Raises:
+        FailedAssetValidation: If any check fails and `raise_exception` is set.
+
+    Returns:
+        ValidationReport: The validation report.
+    """
+    if df is None:
+      if self.has_prep_parquet:
+        df = pd.read_parquet(self.prep_parquet_path)
+      else:
+        df = pd.read_csv(self.prep_path, dtype="string")
+
+    report = validate(df, self.schema)
+    if not report.valid and raise_exception:
+      raise FailedAssetValidation(f"{self.name}: {report}")
+
+    return report
 
   def load_from_stage(self):
     self.prep_df = pd.read_csv(
@@ -119,10 +516,16 @@ class Asset:
     fields = [field.name for field in  self.schema.fields]
     types = [field.type for field in  self.schema.fields]
     descriptions = [field.description for field in  self.schema.fields]
-    sample_values = [
-      get_sample_values(self.prep_df, field.name, 3)
-      for field in self.schema.fields
-    ]
+
+    # sample values come from the column statistics if there are any, so the asset is not loaded
+    stats = self.stats
+    if stats is not None and set(fields) <= set(stats.index):
+      sample_values = [stats.at[field, "sample_values"] for field in fields]
+    else:
+      sample_values = [
+        get_sample_values(self.prep_df, field.name, 3)
+        for field in self.schema.fields
+      ]
 
     df = pd.DataFrame(
       data=dict(
@@ -135,7 +538,9 @@ class Asset:
     
     return df
 
-  def as_frictionless_resource(self) -> Resource:
+  def as_frictionless_resource(self) -> "Resource":
+    from frictionless import Detector
+    from frictionless.resource import Resource
 
     detector = Detector(schema_sync=True)
     resource = Resource(
@@ -152,44 +557,113 @@ class RawAsset(Asset):
 
   raw_file_name = None
 
-  def __init__(self, settings: dict = None) -> None:
-    super().__init__(settings)
+  def __init__(self, settings: dict = None, base_path: str = None) -> None:
+    super().__init__(settings, base_path)
 
     self.raw_df = None
-    self.raw_files_path = "data/raw/transfermarkt-scraper"
+    if base_path:
+      self.raw_location = base_path
+    else:
+      self.raw_location = "."
+    self.raw_files_path = f"{self.raw_location}/data/raw/transfermarkt-scraper"
 
     if not self.raw_file_name:
       file_name = self.name.replace("base_", "")
       self.raw_file_name = file_name + ".json.gz"
 
-  def load_raw(self):
-
-    raw_dfs = []
+  def _read_raw_file(self, path: str, season: Optional[int] = None):
+    """Read a raw data file into an Arrow table, or into a dataframe if its fields have mixed types."""
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+
+    self.log.debug("Reading raw data from %s", path)
+    try:
+      table = pa_json.read_json(path)
+    except pa.ArrowInvalid as e:
+      if "Empty JSON file" in str(e):
+        return None
+      # types are inferred from the first block of the file, so a field that changes type further
+      # down (a number in some rows and a string in others) is read with pandas instead
+      self.log.warning("Falling back to reading %s with pandas: %s", path, e)
+      df = pd.read_json(path, lines=True)
+      if season is not None:
+        df["season"] = season
+        df["season_file"] = path
+      return df
 
-    if "competitions" in self.raw_file_name:
-        df = pd.read_json(
-          f"data/competitions.json",
-          lines=True,
-          convert_dates=True,
-          orient={'index', 'date'}
+    if season is not None:
+      rows = table.num_rows
+      table = table.append_column(
+        "season", pa.array(np.full(rows, season, dtype=np.int64))
+      )
+      # the file name is the same for all rows, so it is stored once in a dictionary
+      table = table.append_column(
+        "season_file",
+        pa.DictionaryArray.from_arrays(
+          pa.array(np.zeros(rows, dtype=np.int32)), pa.array([path])
         )
-        raw_dfs.append(df)
-    else:
-      seasons = read_config()["defintions"]["seasons"]
-      for season in seasons:
+      )
 
-        season_file = f"{self.raw_files_path}/{season}/{self.raw_file_name}"
+    return table
 
-        self.log.debug("Reading raw data from %s", season_file)
-        df = pd.read_json(
-          season_file,
-          lines=True,
-          convert_dates=True,
-          orient={'index', 'date'}
-        )
-        df["season"] = season
-        df["season_file"] = season_file
-        if len(df) > 0:
-          raw_dfs.append(df)
+  @staticmethod
+  def _concat_tables(tables: list):
+    import pyarrow as pa
 
-    self.raw_df = pd.concat(raw_dfs, axis=0)
+    try:
+      return pa.concat_tables(tables, promote_options="permissive")
+    except TypeError:
+      # pyarrow < 14
+      return pa.concat_tables(tables, promote=True)
+
+  def load_raw(self, seasons: Optional[List[int]] = None, max_workers: Optional[int] = None) -> None:
+    """Load the raw data files of the asset into the `raw_df` dataframe.
+
+    Season files are parsed concurrently with the Arrow JSON reader, which releases the GIL and
+    parses each file in blocks across threads itself, and the resulting tables are concatenated
+    without copying their data. Types are inferred by the reader, and fields that only show up
+    in some seasons, or nested objects with different keys, are merged into a common schema.
+
+    Args:
+        seasons (List[int], optional): Seasons to be loaded. Defaults to all seasons in the config.
+        max_workers (int, optional): Number of files parsed at the same time. Defaults to the
+          number of files, up to 8.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import pyarrow as pa
+
+    if "competitions" in self.raw_file_name:
+      files = [(f"{self.raw_location}/data/competitions.json", None)]
+    else:
+      seasons = seasons or read_config()["defintions"]["seasons"]
+      files = [
+        (f"{self.raw_files_path}/{season}/{self.raw_file_name}", season)
+        for season in seasons
+      ]
+
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(files), 8)) as executor:
+      tables = [
+        table
+        for table in executor.map(lambda file: self._read_raw_file(*file), files)
+        if table is not None and len(table) > 0
+      ]
+
+    if not tables:
+      self.raw_df = pd.DataFrame()
+      return
+
+    if any(isinstance(table, pd.DataFrame) for table in tables):
+      # some files were read with pandas, as they have fields with mixed types
+      self.raw_df = pd.concat(
+        [table if isinstance(table, pd.DataFrame) else table.to_pandas() for table in tables],
+        axis=0
+      )
+      return
+
+    try:
+      self.raw_df = self._concat_tables(tables).to_pandas()
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+      # a field has incompatible types across seasons (a number in some and a string in others)
+      self.log.warning("Falling back to concatenating %s raw data in pandas: %s", self.name, e)
+      self.raw_df = pd.concat([table.to_pandas() for table in tables], axis=0)
@@ -0,0 +1,166 @@
+"""Paginated browsing of an asset, sorted and filtered in the catalog.
+
+Pages are fetched with keyset pagination: the rows are sorted by the sort field followed by the
+primary key of the asset, and each page starts right after the sort key of the last row of the
+previous page. Unlike paging with OFFSET, fetching a page never goes through the rows of the
+pages before it, so every page of a large asset like `cur_appearances` takes the same time and
+only the rows of that page are read into memory.
+"""
+from typing import Any, List, Optional, Tuple
+
+import pandas as pd
+
+from transfermarkt_datasets.core.catalog import Catalog
+from transfermarkt_datasets.core.mart import _parameter, predicate
+from transfermarkt_datasets.core.utils import FILTER_OPERATORS, Filter
+
+# the sort key of the last row of a page, to fetch the page that comes after it
+Cursor = Tuple[Any, ...]
+
+DEFAULT_PAGE_SIZE = 50
+
+class InvalidBrowser(Exception):
+  pass
+
+class AssetBrowser:
+  """The pages of an asset, sorted by one of its fields and filtered.
+
+  Args:
+      catalog (Catalog): The catalog holding the asset.
+      asset_name (str): The name of the asset.
+      sort_by (str, optional): The field the rows are sorted by. Defaults to the primary key.
+      descending (bool, optional): Sort the rows in descending order. Defaults to False.
+      filters (List[Filter], optional): Predicates on the fields of the asset in (field, operator,
+        value) form. They are combined with AND, and values are casted to the type of the field.
+      columns (List[str], optional): The fields in the pages. Defaults to all fields.
+      page_size (int, optional): The number of rows in a page. Defaults to 50.
+  """
+
+  def __init__(
+    self,
+    catalog: Catalog,
+    asset_name: str,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filters: Optional[List[Filter]] = None,
+    columns: Optional[List[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE) -> None:
+
+    asset = catalog.assets.get(asset_name)
+    if asset is None:
+      raise InvalidBrowser(f"Asset {asset_name} is not in the dataset")
+
+    self.catalog = catalog
+    self.asset_name = asset_name
+    self.descending = descending
+    self.page_size = page_size
+    self.types = asset.schema.duckdb_types
+
+    field_names = asset.schema.field_names
+    self.columns = list(columns) if columns else field_names
+    self.filters = list(filters or [])
+    for field, operator, _ in self.filters:
+      if operator not in FILTER_OPERATORS:
+        raise InvalidBrowser(f"Unsupported filter operator '{operator}'. Use one of {FILTER_OPERATORS}")
+      if field not in field_names:
+        raise InvalidBrowser(f"{field} is not a field of {asset_name}")
+
+    # the primary key breaks ties between rows with the same sort value, so that every row
+    # has a distinct sort key and rows are neither skipped nor repeated across pages
+    primary_key = asset.schema.primary_key or field_names
+    self.sort_key = list(dict.fromkeys(([sort_by] if sort_by else []) + list(primary_key)))
+    for field in self.columns + self.sort_key:
+      if field not in field_names:
+        raise InvalidBrowser(f"{field} is not a field of {asset_name}")
+
+  def _placeholder(self, field: str) -> str:
+    return f"CAST(? AS {self.types[field]})"
+
+  def _where(self, parameters: list) -> List[str]:
+    return [
+      predicate(field, operator, value, parameters, self._placeholder(field))
+      for field, operator, value in self.filters
+    ]
+
+  def _after(self, cursor: Cursor, parameters: list) -> str:
+    # rows come after the cursor if they are equal to it up to some field of the sort key and
+    # after it on that field. Nulls are sorted last, so nothing comes after a null on a field.
+    alternatives = []
+    for position, field in enumerate(self.sort_key):
+      value = cursor[position]
+      if value is None:
+        continue
+
+      conditions = []
+      for previous_field, previous_value in zip(self.sort_key[:position], cursor[:position]):
+        if previous_value is None:
+          conditions.append(f'"{previous_field}" IS NULL')
+        else:
+          parameters.append(_parameter(previous_value))
+          conditions.append(f'"{previous_field}" = {self._placeholder(previous_field)}')
+
+      comparison = "<" if self.descending and position == 0 else ">"
+      parameters.append(_parameter(value))
+      conditions.append(
+        f'("{field}" {comparison} {self._placeholder(field)} OR "{field}" IS NULL)'
+      )
+      alternatives.append("(" + " AND ".join(conditions) + ")")
+
+    return "(" + " OR ".join(alternatives) + ")" if alternatives else "false"
+
+  def compile(self, after: Optional[Cursor] = None) -> Tuple[str, list]:
+    """Compile the query of the page that comes after a cursor. One more row than the page size
+    is fetched, to find out whether there is a next page.
+
+    Returns:
+        Tuple[str, list]: The query and its parameters.
+    """
+    parameters = []
+    predicates = self._where(parameters)
+    if after is not None:
+      predicates.append(self._after(tuple(_none_if_missing(value) for value in after), parameters))
+
+    select = ", ".join(f'"{field}"' for field in dict.fromkeys(self.columns + self.sort_key))
+    where = f" WHERE {' AND '.join(predicates)}" if predicates else ""
+    order = ", ".join(
+      f'"{field}" {"DESC" if self.descending and position == 0 else "ASC"} NULLS LAST'
+      for position, field in enumerate(self.sort_key)
+    )
+
+    query = (
+      f"SELECT {select} FROM {self.catalog.relation(self.asset_name)}{where} "
+      f"ORDER BY {order} LIMIT {int(self.page_size) + 1}"
+    )
+    return query, parameters
+
+  def page(self, after: Optional[Cursor] = None) -> Tuple[pd.DataFrame, Optional[Cursor]]:
+    """Get a page of rows.
+
+    Args:
+        after (Cursor, optional): The cursor returned with the previous page. Defaults to the first page.
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[Cursor]]: The rows of the page and the cursor of the next
+          page, which is None on the last page.
+    """
+    query, parameters = self.compile(after)
+    df = self.catalog.query(query, parameters)
+
+    next_cursor = None
+    if len(df) > self.page_size:
+      df = df.head(self.page_size)
+      next_cursor = tuple(_none_if_missing(value) for value in df.iloc[-1][self.sort_key])
+
+    return df[self.columns].reset_index(drop=True), next_cursor
+
+  def count(self) -> int:
+    """Count the rows that match the filters."""
+    parameters = []
+    predicates = self._where(parameters)
+    where = f" WHERE {' AND '.join(predicates)}" if predicates else ""
+    return self.catalog.execute(
+      f"SELECT count(*) FROM {self.catalog.relation(self.asset_name)}{where}", parameters
+    ).fetchone()[0]
+
+def _none_if_missing(value: Any) -> Any:
+  return None if not isinstance(value, (list, tuple)) and pd.isna(value) else value
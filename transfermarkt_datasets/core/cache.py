@@ -0,0 +1,79 @@
+"""Memory bookkeeping for the prepared dataframes of a dataset's assets.
+"""
+from collections import OrderedDict
+import logging
+import threading
+from typing import Dict, List, Optional
+
+class PrepDataCache:
+  """Track the assets that hold a prepared dataframe in memory and evict the least recently
+  used ones when their combined size goes over a byte budget.
+
+  Assets register themselves in the cache when their `prep_df` is loaded and touch it every time
+  it is accessed, so evicted assets are transparently reloaded on their next access.
+
+  Args:
+      max_bytes (int, optional): Memory budget for all loaded dataframes. Defaults to no limit.
+  """
+
+  def __init__(self, max_bytes: Optional[int] = None) -> None:
+    self.max_bytes = max_bytes
+    self.log = logging.getLogger("main")
+
+    self._entries: "OrderedDict[str, int]" = OrderedDict()
+    self._assets: Dict[str, object] = {}
+    self._lock = threading.RLock()
+
+  @property
+  def current_bytes(self) -> int:
+    return sum(self._entries.values())
+
+  @property
+  def asset_names(self) -> List[str]:
+    """Names of the assets currently in the cache, from least to most recently used."""
+    return list(self._entries.keys())
+
+  def add(self, asset) -> None:
+    """Register an asset that has just loaded its prepared dataframe and evict other assets
+    if needed to get back under the budget. The asset being added is never evicted.
+    """
+    nbytes = int(asset._prep_df.memory_usage(deep=True).sum())
+
+    with self._lock:
+      self._entries[asset.name] = nbytes
+      self._assets[asset.name] = asset
+      self._entries.move_to_end(asset.name)
+
+      if self.max_bytes is None:
+        return
+
+      for name in list(self._entries.keys()):
+        if self.current_bytes <= self.max_bytes or name == asset.name:
+          break
+        self.evict(name)
+
+  def touch(self, asset) -> None:
+    """Mark an asset as the most recently used one."""
+    with self._lock:
+      if asset.name in self._entries:
+        self._entries.move_to_end(asset.name)
+
+  def discard(self, asset) -> None:
+    """Forget about an asset without unloading it."""
+    with self._lock:
+      self._entries.pop(asset.name, None)
+      self._assets.pop(asset.name, None)
+
+  def evict(self, name: str) -> None:
+    """Unload the prepared dataframe of an asset and remove it from the cache."""
+    with self._lock:
+      nbytes = self._entries.pop(name, None)
+      asset = self._assets.pop(name, None)
+
+    if asset is not None:
+      self.log.debug("Evicting %s from the prep data cache (%s bytes)", name, nbytes)
+      asset.unload()
+
+  def clear(self) -> None:
+    for name in self.asset_names:
+      self.evict(name)
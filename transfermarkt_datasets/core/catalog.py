@@ -0,0 +1,285 @@
+"""A DuckDB catalog over the prepared files of a dataset.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+
+if TYPE_CHECKING:
+  import pyarrow as pa
+
+class AssetNotInCatalog(Exception):
+  pass
+
+class Catalog:
+  """A persistent DuckDB database where every asset in the dataset is exposed as a typed relation
+  that can be queried with SQL.
+
+  Assets are registered once, on first use, and the registration is kept in the database file
+  across runs until the underlying prepared file changes.
+    * Assets that have a Parquet export are registered as views over the Parquet file, so they
+      don't take any space in the database and queries benefit from predicate pushdown.
+    * Assets that only have the CSV export are loaded into a table, so that the file is
+      decompressed and parsed only once.
+
+  In both cases, columns are casted to the types defined in the asset schema.
+
+  All queries go through a single database connection. Each thread gets its own cursor on
+  that connection, as DuckDB connections must not be shared across threads.
+
+  Args:
+      assets (Dict[str, Asset]): The assets to be exposed in the catalog, by name.
+      database_path (str, optional): Path to the DuckDB database file. Defaults to an in-memory database.
+  """
+
+  def __init__(
+    self,
+    assets: Dict[str, Asset],
+    database_path: Optional[str] = None) -> None:
+
+    self.assets = assets
+    self.database_path = database_path or ":memory:"
+    self.log = logging.getLogger("main")
+
+    self._connection = None
+    self._registered: Dict[str, str] = {}
+    self._lock = threading.RLock()
+    self._local = threading.local()
+
+  @property
+  def connection(self):
+    """The DuckDB connection of the catalog, which is opened on first use.
+    If the database file cannot be opened (for example, because it is locked by another process
+    or the location is read-only) the catalog falls back to an in-memory database.
+    """
+    with self._lock:
+      if self._connection is None:
+        import duckdb
+
+        try:
+          if self.database_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.database_path)), exist_ok=True)
+          self._connection = duckdb.connect(database=self.database_path)
+        except (duckdb.IOException, OSError) as e:
+          self.log.warning(
+            "Unable to open catalog database %s, falling back to memory: %s",
+            self.database_path, e
+          )
+          self.database_path = ":memory:"
+          self._connection = duckdb.connect(database=":memory:")
+
+        self._connection.execute("""
+          CREATE TABLE IF NOT EXISTS _catalog_sources (
+            name VARCHAR PRIMARY KEY,
+            source_path VARCHAR,
+            fingerprint VARCHAR
+          )
+        """)
+
+      return self._connection
+
+  def cursor(self):
+    """Get the DuckDB cursor for the current thread.
+    """
+    cursor = getattr(self._local, "cursor", None)
+    if cursor is None:
+      cursor = self.connection.cursor()
+      self._local.cursor = cursor
+    return cursor
+
+  @staticmethod
+  def _fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+  def _source_path(self, asset: Asset) -> str:
+    if asset.has_prep_parquet:
+      return os.path.abspath(asset.prep_parquet_path)
+    elif os.path.exists(asset.prep_path):
+      return os.path.abspath(asset.prep_path)
+    else:
+      raise FileNotFoundError(
+        f"No prepared file was found for asset {asset.name} in {asset.prep_location}"
+      )
+
+  def _select_typed(self, asset: Asset, scan: str) -> str:
+    casts = ",\n".join(
+      f'CAST("{name}" AS {duckdb_type}) AS "{name}"'
+      for name, duckdb_type in asset.schema.duckdb_types.items()
+    )
+    return f"SELECT {casts} FROM {scan}"
+
+  def relation(self, asset_name: str) -> str:
+    """Get the name of the catalog relation that holds an asset, registering it if needed.
+
+    Args:
+        asset_name (str): The name of the asset.
+
+    Returns:
+        str: The quoted relation name, ready to be used in a SQL query.
+    """
+    asset = self.assets.get(asset_name)
+    if asset is None:
+      raise AssetNotInCatalog(asset_name)
+
+    source_path = self._source_path(asset)
+    fingerprint = self._fingerprint(source_path)
+    relation_name = f'"{asset_name}"'
+
+    with self._lock:
+      if self._registered.get(asset_name) == fingerprint:
+        return relation_name
+
+      registered = self.connection.execute(
+        "SELECT source_path, fingerprint FROM _catalog_sources WHERE name = ?",
+        [asset_name]
+      ).fetchone()
+
+      if registered != (source_path, fingerprint):
+        self._register(asset, source_path, fingerprint)
+
+      self._registered[asset_name] = fingerprint
+
+    return relation_name
+
+  def _register(self, asset: Asset, source_path: str, fingerprint: str) -> None:
+    self.log.info("Registering %s in the catalog from %s", asset.name, source_path)
+
+    connection = self.connection
+    connection.execute(f'DROP VIEW IF EXISTS "{asset.name}"')
+    connection.execute(f'DROP TABLE IF EXISTS "{asset.name}"')
+
+    if source_path.endswith(".parquet"):
+      connection.execute(
+        f'CREATE VIEW "{asset.name}" AS '
+        + self._select_typed(asset, f"read_parquet('{source_path}')")
+      )
+    else:
+      columns = ", ".join(
+        f"'{name}': 'VARCHAR'" for name in asset.schema.field_names
+      )
+      scan = f"read_csv('{source_path}', header=true, auto_detect=false, columns={{{columns}}})"
+      connection.execute(
+        f'CREATE TABLE "{asset.name}" AS ' + self._select_typed(asset, scan)
+      )
+
+    connection.execute(
+      "INSERT OR REPLACE INTO _catalog_sources VALUES (?, ?, ?)",
+      [asset.name, source_path, fingerprint]
+    )
+
+  def register_assets(self, asset_names: Optional[List[str]] = None) -> None:
+    """Eagerly register assets in the catalog.
+
+    Args:
+        asset_names (List[str], optional): Names of the assets to register. Defaults to all public assets.
+    """
+    asset_names = asset_names or [
+      name for name, asset in self.assets.items() if asset.public
+    ]
+    for asset_name in asset_names:
+      self.relation(asset_name)
+
+  def execute(self, query: str, parameters: Optional[list] = None):
+    """Run a query in the catalog and get the cursor that holds the results.
+    """
+    return self.cursor().execute(query, parameters or [])
+
+  def query(self, query: str, parameters: Optional[list] = None) -> pd.DataFrame:
+    """Run a query in the catalog and get the results as a pandas dataframe.
+    """
+    return self.execute(query, parameters).df()
+
+  def record_batches(
+    self,
+    query: str,
+    parameters: Optional[list] = None,
+    batch_size: int = 1000000) -> "pa.RecordBatchReader":
+    """Run a query in the catalog and get a reader that streams its results in Arrow record batches.
+    """
+    result = self.execute(query, parameters)
+    # `fetch_record_batch` is deprecated in favour of `to_arrow_reader` in recent DuckDB versions
+    if hasattr(result, "to_arrow_reader"):
+      return result.to_arrow_reader(batch_size)
+    return result.fetch_record_batch(batch_size)
+
+  def arrow(self, query: str, parameters: Optional[list] = None) -> "pa.Table":
+    """Run a query in the catalog and get the results as an Arrow table, which is read from
+    DuckDB in record batches without converting them.
+    """
+    return self.record_batches(query, parameters).read_all()
+
+  def iter_partitions(
+    self,
+    queries: List[Tuple[str, Optional[list]]],
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None) -> Iterator["pa.Table"]:
+    """Run the queries over the partitions of a result concurrently and get the result of each
+    of them as an Arrow table, in the order of the queries.
+
+    Each query runs in a thread with its own cursor on the catalog connection. A partition is
+    yielded as soon as it and the partitions before it are done, so they can be consumed while
+    the rest are still running. Assets must be registered before, as registering them writes to
+    the catalog.
+
+    Args:
+        queries (List[Tuple[str, list]]): The query and parameters of each partition. All of them
+          must return the same columns.
+        max_workers (int, optional): Number of queries run at the same time. Defaults to the
+          number of queries, up to the number of CPUs.
+        on_progress (Callable[[int, int], None], optional): Called with the number of partitions
+          yielded so far and the total, from the consuming thread, before each partition is yielded.
+
+    Returns:
+        Iterator[pa.Table]: The results of the queries.
+    """
+    if not queries:
+      raise ValueError("At least one query is required")
+
+    max_workers = max_workers or min(len(queries), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+      futures = [
+        executor.submit(self.arrow, query, parameters)
+        for query, parameters in queries
+      ]
+      try:
+        for done, future in enumerate(futures, start=1):
+          partition = future.result()
+          # the executor must not keep the partitions that were already handed over
+          futures[done - 1] = None
+          if on_progress is not None:
+            on_progress(done, len(queries))
+          yield partition
+      finally:
+        for future in futures:
+          if future is not None:
+            future.cancel()
+
+  def arrow_partitions(
+    self,
+    queries: List[Tuple[str, Optional[list]]],
+    max_workers: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None) -> "pa.Table":
+    """Run the queries over the partitions of a result concurrently, as `iter_partitions` does,
+    and get the partitions together in one Arrow table. The partitions are appended to each other
+    without copying their data.
+
+    Returns:
+        pa.Table: The results of all queries.
+    """
+    import pyarrow as pa
+
+    return pa.concat_tables(list(self.iter_partitions(queries, max_workers, on_progress)))
+
+  def close(self) -> None:
+    with self._lock:
+      if self._connection is not None:
+        self._connection.close()
+        self._connection = None
+      self._registered = {}
+      self._local = threading.local()
@@ -2,17 +2,31 @@ import json
 import pathlib
 from typing import Any, Dict, List, Optional, Union
 from pathlib import Path
-from frictionless import Package
 import sys
 
+import pandas as pd
+
 from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.browse import DEFAULT_PAGE_SIZE, AssetBrowser
+from transfermarkt_datasets.core.cache import PrepDataCache
+from transfermarkt_datasets.core.catalog import Catalog
+from transfermarkt_datasets.core.integrity import IntegrityReport, check_integrity
+from transfermarkt_datasets.core.mart import MartQuery
+from transfermarkt_datasets.core.registry import ASSETS_PATH, LazyAssets
+from transfermarkt_datasets.core.stats import compute_stats
 
 import importlib
 import inflection
 import os
 import logging.config
 
-from transfermarkt_datasets.core.utils import read_config
+from transfermarkt_datasets.core.utils import Filter, read_config
+
+# the text fields that `Dataset.search` looks up, by asset
+SEARCHABLE_FIELDS = {
+  "cur_players": "name",
+  "cur_clubs": "name"
+}
 
 class AssetNotFound(Exception):
   """Exception to be raised when attempting to load an asset that is not defined.
@@ -38,7 +52,8 @@ class Dataset:
         assets_root=".",
         assets_relative_path="transfermarkt_datasets/assets",
         base_path: Optional[Union[str, Path]] = None,
-        catalog_path: Optional[str] = None
+        catalog_path: Optional[str] = None,
+        prep_cache_max_bytes: Optional[int] = None
     ) -> None:
 
         self.assets_root = assets_root
@@ -49,6 +64,13 @@ class Dataset:
         self.prep_folder_path = "data/prep"
         self.assets: Dict[str, Asset] = {}
 
+        # assets' prepared dataframes are loaded lazily and kept in memory under this budget
+        self.prep_cache = PrepDataCache(max_bytes=prep_cache_max_bytes)
+
+        self.catalog_path = catalog_path
+        self._catalog = None
+        self._computed_stats: Dict[str, pd.DataFrame] = {}
+
         if self.config.get("logging"):
           logging.config.dictConfig(self.config["logging"])
         else:
@@ -56,29 +78,45 @@ class Dataset:
 
         self.log = logging.getLogger("main")
 
-        for file in pathlib.Path(os.path.join(self.assets_root, self.assets_relative_path)).glob("**/*.py"):
-          filename = file.name
-          if filename.startswith("__"):  # Skip __init__.py and other dunder files
-              continue
-          class_ = self.get_asset_def(filename.split(".")[0])
-          asset = class_()
-          self.assets[asset.name] = asset
-
         if base_path:
             self.base_path = Path(base_path).resolve()
         else:
             # default: resolve from this file's directory
             # core -> transfermarkt_datasets -> project root
             self.base_path = Path(__file__).parent.parent.parent.resolve()
-            
-        # Update asset paths to use the correct base_path
-        self._update_asset_paths()
 
-    def _update_asset_paths(self):
-        """Update all assets to use the correct base path for their prep_location."""
-        prep_path = str(self.base_path / self.prep_folder_path)
-        for asset in self.assets.values():
-            asset.prep_location = prep_path
+        assets_path = pathlib.Path(os.path.join(self.assets_root, self.assets_relative_path))
+        if assets_path.resolve() == ASSETS_PATH.resolve():
+          # the project's own assets are listed in the registry, and they are only
+          # imported and instantiated when they are first accessed
+          self.assets = LazyAssets.from_registry(on_create=self._setup_asset)
+        else:
+          for file in assets_path.glob("**/*.py"):
+            filename = file.name
+            if filename.startswith("__"):  # Skip __init__.py and other dunder files
+                continue
+            class_ = self.get_asset_def(filename.split(".")[0])
+            asset = class_()
+            self._setup_asset(asset)
+            self.assets[asset.name] = asset
+
+    def _setup_asset(self, asset: Asset) -> None:
+        """Attach an asset to the dataset prep cache and point it to the dataset base path."""
+        asset.cache = self.prep_cache
+        asset.prep_location = f"{self.base_path}/data/prep"
+
+    @property
+    def catalog(self) -> Catalog:
+      """A DuckDB catalog where the dataset assets can be queried with SQL.
+      It is persisted by default to `data/catalog.duckdb`, so assets registration survives restarts.
+      """
+      if self._catalog is None:
+        catalog_path = self.catalog_path or str(self.base_path / "data" / "catalog.duckdb")
+        self._catalog = Catalog(
+          assets=self.assets,
+          database_path=catalog_path
+        )
+      return self._catalog
 
     @property
     def assets_module(self):
@@ -95,16 +133,15 @@ class Dataset:
 
     def load_assets(self):
       """Load all assets in the dataset from local.
+
+      Assets are otherwise loaded lazily on first access to their `prep_df`, which is
+      usually preferable. Either way, the least recently used assets are unloaded if the
+      dataset goes over its `prep_cache_max_bytes` budget.
       """
       for asset_name, asset in self.assets.items():
         if asset.public:
           asset.load_from_prep()
 
-    def _update_asset_paths(self):
-      """Update all asset paths to use the correct base_path."""
-      for asset in self.assets.values():
-          asset.prep_location = f"{self.base_path}/data/prep"
-
     def get_asset_def(self, asset_name):
       class_name = inflection.camelize(asset_name) + "Asset"
       module = importlib.import_module(f"{self.assets_module}.{asset_name}")
@@ -138,12 +175,163 @@ class Dataset:
 
       return relationships
 
+    def check_integrity(self, max_workers: Optional[int] = None, sample_size: int = 5) -> IntegrityReport:
+      """Check that the foreign keys of every asset reference existing rows in the referenced assets.
+
+      All relationships are checked in one pass, in parallel, on the dataset catalog.
+
+      Args:
+          max_workers (int, optional): Number of relationships checked at the same time.
+          sample_size (int, optional): Number of orphan keys kept as a sample for each relationship.
+
+      Returns:
+          IntegrityReport: The orphan rows of each relationship.
+      """
+      return check_integrity(
+        self.catalog,
+        self.get_relationships(),
+        max_workers=max_workers,
+        sample_size=sample_size
+      )
+
+    def mart(
+      self,
+      base: str,
+      joins: Optional[List[Union[str, Dict]]] = None,
+      columns: Optional[Union[List[str], Dict[str, str]]] = None,
+      filters: Optional[List[Filter]] = None,
+      distinct: bool = False) -> pd.DataFrame:
+      """Query a mart: the columns of an asset and the assets related to it, joined and filtered
+      in a single query on the dataset catalog.
+
+      Each asset is filtered before it is joined, and only the requested columns are read.
+      For example, the valuations of some players, with their names:
+
+          td.mart(
+            "cur_player_valuations",
+            joins=["cur_players"],
+            columns=["date", "market_value_in_eur", "cur_players.name"],
+            filters=[("cur_players.name", "in", ["Lionel Messi"])]
+          )
+
+      Args:
+          base (str): The name of the base asset.
+          joins (List[Union[str, Dict]], optional): Assets joined through their relationships, as
+            asset names or relationships from `get_relationships`.
+          columns (Union[List[str], Dict[str, str]], optional): Columns as "<asset>.<field>", or
+            "<field>" for the base asset, or a mapping of columns to names. Defaults to the base asset fields.
+          filters (List[Filter], optional): Predicates in (column, operator, value) form.
+          distinct (bool, optional): Return distinct rows only.
+
+      Returns:
+          pd.DataFrame: The mart.
+      """
+      return MartQuery(
+        self.catalog,
+        base,
+        joins=joins,
+        relationships=self.get_relationships(),
+        columns=columns,
+        filters=filters,
+        distinct=distinct
+      ).to_dataframe()
+
+    def browse(
+      self,
+      asset_name: str,
+      sort_by: Optional[str] = None,
+      descending: bool = False,
+      filters: Optional[List[Filter]] = None,
+      columns: Optional[List[str]] = None,
+      page_size: int = DEFAULT_PAGE_SIZE) -> AssetBrowser:
+      """Browse the rows of an asset one page at a time, sorted and filtered on the dataset catalog.
+
+      Pages are fetched with keyset pagination, so only the rows of a page are read and any page
+      takes as long as the first one:
+
+          browser = td.browse("cur_appearances", sort_by="date", descending=True)
+          page, cursor = browser.page()
+          next_page, cursor = browser.page(after=cursor)
+
+      Args:
+          asset_name (str): The name of the asset.
+          sort_by (str, optional): The field to sort by. Defaults to the primary key.
+          descending (bool, optional): Sort in descending order.
+          filters (List[Filter], optional): Predicates on the asset fields in (field, operator, value) form.
+          columns (List[str], optional): The fields in the pages. Defaults to all fields.
+          page_size (int, optional): The number of rows in a page.
+
+      Returns:
+          AssetBrowser: The browser of the asset pages.
+      """
+      return AssetBrowser(
+        self.catalog,
+        asset_name,
+        sort_by=sort_by,
+        descending=descending,
+        filters=filters,
+        columns=columns,
+        page_size=page_size
+      )
+
+    def search(self, asset_name: str, query: str, k: int = 10) -> pd.DataFrame:
+      """Find the players or clubs whose name best matches a query, for type-ahead searches.
+
+      The search runs on a trigram index over the names, which is built on first use and persisted
+      to `data/index`, so a search takes about a millisecond instead of a scan of the asset.
+
+      Args:
+          asset_name (str): One of the assets in `SEARCHABLE_FIELDS`.
+          query (str): The text to search for, for example the first letters of a name.
+          k (int, optional): The maximum number of matches. Defaults to 10.
+
+      Returns:
+          pd.DataFrame: The id, the name and the "score" of the best matches, best first.
+      """
+      if asset_name not in SEARCHABLE_FIELDS or asset_name not in self.assets:
+        raise AssetNotFound(asset_name, f"{asset_name} is not searchable")
+
+      return self.assets[asset_name].search(query, k, SEARCHABLE_FIELDS[asset_name])
+
+    def build_search_indexes(self) -> None:
+      """Build the name indexes of all searchable assets, so that the first searches are fast too."""
+      for asset_name, field_name in SEARCHABLE_FIELDS.items():
+        if asset_name in self.assets and self.assets[asset_name].has_prep_file:
+          self.assets[asset_name].name_index(field_name)
+
+    def get_stats(self, asset_name: str) -> pd.DataFrame:
+      """Get the column statistics of an asset: row count, null count, min and max values,
+      approximate distinct count and sample values.
+
+      They are read from the statistics file written when the asset was prepared. If there is none,
+      they are computed once on the dataset catalog and kept for the lifetime of the dataset.
+
+      Args:
+          asset_name (str): The name of the asset.
+
+      Returns:
+          pd.DataFrame: The statistics, indexed by column name.
+      """
+      asset = self.assets.get(asset_name)
+      if asset is None:
+        raise AssetNotFound(asset_name)
+
+      stats = asset.stats
+      if stats is None:
+        if asset_name not in self._computed_stats:
+          self._computed_stats[asset_name] = compute_stats(self.catalog, asset_name)
+        stats = self._computed_stats[asset_name]
+
+      return stats
+
     def as_frictionless_package(self, basepath=None, exclude_private=False) -> None:
       """Create an save to local a file descriptor tha defines a "datapackage" for this dataset.
 
       Args:
           basepath (str, optional): Base path of prepared files. It defaults to the "prep" folder path.
       """
+      from frictionless import Package
+
       base_path = basepath or self.prep_folder_path
       package = Package(basepath=base_path)
 
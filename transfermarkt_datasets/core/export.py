@@ -0,0 +1,209 @@
+"""Streaming export of catalog query results to files.
+"""
+import io
+import itertools
+import os
+import tempfile
+from typing import IO, Callable, Dict, List, Optional, Tuple
+
+from transfermarkt_datasets.core.catalog import Catalog
+
+# maximum number of data rows in an Excel worksheet (the header takes one more)
+EXCEL_MAX_ROWS = 1048575
+
+EXPORT_FORMATS = {
+  "xlsx": {
+    "extension": "xlsx",
+    "mime": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+  },
+  "csv": {
+    "extension": "csv",
+    "mime": "text/csv"
+  },
+  "parquet": {
+    "extension": "parquet",
+    "mime": "application/vnd.apache.parquet"
+  }
+}
+
+class UnsupportedExportFormat(Exception):
+  pass
+
+def _renamed_schema(reader, column_names: List[str]):
+  import pyarrow as pa
+  return pa.schema([
+    field.with_name(name) for field, name in zip(reader.schema, column_names)
+  ])
+
+def _write_csv(reader, column_names: List[str], file: IO) -> int:
+  import pyarrow as pa
+  import pyarrow.csv as pa_csv
+
+  schema = _renamed_schema(reader, column_names)
+  rows = 0
+  with pa_csv.CSVWriter(file, schema) as writer:
+    for batch in reader:
+      writer.write_batch(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+      rows += batch.num_rows
+
+  return rows
+
+def _write_parquet(reader, column_names: List[str], file: IO) -> int:
+  import pyarrow as pa
+  import pyarrow.parquet as pq
+
+  schema = _renamed_schema(reader, column_names)
+  rows = 0
+  with pq.ParquetWriter(file, schema, compression="zstd") as writer:
+    for batch in reader:
+      writer.write_batch(pa.RecordBatch.from_arrays(batch.columns, schema=schema))
+      rows += batch.num_rows
+
+  return rows
+
+def _write_xlsx(reader, column_names: List[str], file: IO, sheet_name: str = "Data") -> int:
+  from openpyxl import Workbook
+
+  # in write-only mode openpyxl streams rows to disk instead of holding the whole sheet in memory
+  workbook = Workbook(write_only=True)
+
+  rows = 0
+  sheet_rows = EXCEL_MAX_ROWS
+  sheets = 0
+  worksheet = None
+
+  def new_sheet():
+    title = sheet_name if sheets == 0 else f"{sheet_name} {sheets + 1}"
+    sheet = workbook.create_sheet(title=title)
+    sheet.append(column_names)
+    return sheet
+
+  for batch in reader:
+    columns = [column.to_pylist() for column in batch.columns]
+    for row in zip(*columns):
+      if sheet_rows == EXCEL_MAX_ROWS:
+        worksheet = new_sheet()
+        sheets += 1
+        sheet_rows = 0
+      worksheet.append(row)
+      sheet_rows += 1
+      rows += 1
+
+  if worksheet is None:
+    new_sheet()
+
+  workbook.save(file)
+
+  return rows
+
+WRITERS = {
+  "csv": _write_csv,
+  "parquet": _write_parquet,
+  "xlsx": _write_xlsx
+}
+
+def _check_format(format: str) -> None:
+  if format not in WRITERS:
+    raise UnsupportedExportFormat(
+      f"Unsupported export format '{format}'. Use one of {list(WRITERS.keys())}"
+    )
+
+def _export(reader, format: str, column_names: Optional[Dict[str, str]]) -> io.BufferedReader:
+  column_names = column_names or {}
+  export_column_names = [column_names.get(name, name) for name in reader.schema.names]
+
+  extension = EXPORT_FORMATS[format]["extension"]
+  with tempfile.NamedTemporaryFile(mode="w+b", suffix=f".{extension}", delete=False) as file:
+    path = file.name
+    try:
+      rows = WRITERS[format](reader, export_column_names, file)
+    except BaseException:
+      file.close()
+      os.remove(path)
+      raise
+
+  # the export is reopened read only, and its path is removed right away so that the space on
+  # disk is released as soon as the file is closed
+  export_file = open(path, "rb")
+  os.remove(path)
+  export_file.rows = rows
+
+  return export_file
+
+def export_query(
+  catalog: Catalog,
+  query: str,
+  format: str = "csv",
+  parameters: Optional[list] = None,
+  column_names: Optional[Dict[str, str]] = None,
+  batch_size: int = 50000) -> io.BufferedReader:
+  """Run a query in the catalog and write its results to a file in the given format.
+
+  Results are fetched from DuckDB in record batches and written to a temporary file on disk as
+  they come, so memory usage does not grow with the size of the result. Excel exports are split
+  across several worksheets if they go over the worksheet row limit.
+
+  Args:
+      catalog (Catalog): The catalog where the query is run.
+      query (str): The SQL query.
+      format (str, optional): One of "csv", "parquet" or "xlsx". Defaults to "csv".
+      parameters (list, optional): Query parameters. Defaults to None.
+      column_names (Dict[str, str], optional): A mapping used to rename the result columns in the export.
+      batch_size (int, optional): Number of rows fetched from DuckDB at a time. Defaults to 50000.
+
+  Returns:
+      io.BufferedReader: The export, opened for reading from its beginning. This is a file type
+        that `st.download_button` accepts. The `rows` attribute of the file holds the number of
+        rows exported. The file is deleted from disk once it is closed.
+  """
+  _check_format(format)
+  return _export(catalog.record_batches(query, parameters, batch_size), format, column_names)
+
+def export_partitions(
+  catalog: Catalog,
+  queries: List[Tuple[str, Optional[list]]],
+  format: str = "csv",
+  column_names: Optional[Dict[str, str]] = None,
+  batch_size: int = 50000,
+  max_workers: Optional[int] = None,
+  on_progress: Optional[Callable[[int, int], None]] = None) -> io.BufferedReader:
+  """Run the queries over the partitions of a result concurrently and write their results to a
+  file in the given format, one partition after the other.
+
+  This is `export_query` for results that are split in partitions, for example by date range,
+  so that the partitions are queried on several cores at the same time. Partitions are written
+  as soon as they and the partitions before them are done, so only the partitions that are done
+  but not written yet are held in memory.
+
+  Args:
+      catalog (Catalog): The catalog where the queries are run.
+      queries (List[Tuple[str, list]]): The query and parameters of each partition, in the order
+        they are written. All of them must return the same columns.
+      format (str, optional): One of "csv", "parquet" or "xlsx". Defaults to "csv".
+      column_names (Dict[str, str], optional): A mapping used to rename the result columns in the export.
+      batch_size (int, optional): Number of rows written at a time. Defaults to 50000.
+      max_workers (int, optional): Number of queries run at the same time. Defaults to the
+        number of queries, up to the number of CPUs.
+      on_progress (Callable[[int, int], None], optional): Called with the number of partitions
+        written and the total.
+
+  Returns:
+      io.BufferedReader: The export, as returned by `export_query`.
+  """
+  import pyarrow as pa
+
+  _check_format(format)
+
+  partitions = catalog.iter_partitions(queries, max_workers, on_progress)
+  first = next(partitions)
+
+  def batches():
+    for partition in itertools.chain([first], partitions):
+      # the batches of a partition are slices of its columns, so they are not copied
+      yield from partition.to_batches(max_chunksize=batch_size)
+
+  reader = pa.RecordBatchReader.from_batches(first.schema, batches())
+  try:
+    return _export(reader, format, column_names)
+  finally:
+    partitions.close()
@@ -0,0 +1,352 @@
+"""Bounded and rate limited fetching of JSON documents over HTTP, with a local cache of the responses.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import aiohttp
+
+# responses with these statuses are retried, any other non 2xx status is a permanent failure
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+  """An asyncio token bucket that limits the rate at which requests are started.
+
+  The bucket holds up to `capacity` tokens and is refilled at `rate` tokens per second.
+  Each request takes one token, waiting for the bucket to refill if it is empty.
+
+  Args:
+      rate (float): Tokens added to the bucket per second.
+      capacity (int, optional): Maximum number of tokens in the bucket, which is the largest
+        burst of requests allowed. Defaults to 1.
+  """
+
+  def __init__(self, rate: float, capacity: int = 1) -> None:
+    if rate <= 0:
+      raise ValueError(f"The token bucket rate must be positive, got {rate}")
+
+    self.rate = rate
+    self.capacity = max(1, capacity)
+
+    self._tokens = float(self.capacity)
+    self._updated_at = time.monotonic()
+    self._lock = asyncio.Lock()
+
+  def _refill(self) -> None:
+    now = time.monotonic()
+    self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+    self._updated_at = now
+
+  async def acquire(self) -> None:
+    # holding the lock while sleeping keeps waiters in order
+    async with self._lock:
+      self._refill()
+      if self._tokens < 1:
+        await asyncio.sleep((1 - self._tokens) / self.rate)
+        self._refill()
+      self._tokens -= 1
+
+class JsonLinesWriter:
+  """Write JSON documents to a gzipped JSON lines file as they come, in the same format as the
+  files produced by the scraper.
+
+  Documents are compressed on the fly and the file is flushed every `flush_every` documents,
+  so only the last, unflushed, documents are held in memory.
+
+  Args:
+      path (str): Path of the gzipped file.
+      flush_every (int, optional): Number of documents written between flushes. Defaults to 100.
+  """
+
+  def __init__(self, path: str, flush_every: int = 100) -> None:
+    self.path = path
+    self.flush_every = flush_every
+
+    self._file = None
+    self._unflushed = 0
+
+  def _open(self) -> None:
+    if self._file is None:
+      os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+      self._file = gzip.open(self.path, "wt")
+
+  def write(self, document) -> None:
+    self._open()
+    self._file.write(json.dumps(document) + "\n")
+    self._unflushed += 1
+    if self._unflushed >= self.flush_every:
+      self.flush()
+
+  def flush(self) -> None:
+    if self._file is not None:
+      self._file.flush()
+    self._unflushed = 0
+
+  def close(self) -> None:
+    self._open()
+    self._file.close()
+    self._file = None
+
+  def __enter__(self) -> "JsonLinesWriter":
+    return self
+
+  def __exit__(self, *args) -> None:
+    self.close()
+
+class ResponseCache:
+  """A local, content-addressed cache of JSON documents with a time to live.
+
+  Documents are stored once per distinct content, compressed and named after the SHA-256 hash
+  of their content, under `objects/`. Keys (typically URLs) are mapped to a document by a small
+  reference file under `refs/` that also records when the document was fetched, so identical
+  responses for different keys share the same object and refreshing a key only rewrites its reference.
+
+  All files are written to a temporary file first and then moved into place, so the cache is
+  never left with partially written entries when a run is interrupted. This makes the cache the
+  record of completed requests: a run that stores responses as they arrive can be resumed by
+  requesting only the keys that are not fresh in it.
+
+  Args:
+      directory (str): Directory where the cache is stored.
+      ttl (float, optional): Seconds after which a document is considered stale. Defaults to no expiration.
+  """
+
+  def __init__(self, directory: str, ttl: Optional[float] = None) -> None:
+    self.directory = directory
+    self.ttl = ttl
+
+  @staticmethod
+  def _hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+  def _ref_path(self, key: str) -> str:
+    key_hash = self._hash(key.encode())
+    return os.path.join(self.directory, "refs", key_hash[:2], f"{key_hash}.json")
+
+  def _object_path(self, content_hash: str) -> str:
+    return os.path.join(self.directory, "objects", content_hash[:2], f"{content_hash}.json.gz")
+
+  @staticmethod
+  def _write_atomic(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+      f.write(content)
+    os.replace(tmp_path, path)
+
+  def _ref(self, key: str) -> Optional[dict]:
+    try:
+      with open(self._ref_path(key)) as f:
+        return json.load(f)
+    except (FileNotFoundError, ValueError):
+      return None
+
+  def __contains__(self, key: str) -> bool:
+    return self._ref(key) is not None
+
+  def is_fresh(self, key: str, at: Optional[float] = None) -> bool:
+    """Whether the cache holds a document for the key that had not expired yet at time `at`
+    (a UNIX timestamp, defaults to now)."""
+    ref = self._ref(key)
+    if ref is None:
+      return False
+    at = time.time() if at is None else at
+    return self.ttl is None or at - ref["fetched_at"] <= self.ttl
+
+  def get(self, key: str):
+    """Get the document for a key, whether it has expired or not.
+
+    Raises:
+        KeyError: If there is no document for the key in the cache.
+    """
+    ref = self._ref(key)
+    if ref is None:
+      raise KeyError(key)
+    with gzip.open(self._object_path(ref["hash"]), "rb") as f:
+      return json.loads(f.read())
+
+  def put(self, key: str, document) -> str:
+    """Store the document for a key.
+
+    Returns:
+        str: The hash of the document content.
+    """
+    content = json.dumps(document, sort_keys=True).encode()
+    content_hash = self._hash(content)
+
+    object_path = self._object_path(content_hash)
+    if not os.path.exists(object_path):
+      self._write_atomic(object_path, gzip.compress(content))
+
+    self._write_atomic(
+      self._ref_path(key),
+      json.dumps({"key": key, "hash": content_hash, "fetched_at": time.time()}).encode()
+    )
+
+    return content_hash
+
+class FetchError(Exception):
+  pass
+
+class Fetcher:
+  """Fetch JSON documents for a collection of keys, with a bounded number of requests in flight,
+  a rate limit and retries with exponential backoff.
+
+  Transient failures (timeouts, connection errors and the statuses in `RETRYABLE_STATUSES`) are
+  retried up to `max_retries` times, waiting `backoff_base * 2 ** attempt` seconds (with jitter,
+  capped at `backoff_max`) or as long as the server asks in the `Retry-After` header.
+  Responses with a JSON body that cannot be decoded are retried too. Permanent failures, such
+  as a 404 or a response that is not JSON, yield an empty (`None`) response, same as a
+  successful request.
+
+  A fetcher can be shared by several `fetch_all` calls running concurrently, in which case the
+  concurrency and rate limits apply to all of them together.
+
+  Args:
+      concurrency (int, optional): Maximum number of requests in flight. Defaults to 10.
+      rate (float, optional): Maximum number of requests started per second. Defaults to no limit.
+      burst (int, optional): Number of requests that can be started at once under the rate limit.
+        Defaults to `concurrency`.
+      max_retries (int, optional): Retries for a request after a transient failure. Defaults to 5.
+      backoff_base (float, optional): Seconds to wait before the first retry. Defaults to 1.
+      backoff_max (float, optional): Maximum seconds to wait between retries. Defaults to 60.
+      headers (Dict[str, str], optional): Headers sent with every request.
+  """
+
+  def __init__(
+    self,
+    concurrency: int = 10,
+    rate: Optional[float] = None,
+    burst: Optional[int] = None,
+    max_retries: int = 5,
+    backoff_base: float = 1.0,
+    backoff_max: float = 60.0,
+    headers: Optional[Dict[str, str]] = None) -> None:
+
+    self.concurrency = concurrency
+    self.rate = rate
+    self.burst = burst or concurrency
+    self.max_retries = max_retries
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+    self.headers = headers or {}
+    self.log = logging.getLogger("main")
+
+    # asyncio primitives are created lazily so that they bind to the running event loop
+    self._loop = None
+    self._semaphore = None
+    self._bucket = None
+
+  def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after is not None:
+      try:
+        return min(self.backoff_max, float(retry_after))
+      except ValueError:
+        pass
+    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+    return delay * random.uniform(0.5, 1.0)
+
+  async def _throttle(self) -> None:
+    loop = asyncio.get_running_loop()
+    if self._loop is not loop:
+      self._loop = loop
+      self._semaphore = asyncio.Semaphore(self.concurrency)
+      if self.rate:
+        self._bucket = TokenBucket(self.rate, self.burst)
+    if self._bucket is not None:
+      await self._bucket.acquire()
+
+  async def fetch(self, session: aiohttp.ClientSession, url: str) -> Optional[dict]:
+    """Fetch a JSON document, retrying on transient failures.
+
+    Args:
+        session (aiohttp.ClientSession): The session used for the request.
+        url (str): The URL of the document.
+
+    Raises:
+        FetchError: If the request keeps failing after all retries.
+
+    Returns:
+        Optional[dict]: The document, or None if the server did not return a JSON document.
+    """
+    for attempt in range(self.max_retries + 1):
+      await self._throttle()
+      retry_after = None
+      try:
+        async with self._semaphore:
+          async with session.get(url, headers=self.headers, ssl=False) as response:
+            if response.status in RETRYABLE_STATUSES:
+              retry_after = response.headers.get("Retry-After")
+              error = f"HTTP {response.status}"
+            elif response.status >= 400:
+              self.log.error("Failed to fetch %s: HTTP %s", url, response.status)
+              return None
+            else:
+              try:
+                return await response.json()
+              except aiohttp.ContentTypeError as e:
+                self.log.error("Failed to fetch %s: %s", url, e)
+                return None
+              except ValueError as e:
+                # a truncated or malformed JSON body, which is retried as the next response may be whole
+                error = f"invalid JSON body: {e}"
+      except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        error = repr(e)
+
+      if attempt < self.max_retries:
+        delay = self._backoff(attempt, retry_after)
+        self.log.debug("Retrying %s in %.1fs after %s", url, delay, error)
+        await asyncio.sleep(delay)
+
+    raise FetchError(f"Failed to fetch {url} after {self.max_retries + 1} attempts: {error}")
+
+  async def fetch_all(
+    self,
+    session: aiohttp.ClientSession,
+    requests: Iterable[Tuple[object, str]],
+    on_result: Callable[[object, Optional[dict]], None]) -> Dict[str, int]:
+    """Fetch the documents for a collection of keys.
+
+    Results are handed to `on_result` as they arrive, in no particular order. Keys that failed
+    after all retries are not handed to `on_result`.
+
+    Args:
+        session (aiohttp.ClientSession): The session used for the requests.
+        requests (Iterable[Tuple[object, str]]): Pairs of key (for example, a player id) and URL.
+        on_result (Callable[[object, Optional[dict]], None]): Called with the key and the document.
+
+    Returns:
+        Dict[str, int]: Number of keys "fetched" and "failed".
+    """
+    stats = {"fetched": 0, "failed": 0}
+    queue: asyncio.Queue = asyncio.Queue()
+
+    for key, url in requests:
+      queue.put_nowait((key, url))
+
+    async def worker():
+      while True:
+        try:
+          key, url = queue.get_nowait()
+        except asyncio.QueueEmpty:
+          return
+        try:
+          document = await self.fetch(session, url)
+        except FetchError as e:
+          self.log.error(str(e))
+          stats["failed"] += 1
+          continue
+
+        on_result(key, document)
+        stats["fetched"] += 1
+
+    workers = min(self.concurrency, queue.qsize())
+    await asyncio.gather(*[worker() for _ in range(workers)])
+
+    return stats
@@ -0,0 +1,251 @@
+"""Point lookup indexes over the key columns of the prepared assets.
+
+A `KeyIndex` maps the values of a column to the positions of the rows that hold them. The values
+are kept sorted, so finding the rows of a value is a binary search, and row positions are then
+mapped to the Parquet row groups that hold them, so that a lookup only reads those row groups
+instead of the whole file.
+
+Indexes are built from the key column alone, which is cheap to read from a Parquet file, and
+persisted in `data/index` until the prepared file they were built from changes.
+"""
+import logging
+import os
+from typing import TYPE_CHECKING, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+  import pyarrow as pa
+
+INDEX_FILE_SUFFIX = ".index.parquet"
+FINGERPRINT_KEY = b"fingerprint"
+
+def fingerprint(path: str) -> str:
+  stat = os.stat(path)
+  return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+def index_path(index_location: str, asset_name: str, column: str) -> str:
+  return os.path.join(index_location, f"{asset_name}.{column}{INDEX_FILE_SUFFIX}")
+
+def _as_list(values: Any) -> Optional[list]:
+  if isinstance(values, (list, tuple, set, np.ndarray, pd.Series)):
+    return list(values)
+  return None
+
+def _keys(values: pd.Series) -> np.ndarray:
+  if pd.api.types.is_bool_dtype(values.dtype):
+    return values.to_numpy(dtype="bool")
+  if pd.api.types.is_integer_dtype(values.dtype):
+    return values.to_numpy(dtype="int64")
+  if pd.api.types.is_float_dtype(values.dtype):
+    return values.to_numpy(dtype="float64")
+  if pd.api.types.is_datetime64_any_dtype(values.dtype):
+    return values.to_numpy(dtype="datetime64[ns]")
+  # anything else is looked up by its string representation
+  return values.astype(str).to_numpy(dtype=object)
+
+class KeyIndex:
+  """A sorted index of the values of a column.
+
+  Args:
+      keys (np.ndarray): The non null values of the column, sorted.
+      rows (np.ndarray): The position of the row of each value in `keys`.
+      row_group_offsets (np.ndarray): The position of the first row of each row group in the
+        indexed file, followed by the total number of rows.
+      source_fingerprint (str, optional): The fingerprint of the file the index was built from.
+  """
+
+  def __init__(
+    self,
+    keys: np.ndarray,
+    rows: np.ndarray,
+    row_group_offsets: np.ndarray,
+    source_fingerprint: Optional[str] = None) -> None:
+
+    self.keys = keys
+    self.rows = rows
+    self.row_group_offsets = row_group_offsets
+    self.source_fingerprint = source_fingerprint
+
+  def __len__(self) -> int:
+    return len(self.keys)
+
+  @classmethod
+  def from_values(
+    cls,
+    values: pd.Series,
+    row_group_offsets: Optional[np.ndarray] = None,
+    source_fingerprint: Optional[str] = None) -> "KeyIndex":
+    """Build the index of a column from its values, in row order."""
+    not_null = values.notna().to_numpy()
+    rows = np.flatnonzero(not_null)
+    keys = _keys(values[not_null])
+
+    # a stable sort keeps the rows of each value in file order
+    order = np.argsort(keys, kind="stable")
+
+    if row_group_offsets is None:
+      row_group_offsets = np.array([0, len(values)], dtype="int64")
+
+    return cls(keys[order], rows[order].astype("int64"), row_group_offsets, source_fingerprint)
+
+  @classmethod
+  def from_parquet(cls, path: str, column: str) -> "KeyIndex":
+    """Build the index of a column of a Parquet file, reading that column only."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    row_group_rows = [
+      parquet_file.metadata.row_group(i).num_rows
+      for i in range(parquet_file.num_row_groups)
+    ]
+    row_group_offsets = np.concatenate([[0], np.cumsum(row_group_rows)]).astype("int64")
+    values = parquet_file.read(columns=[column]).column(column).to_pandas()
+
+    return cls.from_values(values, row_group_offsets, fingerprint(path))
+
+  def save(self, path: str) -> None:
+    """Persist the index to a Parquet file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({"key": pa.array(self.keys), "row": pa.array(self.rows)})
+    table = table.replace_schema_metadata({
+      FINGERPRINT_KEY: (self.source_fingerprint or "").encode(),
+      b"row_group_offsets": ",".join(str(offset) for offset in self.row_group_offsets).encode()
+    })
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+  @classmethod
+  def load(cls, path: str) -> "KeyIndex":
+    """Load an index that was persisted with `save`."""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    row_group_offsets = np.array(
+      [int(offset) for offset in metadata[b"row_group_offsets"].decode().split(",")],
+      dtype="int64"
+    )
+
+    return cls(
+      keys=table.column("key").to_numpy(zero_copy_only=False),
+      rows=table.column("row").to_numpy(),
+      row_group_offsets=row_group_offsets,
+      source_fingerprint=metadata.get(FINGERPRINT_KEY, b"").decode() or None
+    )
+
+  def _coerce(self, value: Any) -> Any:
+    # lookup values are matched in the type of the keys, so that "123" finds the key 123
+    if self.keys.dtype == object:
+      return str(value)
+    return self.keys.dtype.type(value)
+
+  def positions(self, values: Any) -> np.ndarray:
+    """Get the positions of the rows that hold a value, or any of a list of values.
+
+    Args:
+        values: A value or a list of values.
+
+    Returns:
+        np.ndarray: The row positions, in file order.
+    """
+    values_list = _as_list(values)
+    if values_list is None:
+      values_list = [values]
+
+    positions = []
+    for value in values_list:
+      if value is None or (not isinstance(value, str) and pd.isna(value)):
+        continue
+      try:
+        key = self._coerce(value)
+      except (TypeError, ValueError, OverflowError):
+        continue
+      start = np.searchsorted(self.keys, key, side="left")
+      end = np.searchsorted(self.keys, key, side="right")
+      positions.append(self.rows[start:end])
+
+    if not positions:
+      return np.array([], dtype="int64")
+
+    return np.unique(np.concatenate(positions))
+
+  def row_groups(self, positions: np.ndarray) -> np.ndarray:
+    """Get the row groups of the indexed file that hold some row positions."""
+    return np.unique(np.searchsorted(self.row_group_offsets, positions, side="right") - 1)
+
+def read_rows(
+  path: str,
+  index: KeyIndex,
+  positions: np.ndarray,
+  columns: Optional[List[str]] = None) -> "pa.Table":
+  """Read some rows of a Parquet file, reading only the row groups that hold them.
+
+  Args:
+      path (str): Path to the Parquet file.
+      index (KeyIndex): An index over the file, for its row group boundaries.
+      positions (np.ndarray): The positions of the rows to be read, in file order.
+      columns (List[str], optional): Names of the columns to be read. Defaults to all columns.
+
+  Returns:
+      pa.Table: The rows, in file order.
+  """
+  import pyarrow.parquet as pq
+
+  parquet_file = pq.ParquetFile(path)
+  row_groups = index.row_groups(positions)
+  if len(row_groups) == 0:
+    return parquet_file.schema_arrow.empty_table().select(columns or parquet_file.schema_arrow.names)
+
+  table = parquet_file.read_row_groups(row_groups.tolist(), columns=columns)
+
+  # the row groups that were read are laid out one after the other in the table
+  groups_of_positions = np.searchsorted(index.row_group_offsets, positions, side="right") - 1
+  table_offsets = np.concatenate([[0], np.cumsum(np.diff(index.row_group_offsets)[row_groups])[:-1]])
+  local_positions = (
+    positions
+    - index.row_group_offsets[groups_of_positions]
+    + table_offsets[np.searchsorted(row_groups, groups_of_positions)]
+  )
+
+  return table.take(local_positions)
+
+def load_index(
+  source_path: str,
+  path: str,
+  column: str,
+  log: Optional[logging.Logger] = None) -> KeyIndex:
+  """Load the persisted index of a column of a Parquet file, building it if it does not exist or
+  the file changed since it was built. If the index cannot be persisted, it is only kept in memory.
+  """
+  log = log or logging.getLogger("main")
+  source_fingerprint = fingerprint(source_path)
+
+  if os.path.exists(path):
+    try:
+      index = KeyIndex.load(path)
+      if index.source_fingerprint == source_fingerprint:
+        return index
+    except Exception as e:
+      log.warning("Unable to load index %s, rebuilding it: %s", path, e)
+
+  index = KeyIndex.from_parquet(source_path, column)
+  try:
+    index.save(path)
+  except OSError as e:
+    log.warning("Unable to persist index %s: %s", path, e)
+
+  return index
+
+def matching(df: pd.DataFrame, column: str, values: Any) -> pd.Series:
+  """Get the mask of the rows of a dataframe that hold a value, or any of a list of values."""
+  values_list = _as_list(values)
+  if values_list is not None:
+    return df[column].isin(values_list)
+  return df[column] == values
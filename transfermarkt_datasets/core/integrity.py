@@ -0,0 +1,165 @@
+"""Referential integrity checks for the relationships between dataset assets.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from transfermarkt_datasets.core.catalog import AssetNotInCatalog, Catalog
+
+class Orphans:
+  """The rows of an asset that reference keys that do not exist in the referenced asset.
+
+  Args:
+      relationship (Dict): The relationship, as returned by `Dataset.get_relationships`.
+      rows (int): Number of orphan rows.
+      keys (int): Number of distinct orphan keys.
+      sample (pd.DataFrame): The most referenced orphan keys, with the number of rows for each.
+  """
+
+  def __init__(self, relationship: Dict, rows: int, keys: int, sample: pd.DataFrame) -> None:
+    self.relationship = relationship
+    self.rows = rows
+    self.keys = keys
+    self.sample = sample
+
+  def __repr__(self) -> str:
+    return f"Orphans({describe(self.relationship)}, rows={self.rows}, keys={self.keys})"
+
+class IntegrityReport:
+  """The outcome of checking a set of relationships."""
+
+  def __init__(self, orphans: List[Orphans], errors: Dict[str, str]) -> None:
+    self.orphans = orphans
+    # relationships that could not be checked (for example, because an asset has no prepared file)
+    self.errors = errors
+
+  @property
+  def valid(self) -> bool:
+    return not self.errors and all(orphans.rows == 0 for orphans in self.orphans)
+
+  def __str__(self) -> str:
+    lines = []
+    for orphans in self.orphans:
+      status = "ok" if orphans.rows == 0 else f"{orphans.rows} orphan rows ({orphans.keys} keys)"
+      lines.append(f"{describe(orphans.relationship)}: {status}")
+    for relationship, error in self.errors.items():
+      lines.append(f"{relationship}: not checked, {error}")
+    return "\n".join(lines)
+
+  def as_dataframe(self) -> pd.DataFrame:
+    return pd.DataFrame(
+      data=[
+        {
+          "from": orphans.relationship["from"],
+          "to": orphans.relationship["to"],
+          "source": _fields(orphans.relationship["on"]["source"]),
+          "target": _fields(orphans.relationship["on"]["target"]),
+          "orphan_rows": orphans.rows,
+          "orphan_keys": orphans.keys
+        }
+        for orphans in self.orphans
+      ],
+      columns=["from", "to", "source", "target", "orphan_rows", "orphan_keys"]
+    )
+
+def _fields(fields: Union[str, List[str]]) -> List[str]:
+  return [fields] if isinstance(fields, str) else list(fields)
+
+def describe(relationship: Dict) -> str:
+  source = ", ".join(_fields(relationship["on"]["source"]))
+  target = ", ".join(_fields(relationship["on"]["target"]))
+  return f"{relationship['from']}({source}) -> {relationship['to']}({target})"
+
+def _orphans_query(catalog: Catalog, relationship: Dict) -> str:
+  source_fields = _fields(relationship["on"]["source"])
+  target_fields = _fields(relationship["on"]["target"])
+
+  source = catalog.relation(relationship["from"])
+  target = catalog.relation(relationship["to"])
+
+  keys = ", ".join(f's."{field}"' for field in source_fields)
+  not_null = " AND ".join(f's."{field}" IS NOT NULL' for field in source_fields)
+  join = " AND ".join(
+    f't."{target_field}" = s."{source_field}"'
+    for source_field, target_field in zip(source_fields, target_fields)
+  )
+
+  # the anti join builds a hash table on the referenced keys and probes it with every source row
+  return f"""
+    SELECT {keys}, count(*) AS orphan_rows
+    FROM {source} AS s
+    WHERE {not_null}
+      AND NOT EXISTS (SELECT 1 FROM {target} AS t WHERE {join})
+    GROUP BY ALL
+    ORDER BY orphan_rows DESC
+  """
+
+def find_orphans(catalog: Catalog, relationship: Dict, sample_size: int = 5) -> Orphans:
+  """Find the rows of the source asset of a relationship whose keys are not in the target asset.
+
+  Args:
+      catalog (Catalog): The catalog holding both assets.
+      relationship (Dict): The relationship, as returned by `Dataset.get_relationships`.
+      sample_size (int, optional): Number of orphan keys kept as a sample. Defaults to 5.
+
+  Returns:
+      Orphans: The orphans of the relationship.
+  """
+  orphan_keys = catalog.query(_orphans_query(catalog, relationship))
+
+  return Orphans(
+    relationship=relationship,
+    rows=int(orphan_keys["orphan_rows"].sum()),
+    keys=len(orphan_keys),
+    sample=orphan_keys.head(sample_size)
+  )
+
+def check_integrity(
+  catalog: Catalog,
+  relationships: List[Dict],
+  max_workers: Optional[int] = None,
+  sample_size: int = 5) -> IntegrityReport:
+  """Check a set of relationships between assets in one pass.
+
+  Relationships are checked concurrently, each one in a thread with its own catalog cursor, and
+  each of them as a single anti join in DuckDB.
+
+  Args:
+      catalog (Catalog): The catalog holding the assets.
+      relationships (List[Dict]): The relationships, as returned by `Dataset.get_relationships`.
+      max_workers (int, optional): Number of relationships checked at the same time. Defaults to
+        the number of relationships, up to 8.
+      sample_size (int, optional): Number of orphan keys kept as a sample for each relationship.
+
+  Returns:
+      IntegrityReport: The orphans of each relationship.
+  """
+  # registration writes to the catalog, so it is done upfront instead of from the workers
+  for relationship in relationships:
+    for asset_name in (relationship["from"], relationship["to"]):
+      try:
+        catalog.relation(asset_name)
+      except (AssetNotInCatalog, FileNotFoundError):
+        # reported by the check of the relationship
+        pass
+
+  def check(relationship):
+    try:
+      return find_orphans(catalog, relationship, sample_size), None
+    except AssetNotInCatalog as e:
+      return None, f"asset {e} is not in the catalog"
+    except Exception as e:
+      return None, str(e)
+
+  orphans = []
+  errors = {}
+  if relationships:
+    with ThreadPoolExecutor(max_workers=max_workers or min(len(relationships), 8)) as executor:
+      for relationship, (result, error) in zip(relationships, executor.map(check, relationships)):
+        if error is not None:
+          errors[describe(relationship)] = error
+        else:
+          orphans.append(result)
+
+  return IntegrityReport(orphans, errors)
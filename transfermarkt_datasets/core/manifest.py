@@ -0,0 +1,264 @@
+"""Manifest of the raw data files acquired with transfermarkt-scraper.
+
+The manifest is a JSON file that lives next to the raw files and holds, for each season and asset
+file, a hash of its content, its row count, its size in bytes and the time it was scraped. It is
+written at acquisition time and it is used to skip seasons that are already acquired and will not
+change anymore, and to tell incremental dbt builds exactly which seasons changed since they last ran.
+
+usage: python -m transfermarkt_datasets.core.manifest {update,changed,snapshot} ...
+"""
+import argparse
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+RAW_DATA_DIRECTORY = "data/raw/transfermarkt-scraper"
+MANIFEST_FILE_NAME = "manifest.json"
+
+def file_stats(path: str, chunk_size: int = 1024 * 1024) -> Dict:
+  """Compute the content hash, row count and byte size of a gzipped JSON lines file.
+
+  The hash is computed on the uncompressed content, so that compressing the same documents
+  again (gzip headers hold a timestamp) does not look like a change.
+
+  Args:
+      path (str): Path to the file.
+      chunk_size (int, optional): Size of the chunks the file is read in. Defaults to 1MB.
+
+  Returns:
+      Dict: The "sha256", "rows" and "bytes" of the file.
+  """
+  content_hash = hashlib.sha256()
+  rows = 0
+  last_byte = b"\n"
+
+  with gzip.open(path, "rb") as f:
+    while True:
+      chunk = f.read(chunk_size)
+      if not chunk:
+        break
+      content_hash.update(chunk)
+      rows += chunk.count(b"\n")
+      last_byte = chunk[-1:]
+
+  # the last line might not be terminated
+  if last_byte != b"\n":
+    rows += 1
+
+  return {
+    "sha256": content_hash.hexdigest(),
+    "rows": rows,
+    "bytes": os.path.getsize(path)
+  }
+
+class Manifest:
+  """The manifest of a raw data directory, with an entry per season and asset file.
+
+  Args:
+      directory (str, optional): The raw data directory. Defaults to "data/raw/transfermarkt-scraper".
+      path (str, optional): Path to the manifest file. Defaults to "manifest.json" in the directory.
+  """
+
+  def __init__(self, directory: str = RAW_DATA_DIRECTORY, path: Optional[str] = None) -> None:
+    self.directory = directory
+    self.path = path or os.path.join(directory, MANIFEST_FILE_NAME)
+    self.entries: Dict[str, Dict] = {}
+
+    if os.path.exists(self.path):
+      with open(self.path) as f:
+        self.entries = json.load(f)["files"]
+
+  @staticmethod
+  def key(season: int, asset_name: str) -> str:
+    return f"{season}/{asset_name}.json.gz"
+
+  def file_path(self, season: int, asset_name: str) -> pathlib.Path:
+    return pathlib.Path(self.directory, self.key(season, asset_name))
+
+  def get(self, season: int, asset_name: str) -> Optional[Dict]:
+    return self.entries.get(self.key(season, asset_name))
+
+  def record(self, season: int, asset_name: str, scraped_at: Optional[str] = None) -> bool:
+    """Compute the stats of the file for a season and asset and record them in the manifest.
+
+    Args:
+        season (int): The season.
+        asset_name (str): The asset name.
+        scraped_at (str, optional): ISO timestamp of the time the file was scraped. Defaults to
+          the file's modification time.
+
+    Returns:
+        bool: Whether the content of the file changed since it was last recorded.
+    """
+    path = self.file_path(season, asset_name)
+    if scraped_at is None:
+      scraped_at = datetime.datetime.fromtimestamp(
+        path.stat().st_mtime, datetime.timezone.utc
+      ).isoformat(timespec="seconds")
+
+    previous = self.get(season, asset_name)
+    entry = {
+      "season": int(season),
+      "asset": asset_name,
+      **file_stats(str(path)),
+      "scraped_at": scraped_at
+    }
+    self.entries[self.key(season, asset_name)] = entry
+
+    return previous is None or previous["sha256"] != entry["sha256"]
+
+  def scan(self, seasons: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+    """Record the files in the raw data directory, and forget the entries whose files are gone.
+
+    Args:
+        seasons (List[int], optional): Only scan these seasons. Defaults to all seasons.
+
+    Returns:
+        List[Tuple[int, str]]: The (season, asset name) of the files whose content changed.
+    """
+    changed = []
+    found = set()
+    for path in sorted(pathlib.Path(self.directory).glob("*/*.json.gz")):
+      season, asset_name = path.parent.name, path.name[:-len(".json.gz")]
+      if not season.isdigit() or (seasons is not None and int(season) not in seasons):
+        continue
+      season = int(season)
+      found.add(self.key(season, asset_name))
+
+      if self.record(season, asset_name):
+        changed.append((season, asset_name))
+
+    for key in list(self.entries):
+      entry = self.entries[key]
+      if key not in found and (seasons is None or entry["season"] in seasons):
+        del self.entries[key]
+        changed.append((entry["season"], entry["asset"]))
+
+    return changed
+
+  def is_frozen(self, season: int, asset_name: str, current_season: int) -> bool:
+    """Whether the file for a past season is already acquired, so it does not need to be scraped again.
+
+    A file is frozen if its season is older than the current season and the file on disk
+    is the one in the manifest, with the same content hash. The size is compared first, so
+    files that changed size are not hashed. Modification times are not compared, as they
+    differ between checkouts of the same files.
+    """
+    if season >= current_season:
+      return False
+
+    entry = self.get(season, asset_name)
+    path = self.file_path(season, asset_name)
+    if entry is None or not path.exists() or path.stat().st_size != entry["bytes"]:
+      return False
+
+    return file_stats(str(path))["sha256"] == entry["sha256"]
+
+  def changed_since(self, other: "Manifest") -> List[Tuple[int, str]]:
+    """Get the files that were added, changed or removed since another version of the manifest.
+
+    Returns:
+        List[Tuple[int, str]]: The (season, asset name) of the files that differ, sorted.
+    """
+    changed = set()
+    for key in set(self.entries) | set(other.entries):
+      entry, other_entry = self.entries.get(key), other.entries.get(key)
+      if entry is None or other_entry is None or entry["sha256"] != other_entry["sha256"]:
+        changed_entry = entry or other_entry
+        changed.add((changed_entry["season"], changed_entry["asset"]))
+
+    return sorted(changed)
+
+  def save(self) -> None:
+    """Write the manifest to disk, atomically."""
+    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+    tmp_path = f"{self.path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+      json.dump(
+        {"files": dict(sorted(self.entries.items()))},
+        f,
+        indent=2
+      )
+      f.write("\n")
+    os.replace(tmp_path, self.path)
+
+def incremental_vars(manifest: Manifest, built_manifest_path: str) -> Dict:
+  """Get the dbt vars for an incremental build of the seasons that changed since the manifest
+  at `built_manifest_path` was built.
+
+  If there is no built manifest (for example, on the first build), no vars are set and the
+  models fall back to their default incremental behaviour.
+  """
+  if not os.path.exists(built_manifest_path):
+    return {}
+
+  built_manifest = Manifest(manifest.directory, path=built_manifest_path)
+  seasons = sorted({season for season, _ in manifest.changed_since(built_manifest)})
+
+  return {"incremental_seasons": seasons}
+
+def main(args: Optional[List[str]] = None) -> None:
+  parser = argparse.ArgumentParser()
+  parser.add_argument(
+    '--directory',
+    help="The raw data directory",
+    default=RAW_DATA_DIRECTORY
+  )
+  subparsers = parser.add_subparsers(dest="command", required=True)
+
+  update_parser = subparsers.add_parser(
+    "update",
+    help="Record the files in the raw data directory that are not in the manifest or changed"
+  )
+  update_parser.add_argument(
+    '--seasons',
+    help="Only update these seasons. For example, 2024 or 2012-2024",
+    type=str
+  )
+
+  changed_parser = subparsers.add_parser(
+    "changed",
+    help="Print the dbt vars to build the seasons that changed since a manifest was built"
+  )
+  changed_parser.add_argument(
+    '--since',
+    help="Path to the manifest of the last build",
+    required=True
+  )
+
+  snapshot_parser = subparsers.add_parser(
+    "snapshot",
+    help="Copy the manifest, to keep track of the raw files used by a build"
+  )
+  snapshot_parser.add_argument(
+    '--to',
+    help="Path to copy the manifest to",
+    required=True
+  )
+
+  arguments = parser.parse_args(args)
+  manifest = Manifest(arguments.directory)
+
+  if arguments.command == "update":
+    from transfermarkt_datasets.core.utils import seasons_list
+
+    seasons = seasons_list(arguments.seasons) if arguments.seasons else None
+    changed = manifest.scan(seasons)
+    manifest.save()
+    for season, asset_name in changed:
+      print(f"{season}/{asset_name}")
+
+  elif arguments.command == "changed":
+    print(json.dumps(incremental_vars(manifest, arguments.since)))
+
+  elif arguments.command == "snapshot":
+    if os.path.exists(manifest.path):
+      shutil.copyfile(manifest.path, arguments.to)
+
+if __name__ == "__main__":
+  main()
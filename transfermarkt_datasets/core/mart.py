@@ -0,0 +1,194 @@
+"""Marts: the columns of a few related assets, joined and filtered in a single catalog query.
+
+A mart is compiled into one DuckDB query where each asset is read in its own subquery, with only
+the columns that the mart needs and with the filters on that asset applied, and only then joined
+to the others. Filtering before joining keeps interactive queries down to the rows that are
+actually shown, instead of joining whole assets in pandas and filtering the result.
+"""
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from transfermarkt_datasets.core.catalog import Catalog
+from transfermarkt_datasets.core.utils import FILTER_OPERATORS, Filter
+
+class InvalidMart(Exception):
+  pass
+
+def _fields(fields: Union[str, List[str]]) -> List[str]:
+  return [fields] if isinstance(fields, str) else list(fields)
+
+def _parameter(value: Any) -> Any:
+  # numpy and pandas scalars, as they come from dataframes, are passed as python values
+  if isinstance(value, pd.Timestamp):
+    return value.to_pydatetime()
+  if hasattr(value, "item"):
+    return value.item()
+  return value
+
+def predicate(field: str, operator: str, value: Any, parameters: list, placeholder: str = "?") -> str:
+  """Compile a filter on a field into a SQL predicate, appending its values to the query parameters.
+
+  Args:
+      field (str): The name of the field.
+      operator (str): One of `FILTER_OPERATORS`.
+      value (Any): The value, or the list of values for "in" and "not in".
+      parameters (list): The query parameters.
+      placeholder (str, optional): The SQL for each parameter, for example to cast it. Defaults to "?".
+
+  Returns:
+      str: The predicate.
+  """
+  column = f'"{field}"'
+  if operator in ("in", "not in"):
+    values = list(value)
+    if not values:
+      return "false" if operator == "in" else "true"
+    parameters.extend(_parameter(value) for value in values)
+    placeholders = ", ".join(placeholder for _ in values)
+    return f"{column} {operator.upper()} ({placeholders})"
+
+  if value is None:
+    return f"{column} IS NULL" if operator in ("=", "==") else f"{column} IS NOT NULL"
+
+  parameters.append(_parameter(value))
+  return f"{column} {'=' if operator == '==' else operator} {placeholder}"
+
+class MartQuery:
+  """A mart over a base asset and the assets joined to it through their relationships.
+
+  Columns and filters refer to asset fields as "<asset>.<field>", or just "<field>" for fields of
+  the base asset.
+
+  Args:
+      catalog (Catalog): The catalog holding the assets.
+      base (str): The name of the base asset. Every row of the mart comes from one of its rows.
+      joins (List[Union[str, Dict]], optional): The assets joined to the mart, in order. Each is
+        either an asset name, joined through the first relationship between that asset and one
+        already in the mart, or a relationship as returned by `Dataset.get_relationships`.
+      relationships (List[Dict], optional): The relationships that asset names in `joins` are
+        resolved with.
+      columns (Union[List[str], Dict[str, str]], optional): The columns of the mart, or a mapping of
+        columns to their names in the result. Defaults to all fields of the base asset.
+      filters (List[Filter], optional): Predicates in (column, operator, value) form. They are
+        combined with AND.
+      distinct (bool, optional): Return distinct rows only. Defaults to False.
+  """
+
+  def __init__(
+    self,
+    catalog: Catalog,
+    base: str,
+    joins: Optional[List[Union[str, Dict]]] = None,
+    relationships: Optional[List[Dict]] = None,
+    columns: Optional[Union[List[str], Dict[str, str]]] = None,
+    filters: Optional[List[Filter]] = None,
+    distinct: bool = False) -> None:
+
+    self.catalog = catalog
+    self.base = base
+    self.distinct = distinct
+
+    self.assets = [base]
+    self.relationships = []
+    for join in joins or []:
+      relationship = self._resolve(join, relationships or [])
+      self.relationships.append(relationship)
+      self.assets.append(
+        relationship["from"] if relationship["to"] in self.assets else relationship["to"]
+      )
+
+    if columns is None:
+      columns = self._schema(base).field_names
+    if not isinstance(columns, dict):
+      columns = {column: self._split(column)[1] for column in columns}
+    self.columns = {self._split(column): name for column, name in columns.items()}
+
+    output_names = list(self.columns.values())
+    duplicated = {name for name in output_names if output_names.count(name) > 1}
+    if duplicated:
+      raise InvalidMart(f"Columns {duplicated} are in more than one asset, name them with a mapping")
+
+    self.filters = [(self._split(column), operator, value) for column, operator, value in filters or []]
+    for _, operator, _ in self.filters:
+      if operator not in FILTER_OPERATORS:
+        raise InvalidMart(f"Unsupported filter operator '{operator}'. Use one of {FILTER_OPERATORS}")
+
+  def _schema(self, asset_name: str):
+    asset = self.catalog.assets.get(asset_name)
+    if asset is None:
+      raise InvalidMart(f"Asset {asset_name} is not in the dataset")
+    return asset.schema
+
+  def _split(self, column: str) -> Tuple[str, str]:
+    asset_name, _, field = column.rpartition(".")
+    asset_name = asset_name or self.base
+    if asset_name not in self.assets:
+      raise InvalidMart(f"Asset {asset_name} of column {column} is not joined to the mart")
+    if field not in self._schema(asset_name).field_names:
+      raise InvalidMart(f"{field} is not a field of {asset_name}")
+    return asset_name, field
+
+  def _resolve(self, join: Union[str, Dict], relationships: List[Dict]) -> Dict:
+    if isinstance(join, dict):
+      if (join["from"] in self.assets) == (join["to"] in self.assets):
+        raise InvalidMart(f"Relationship {join['from']} -> {join['to']} does not join a new asset to the mart")
+      return join
+
+    for relationship in relationships:
+      ends = (relationship["from"], relationship["to"])
+      if join in ends and any(asset_name in ends for asset_name in self.assets if asset_name != join):
+        return relationship
+
+    raise InvalidMart(f"No relationship joins {join} to any of {self.assets}")
+
+  def _subquery(self, position: int, asset_name: str, parameters: list) -> str:
+    # an asset is read with only the columns the mart needs and its own filters applied
+    fields = [field for (name, field) in self.columns if name == asset_name]
+    for relationship in self.relationships:
+      if asset_name == relationship["from"]:
+        fields += _fields(relationship["on"]["source"])
+      if asset_name == relationship["to"]:
+        fields += _fields(relationship["on"]["target"])
+
+    select = ", ".join(f'"{field}"' for field in dict.fromkeys(fields)) or "1"
+    predicates = [
+      predicate(field, operator, value, parameters)
+      for (name, field), operator, value in self.filters
+      if name == asset_name
+    ]
+    where = f" WHERE {' AND '.join(predicates)}" if predicates else ""
+
+    return f"(SELECT {select} FROM {self.catalog.relation(asset_name)}{where}) AS a{position}"
+
+  def compile(self) -> Tuple[str, list]:
+    """Compile the mart into a query.
+
+    Returns:
+        Tuple[str, list]: The query and its parameters.
+    """
+    parameters = []
+    aliases = {asset_name: f"a{position}" for position, asset_name in enumerate(self.assets)}
+    filtered_assets = {name for (name, _), _, _ in self.filters}
+
+    from_clause = self._subquery(0, self.base, parameters)
+    for position, (asset_name, relationship) in enumerate(zip(self.assets[1:], self.relationships), start=1):
+      condition = " AND ".join(
+        f'{aliases[relationship["from"]]}."{source}" = {aliases[relationship["to"]]}."{target}"'
+        for source, target in zip(_fields(relationship["on"]["source"]), _fields(relationship["on"]["target"]))
+      )
+      # rows of the base asset are kept when a joined asset has no match, unless it is filtered
+      join_type = "INNER JOIN" if asset_name in filtered_assets else "LEFT JOIN"
+      from_clause += f" {join_type} {self._subquery(position, asset_name, parameters)} ON {condition}"
+
+    select = ", ".join(
+      f'{aliases[asset_name]}."{field}" AS "{name}"'
+      for (asset_name, field), name in self.columns.items()
+    )
+    distinct = "DISTINCT " if self.distinct else ""
+
+    return f"SELECT {distinct}{select} FROM {from_clause}", parameters
+
+  def to_dataframe(self) -> pd.DataFrame:
+    query, parameters = self.compile()
+    return self.catalog.query(query, parameters)
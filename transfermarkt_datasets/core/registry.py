@@ -0,0 +1,97 @@
+"""Registry of the dataset assets.
+
+The assets defined in transfermarkt_datasets/assets are listed here, so that a `Dataset` does not
+need to scan the assets folder and import every asset module in order to know which assets exist.
+Asset modules are imported and assets instantiated lazily, the first time each of them is accessed.
+
+When an asset module is added to transfermarkt_datasets/assets, it must be added here too (the
+test suite checks that both are in sync).
+"""
+from collections.abc import MutableMapping
+import importlib
+import pathlib
+from typing import Callable, Dict, Iterator, Optional
+
+ASSETS_PATH = pathlib.Path(__file__).parent.parent / "assets"
+ASSETS_MODULE = "transfermarkt_datasets.assets"
+
+# asset name -> (module name, class name)
+ASSETS = {
+  "cur_appearances": ("cur_appearances", "CurAppearancesAsset"),
+  "cur_club_games": ("cur_club_games", "CurClubGamesAsset"),
+  "cur_clubs": ("cur_clubs", "CurClubsAsset"),
+  "cur_competitions": ("cur_competitions", "CurCompetitionsAsset"),
+  "cur_game_events": ("cur_game_events", "CurGameEventsAsset"),
+  "cur_game_lineups": ("cur_game_lineups", "CurGameLineupsAsset"),
+  "cur_games": ("cur_games", "CurGamesAsset"),
+  "cur_manager_performance": ("cur_manager_performance", "CurManagerPerformanceAsset"),
+  "cur_player_valuations": ("cur_player_valuations", "CurPlayerValuationsAsset"),
+  "cur_players": ("cur_players", "CurPlayersAsset"),
+  "cur_transfers": ("cur_transfers", "CurTransfersAsset"),
+}
+
+def get_asset_class(module: str, class_name: str) -> type:
+  return getattr(importlib.import_module(module), class_name)
+
+class LazyAssets(MutableMapping):
+  """A mapping of asset names to assets, where assets are only instantiated on first access.
+
+  Args:
+      factories (Dict[str, Callable]): A function that creates the asset, by asset name.
+      on_create (Callable, optional): A function that is called with each asset as it is created.
+  """
+
+  def __init__(
+    self,
+    factories: Dict[str, Callable],
+    on_create: Optional[Callable] = None) -> None:
+
+    self._factories = dict(factories)
+    self._assets = {}
+    self.on_create = on_create
+
+  @classmethod
+  def from_registry(cls, on_create: Optional[Callable] = None) -> "LazyAssets":
+    factories = {
+      name: (lambda module=module, class_name=class_name: get_asset_class(f"{ASSETS_MODULE}.{module}", class_name)())
+      for name, (module, class_name) in ASSETS.items()
+    }
+    return cls(factories, on_create)
+
+  @property
+  def loaded(self) -> Dict:
+    """The assets that have been instantiated so far, by name."""
+    return dict(self._assets)
+
+  def __getitem__(self, name: str):
+    if name not in self._assets:
+      if name not in self._factories:
+        raise KeyError(name)
+      asset = self._factories[name]()
+      if self.on_create is not None:
+        self.on_create(asset)
+      self._assets[name] = asset
+
+    return self._assets[name]
+
+  def __setitem__(self, name: str, asset) -> None:
+    self._assets[name] = asset
+    self._factories.pop(name, None)
+
+  def __delitem__(self, name: str) -> None:
+    if name not in self._assets and name not in self._factories:
+      raise KeyError(name)
+    self._assets.pop(name, None)
+    self._factories.pop(name, None)
+
+  def __contains__(self, name) -> bool:
+    return name in self._factories or name in self._assets
+
+  def __iter__(self) -> Iterator[str]:
+    yield from self._factories
+    for name in self._assets:
+      if name not in self._factories:
+        yield name
+
+  def __len__(self) -> int:
+    return len(set(self._factories) | set(self._assets))
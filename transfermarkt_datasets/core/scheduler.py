@@ -0,0 +1,101 @@
+"""Scheduling of the scraper crawls as a dependency graph across seasons.
+
+Crawls run on the Twisted reactor, as scrapy crawlers do, so they are represented by Deferreds.
+"""
+import logging
+from typing import Any, Callable, List, Optional
+
+from twisted.internet import defer
+
+def schedule_crawls(
+  crawl: Callable[[int, Any], defer.Deferred],
+  assets: List[Any],
+  seasons: List[int],
+  max_parallel: int,
+  skip: Optional[Callable[[int, Any], bool]] = None) -> defer.Deferred:
+  """Schedule the crawls for a list of assets and seasons as a dependency graph.
+
+  The crawl of an asset for a season starts as soon as the crawl of its parent asset for the
+  same season is done (or right away, if the parent is not being crawled in this run), so
+  different seasons progress independently of each other. At most `max_parallel` crawls run
+  at the same time. If a crawl fails, the crawls that depend on it are skipped. Crawls for
+  which `skip` returns True are not run, and the crawls that depend on them start right away.
+  If `skip` raises, or the crawl cannot be started, the crawl is counted as failed too.
+
+  Args:
+      crawl (Callable[[int, Any], defer.Deferred]): Start the crawl of an asset for a season.
+      assets (List[Any]): List of assets to be scraped, with a `name` and a `parent` asset (or None).
+      seasons (List[int]): List of seasons to be scraped.
+      max_parallel (int): Maximum number of crawls running at the same time.
+      skip (Callable[[int, Any], bool], optional): Whether the crawl of an asset for a season can be skipped.
+
+  Returns:
+      defer.Deferred: Fires once all crawls are done, with the list of (season, asset name) that failed.
+  """
+  semaphore = defer.DeferredSemaphore(max_parallel)
+  assets_by_name = {asset_obj.name: asset_obj for asset_obj in assets}
+  crawls = {}
+  failed = []
+
+  def crawl_and_report(season, asset_obj):
+    d = defer.maybeDeferred(crawl, season, asset_obj)
+
+    def on_success(_):
+      logging.info(f"Completed {asset_obj.name} for season {season}")
+      return True
+
+    def on_failure(failure):
+      logging.error(f"Failed {asset_obj.name} for season {season}: {failure.getErrorMessage()}")
+      failed.append((season, asset_obj.name))
+      return False
+
+    return d.addCallbacks(on_success, on_failure)
+
+  def when_done(d: defer.Deferred) -> defer.Deferred:
+    # a deferred that fires with the result of `d`, without taking over its callback chain.
+    # Crawls always end with a result, but a failure is passed on as a failed crawl, so that
+    # waiters fire in any case and the run does not hang
+    waiter = defer.Deferred()
+
+    def pass_on(result):
+      succeeded = result if isinstance(result, bool) else False
+      waiter.callback(succeeded)
+      return result
+
+    d.addBoth(pass_on)
+    return waiter
+
+  def schedule(season, asset_obj) -> defer.Deferred:
+    key = (season, asset_obj.name)
+    if key not in crawls:
+      parent_obj = assets_by_name.get(asset_obj.parent.name) if asset_obj.parent else None
+      if parent_obj is not None:
+        ready = when_done(schedule(season, parent_obj))
+      else:
+        ready = defer.succeed(True)
+
+      def start(parent_succeeded):
+        if not parent_succeeded:
+          logging.warning(f"Skipping {asset_obj.name} for season {season} as its parent failed")
+          failed.append(key)
+          return False
+        if skip is not None and skip(season, asset_obj):
+          logging.info(f"Skipping {asset_obj.name} for season {season} as it is frozen")
+          return True
+        return semaphore.run(crawl_and_report, season, asset_obj)
+
+      def on_error(failure):
+        logging.error(f"Failed to start {asset_obj.name} for season {season}: {failure.getErrorMessage()}")
+        failed.append(key)
+        return False
+
+      crawls[key] = ready.addCallback(start).addErrback(on_error)
+
+    return crawls[key]
+
+  for season in seasons:
+    for asset_obj in assets:
+      schedule(season, asset_obj)
+
+  all_done = defer.DeferredList([when_done(d) for d in crawls.values()])
+  return all_done.addCallback(lambda _: failed)
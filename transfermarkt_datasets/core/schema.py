@@ -1,7 +1,27 @@
 
-from typing import List
-
-import frictionless
+from typing import TYPE_CHECKING, Dict, List
+
+# frictionless is only needed to export the schema, so it is imported on demand
+if TYPE_CHECKING:
+    import frictionless
+
+# pandas dtypes used to load each of the schema field types. "date" fields are parsed
+# separately as datetimes, so they are not part of this mapping.
+PANDAS_DTYPES = {
+    "integer": "Int64",
+    "number": "float64",
+    "string": "string",
+    "boolean": "boolean"
+}
+
+# DuckDB column types used to represent each of the schema field types
+DUCKDB_TYPES = {
+    "integer": "BIGINT",
+    "number": "DOUBLE",
+    "string": "VARCHAR",
+    "boolean": "BOOLEAN",
+    "date": "DATE"
+}
 
 class Field:
     def __init__(
@@ -10,23 +30,29 @@ class Field:
         type: str,
         description: str = None,
         tags: List[str] = None,
-        form: str = None) -> None:
+        form: str = None,
+        required: bool = False) -> None:
         
         self.name = name
         self.type = type
         self.description = description
         self.form = form
         self.tags = tags or []
+        # whether the field must have a value in every row (primary key fields always do)
+        self.required = required
 
     def __eq__(self, __o: object) -> bool:
         return self.name == __o.name
 
-    def as_frictionless_field(self) -> frictionless.Field:
+    def as_frictionless_field(self) -> "frictionless.Field":
+        import frictionless
+
         fl_field = frictionless.Field(
             name=self.name,
             type=self.type,
             description=self.description,
-            format=self.form
+            format=self.form,
+            constraints={"required": True} if self.required else None
         )
 
         return fl_field
@@ -37,6 +63,17 @@ class Field:
         else:
             return False
 
+    @property
+    def pandas_dtype(self) -> str:
+        """The pandas dtype that should be used to hold values for this field.
+        Fields tagged as "categorical" are loaded as pandas categoricals, which is much
+        cheaper in memory for low cardinality string columns.
+        """
+        if self.has_tag("categorical"):
+            return "category"
+        else:
+            return PANDAS_DTYPES.get(self.type, "object")
+
 class Schema:
     def __init__(
         self,
@@ -57,6 +94,35 @@ class Schema:
             field
         )
 
+    @property
+    def duckdb_types(self) -> Dict[str, str]:
+        """DuckDB column types for all the fields in the schema.
+
+        Returns:
+            Dict[str, str]: A mapping of field names to DuckDB types
+        """
+        return {
+            field.name: DUCKDB_TYPES.get(field.type, "VARCHAR")
+            for field in self.fields
+        }
+
+    @property
+    def date_field_names(self) -> List[str]:
+        return [field.name for field in self.fields if field.type == "date"]
+
+    @property
+    def pandas_dtypes(self) -> Dict[str, str]:
+        """Explicit pandas dtypes for all the non-date fields in the schema.
+
+        Returns:
+            Dict[str, str]: A mapping of field names to pandas dtypes
+        """
+        return {
+            field.name: field.pandas_dtype
+            for field in self.fields
+            if field.type != "date"
+        }
+
     def get_fields_by_tag(self, tag: str) -> List[Field]:
 
         matched_tag = [
@@ -65,7 +131,8 @@ class Schema:
 
         return matched_tag
 
-    def as_frictionless_schema(self) -> frictionless.schema.Schema:
+    def as_frictionless_schema(self) -> "frictionless.schema.Schema":
+        import frictionless
 
         fl_fields = [field.as_frictionless_field()
             for field in self.fields
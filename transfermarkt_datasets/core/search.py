@@ -0,0 +1,208 @@
+"""Fuzzy search over the names in an asset, such as player and club names.
+
+A `NameIndex` holds the trigrams of every name, as sorted postings from trigram to names, so a
+search only looks at the names that share a trigram with the query. Names are scored by the share of
+trigrams they have in common with the query. Names where a word starts with the query rank first,
+so that typing the first letters of a name finds it right away.
+
+Building the postings takes a pass over all names in Python, so they are persisted in `data/index`
+until the prepared file they were built from changes.
+"""
+import logging
+import os
+import re
+import unicodedata
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from transfermarkt_datasets.core.index import FINGERPRINT_KEY, fingerprint
+
+SEARCH_INDEX_FILE_SUFFIX = ".trigrams.parquet"
+# number of candidates, by trigram similarity, that are checked for a prefix match
+PRESELECTED_CANDIDATES = 200
+
+def search_index_path(index_location: str, asset_name: str, field_name: str) -> str:
+  return os.path.join(index_location, f"{asset_name}.{field_name}{SEARCH_INDEX_FILE_SUFFIX}")
+
+def normalize(name: str) -> str:
+  """Lowercase a name, strip its accents and punctuation and collapse its whitespace."""
+  name = unicodedata.normalize("NFKD", str(name))
+  name = "".join(char for char in name if not unicodedata.combining(char))
+  return " ".join(re.sub(r"[^\w\s]", " ", name.lower()).split())
+
+def trigram_codes(normalized_name: str) -> np.ndarray:
+  """Get the trigrams of a normalized name, each packed in an integer.
+
+  Words are padded with spaces, so that the start of each word is a trigram of its own.
+  """
+  padded = "  " + normalized_name + " "
+  codes = {
+    (ord(padded[i]) << 42) | (ord(padded[i + 1]) << 21) | ord(padded[i + 2])
+    for i in range(len(padded) - 2)
+  }
+  return np.fromiter(codes, dtype="int64", count=len(codes))
+
+class NameIndex:
+  """A trigram index over names.
+
+  Args:
+      keys (np.ndarray): The key of the row of each name.
+      names (np.ndarray): The names.
+      trigrams (np.ndarray): Sorted trigram codes, one per (trigram, name) pair.
+      entries (np.ndarray): The position in `names` of the name of each trigram in `trigrams`.
+      source_fingerprint (str, optional): The fingerprint of the file the index was built from.
+  """
+
+  def __init__(
+    self,
+    keys: np.ndarray,
+    names: np.ndarray,
+    trigrams: np.ndarray,
+    entries: np.ndarray,
+    source_fingerprint: Optional[str] = None) -> None:
+
+    self.keys = keys
+    self.names = names
+    self.trigrams = trigrams
+    self.entries = entries
+    self.source_fingerprint = source_fingerprint
+
+    self.normalized = np.array([normalize(name) for name in names], dtype=object)
+    self.trigram_counts = np.bincount(entries, minlength=len(names))
+
+  def __len__(self) -> int:
+    return len(self.names)
+
+  @staticmethod
+  def postings(names: np.ndarray):
+    """Build the sorted (trigram, entry) postings of a list of names."""
+    codes = [trigram_codes(normalize(name)) for name in names]
+    trigrams = np.concatenate(codes) if codes else np.array([], dtype="int64")
+    entries = np.repeat(np.arange(len(codes), dtype="int32"), [len(c) for c in codes])
+    order = np.argsort(trigrams, kind="stable")
+    return trigrams[order], entries[order]
+
+  @classmethod
+  def from_values(
+    cls,
+    keys: pd.Series,
+    names: pd.Series,
+    source_fingerprint: Optional[str] = None) -> "NameIndex":
+    """Build the index of some names, dropping the missing ones."""
+    not_null = names.notna().to_numpy()
+    keys = keys.to_numpy()[not_null]
+    names = names.astype(str).to_numpy(dtype=object)[not_null]
+    trigrams, entries = cls.postings(names)
+    return cls(keys, names, trigrams, entries, source_fingerprint)
+
+  def save(self, path: str) -> None:
+    """Persist the postings of the index. Names and keys are read again from the prepared file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({"trigram": self.trigrams, "entry": self.entries})
+    table = table.replace_schema_metadata({
+      FINGERPRINT_KEY: (self.source_fingerprint or "").encode(),
+      b"names": str(len(self.names)).encode()
+    })
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+  @classmethod
+  def load(cls, path: str, keys: pd.Series, names: pd.Series) -> Optional["NameIndex"]:
+    """Load persisted postings for some names. Returns None if they were built for other names."""
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(path)
+    metadata = table.schema.metadata or {}
+    not_null = names.notna().to_numpy()
+    if int(metadata.get(b"names", b"-1")) != int(not_null.sum()):
+      return None
+
+    return cls(
+      keys=keys.to_numpy()[not_null],
+      names=names.astype(str).to_numpy(dtype=object)[not_null],
+      trigrams=table.column("trigram").to_numpy(),
+      entries=table.column("entry").to_numpy(),
+      source_fingerprint=metadata.get(FINGERPRINT_KEY, b"").decode() or None
+    )
+
+  def search(self, query: str, k: int = 10) -> pd.DataFrame:
+    """Find the names that best match a query.
+
+    Args:
+        query (str): The text to search for, usually the first letters of a name.
+        k (int, optional): The maximum number of matches. Defaults to 10.
+
+    Returns:
+        pd.DataFrame: The "key", "name" and "score" of the best matches, best first.
+    """
+    normalized_query = normalize(query)
+    if not normalized_query or len(self.names) == 0:
+      return pd.DataFrame({"key": [], "name": [], "score": []})
+
+    query_trigrams = trigram_codes(normalized_query)
+    starts = np.searchsorted(self.trigrams, query_trigrams, side="left")
+    ends = np.searchsorted(self.trigrams, query_trigrams, side="right")
+    candidates = np.concatenate([self.entries[start:end] for start, end in zip(starts, ends)])
+    if len(candidates) == 0:
+      return pd.DataFrame({"key": [], "name": [], "score": []})
+
+    # Jaccard similarity between the trigrams of the query and of each candidate name
+    shared = np.bincount(candidates, minlength=len(self.names))
+    candidates = np.flatnonzero(shared)
+    scores = shared[candidates] / (len(query_trigrams) + self.trigram_counts[candidates] - shared[candidates])
+
+    # only the best candidates are checked one by one
+    if len(candidates) > PRESELECTED_CANDIDATES:
+      best = np.argpartition(-scores, PRESELECTED_CANDIDATES)[:PRESELECTED_CANDIDATES]
+      candidates, scores = candidates[best], scores[best]
+
+    # names with a word that starts with the query rank first
+    prefix = " " + normalized_query
+    scores = scores + np.array(
+      [(" " + self.normalized[candidate]).find(prefix) >= 0 for candidate in candidates]
+    )
+
+    order = np.argsort(-scores, kind="stable")[:k]
+    top = candidates[order]
+    top_scores = scores[order]
+
+    return pd.DataFrame({
+      "key": self.keys[top],
+      "name": self.names[top],
+      "score": top_scores
+    })
+
+def load_name_index(
+  source_path: str,
+  path: str,
+  keys: pd.Series,
+  names: pd.Series,
+  log: Optional[logging.Logger] = None) -> NameIndex:
+  """Load the persisted name index of a prepared file, building it if it does not exist or the file
+  changed since it was built. If the index cannot be persisted, it is only kept in memory.
+  """
+  log = log or logging.getLogger("main")
+  source_fingerprint = fingerprint(source_path)
+
+  if os.path.exists(path):
+    try:
+      index = NameIndex.load(path, keys, names)
+      if index is not None and index.source_fingerprint == source_fingerprint:
+        return index
+    except Exception as e:
+      log.warning("Unable to load name index %s, rebuilding it: %s", path, e)
+
+  index = NameIndex.from_values(keys, names, source_fingerprint)
+  try:
+    index.save(path)
+  except OSError as e:
+    log.warning("Unable to persist name index %s: %s", path, e)
+
+  return index
@@ -0,0 +1,138 @@
+"""Column statistics of the prepared assets.
+
+The statistics of each asset are computed when the asset is exported by dbt (see the
+`export_table` macro in dbt/macros/io.sql) and stored next to the prepared files, which are named
+after the dbt model (`data/prep/games.stats.json` for `games.csv.gz`, see `Asset.stats_path`), as
+JSON lines with one entry per column:
+  * column: the column name,
+  * type: the column type,
+  * rows: the number of rows in the asset,
+  * nulls: the number of null values,
+  * min, max: the smallest and largest values, as strings,
+  * distinct: the approximate number of distinct values,
+  * sample_values: a few distinct values, as strings.
+
+Readers get row counts, value ranges and samples from this small file instead of scanning the data.
+The query in `stats_query` must be kept in sync with the `column_stats_query` dbt macro.
+"""
+import argparse
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+  from transfermarkt_datasets.core.catalog import Catalog
+
+STATS_FILE_SUFFIX = ".stats.json"
+STATS_COLUMNS = ["column", "type", "rows", "nulls", "min", "max", "distinct", "sample_values"]
+
+def stats_query(relation: str, column_types: Dict[str, str], sample_size: int = 3) -> str:
+  """Build the query that computes the statistics of every column of a relation.
+
+  Each column is summarized in a branch of a UNION ALL. As the prepared files are columnar, each
+  branch only reads its own column, so the whole query costs about one scan of the relation.
+
+  Args:
+      relation (str): The quoted relation name.
+      column_types (Dict[str, str]): The relation columns and their types, in order.
+      sample_size (int, optional): Number of sample values kept for each column. Defaults to 3.
+
+  Returns:
+      str: The query, with one row per column.
+  """
+  branches = []
+  for position, (name, column_type) in enumerate(column_types.items()):
+    column = f'"{name}"'
+    branches.append(f"""
+      SELECT
+        {position} AS position,
+        '{name}' AS "column",
+        '{column_type}' AS "type",
+        count(*) AS "rows",
+        count(*) - count({column}) AS "nulls",
+        CAST(min({column}) AS VARCHAR) AS "min",
+        CAST(max({column}) AS VARCHAR) AS "max",
+        least(approx_count_distinct({column}), count({column})) AS "distinct",
+        (
+          SELECT list(CAST(value AS VARCHAR))
+          FROM (SELECT DISTINCT {column} AS value FROM {relation} WHERE {column} IS NOT NULL LIMIT {sample_size})
+        ) AS "sample_values"
+      FROM {relation}
+    """)
+
+  return (
+    "SELECT * EXCLUDE (position) FROM ("
+    + " UNION ALL ".join(branches)
+    + ") ORDER BY position"
+  )
+
+def read_stats(path: str) -> pd.DataFrame:
+  """Read a statistics file.
+
+  Args:
+      path (str): Path to the statistics file.
+
+  Returns:
+      pd.DataFrame: The statistics, indexed by column name.
+  """
+  stats = pd.read_json(path, lines=True, dtype=False)
+  return _as_stats(stats)
+
+def _as_stats(stats: pd.DataFrame) -> pd.DataFrame:
+  stats = stats.reindex(columns=STATS_COLUMNS)
+  # columns with only nulls have no sample values
+  stats["sample_values"] = stats["sample_values"].map(
+    lambda values: list(values) if isinstance(values, (list, np.ndarray)) else []
+  )
+  return stats.set_index("column")
+
+def compute_stats(catalog: "Catalog", asset_name: str, sample_size: int = 3) -> pd.DataFrame:
+  """Compute the statistics of an asset from the catalog.
+
+  Args:
+      catalog (Catalog): The catalog that holds the asset.
+      asset_name (str): The name of the asset.
+      sample_size (int, optional): Number of sample values kept for each column. Defaults to 3.
+
+  Returns:
+      pd.DataFrame: The statistics, indexed by column name.
+  """
+  relation = catalog.relation(asset_name)
+  column_types = catalog.assets[asset_name].schema.duckdb_types
+  return _as_stats(catalog.query(stats_query(relation, column_types, sample_size)))
+
+def write_stats(catalog: "Catalog", asset_name: str, sample_size: int = 3) -> str:
+  """Compute the statistics of an asset from the catalog and write them next to its prepared files.
+  This produces the same file as the dbt export, for prepared files that were built without it.
+
+  Returns:
+      str: The path of the statistics file.
+  """
+  asset = catalog.assets[asset_name]
+  path = asset.stats_path
+  query = stats_query(catalog.relation(asset_name), asset.schema.duckdb_types, sample_size)
+  catalog.execute(f"COPY ({query}) TO '{os.path.abspath(path)}' (FORMAT JSON)")
+  return path
+
+def main(args: Optional[List[str]] = None) -> None:
+  from transfermarkt_datasets.core.dataset import Dataset
+
+  parser = argparse.ArgumentParser()
+  parser.add_argument(
+    '--assets',
+    help="Names of the assets to write the statistics for. Defaults to all public assets",
+    nargs="*"
+  )
+
+  arguments = parser.parse_args(args)
+  td = Dataset()
+  asset_names = arguments.assets or [
+    name for name in td.asset_names if td.assets[name].public
+  ]
+  for asset_name in asset_names:
+    print(write_stats(td.catalog, asset_name))
+
+if __name__ == "__main__":
+  main()
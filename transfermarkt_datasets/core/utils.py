@@ -1,10 +1,8 @@
 """A generic set of util functions used across the project.
 """
-from pandas import DataFrame
-import yaml
-from typing import Dict, List
+from pandas import DataFrame, Series
+from typing import Any, Dict, List, Tuple
 
-import boto3
 from time import sleep
 
 
@@ -17,6 +15,8 @@ def read_config(config_file="config.yml") -> Dict:
 	Returns:
 			Dict: The parsed config in a python dict
 	"""
+	import yaml
+
 	with open(config_file) as config_file:
 		config = yaml.load(config_file, yaml.Loader)
 		return config
@@ -63,7 +63,8 @@ def submit_batch_job_and_wait(
 	) -> None:
 	"""Launch a job in AWS Batch and wait for completion.
 	"""
-	
+	import boto3
+
 	client = boto3.client("batch", region_name="eu-west-1")
 
 	job_definitions = client.describe_job_definitions(
@@ -118,3 +119,45 @@ def submit_batch_job_and_wait(
 
 def get_sample_values(df: DataFrame, column: str, n: int) -> List[object]:
 	return list(df[column].unique())[:3]
+
+
+# a row predicate, in the (column, operator, value) form that pyarrow understands
+Filter = Tuple[str, str, Any]
+
+FILTER_OPERATORS = ["=", "==", "!=", "<", "<=", ">", ">=", "in", "not in"]
+
+def filters_mask(df: DataFrame, filters: List[Filter]) -> Series:
+	"""Evaluate a list of row predicates over a dataframe. Predicates are combined with AND.
+
+	Args:
+		df (DataFrame): The dataframe to be filtered.
+		filters (List[Filter]): A list of (column, operator, value) tuples, for example
+			[("season", ">=", 2020), ("competition_id", "in", ["GB1", "ES1"])].
+
+	Returns:
+		Series: A boolean mask with the rows that satisfy all predicates.
+	"""
+	mask = Series(True, index=df.index)
+
+	for column, operator, value in filters:
+		values = df[column]
+		if operator in ["=", "=="]:
+			mask &= (values == value)
+		elif operator == "!=":
+			mask &= (values != value)
+		elif operator == "<":
+			mask &= (values < value)
+		elif operator == "<=":
+			mask &= (values <= value)
+		elif operator == ">":
+			mask &= (values > value)
+		elif operator == ">=":
+			mask &= (values >= value)
+		elif operator == "in":
+			mask &= values.isin(value)
+		elif operator == "not in":
+			mask &= ~values.isin(value)
+		else:
+			raise ValueError(f"Unsupported filter operator '{operator}'. Use one of {FILTER_OPERATORS}")
+
+	return mask.fillna(False).astype(bool)
@@ -0,0 +1,239 @@
+"""Vectorized validation of dataframes against an asset `Schema`.
+
+Every check runs on whole columns at once (no Python loop over rows), so that validating even the
+largest assets takes a fraction of a second. The checks are:
+  * types: values must be parseable as the field type,
+  * formats: values of "uri" fields must be absolute URIs,
+  * nullability: required fields and primary key fields must not be null,
+  * primary key: the combination of primary key fields must be unique.
+"""
+from typing import TYPE_CHECKING, List, Union
+
+import numpy as np
+import pandas as pd
+
+from transfermarkt_datasets.core.schema import Schema
+
+if TYPE_CHECKING:
+  import pyarrow as pa
+
+# string values are parsed with Arrow compute kernels, which run over the whole column in C++
+INTEGER_PATTERN = r"^\s*[+-]?\d+(\.0*)?\s*$"
+NUMBER_PATTERN = r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$"
+DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?)?$"
+URI_PATTERN = r"^[A-Za-z][A-Za-z0-9+.\-]*://[^\s/?#]+\S*$"
+
+BOOLEAN_VALUES = ["true", "false", "True", "False", "TRUE", "FALSE", "1", "0"]
+
+class ValidationFailure:
+  """A check that failed for some rows of a dataframe.
+
+  Args:
+      check (str): The name of the check, one of "missing", "type", "format", "required" or "primary_key".
+      fields (List[str]): The fields the check ran on.
+      rows (int): Number of rows that failed the check.
+      sample (list): Some of the values that failed the check.
+  """
+
+  def __init__(self, check: str, fields: List[str], rows: int, sample: list) -> None:
+    self.check = check
+    self.fields = fields
+    self.rows = rows
+    self.sample = sample
+
+  def __repr__(self) -> str:
+    return f"ValidationFailure(check={self.check}, fields={self.fields}, rows={self.rows}, sample={self.sample})"
+
+class ValidationReport:
+  """The outcome of validating a dataframe against a schema."""
+
+  def __init__(self, rows: int, failures: List[ValidationFailure]) -> None:
+    self.rows = rows
+    self.failures = failures
+
+  @property
+  def valid(self) -> bool:
+    return len(self.failures) == 0
+
+  def __str__(self) -> str:
+    if self.valid:
+      return f"{self.rows} rows are valid"
+    lines = [f"{len(self.failures)} checks failed on {self.rows} rows:"]
+    for failure in self.failures:
+      lines.append(
+        f"  - {failure.check} on {', '.join(failure.fields)}: {failure.rows} rows, for example {failure.sample}"
+      )
+    return "\n".join(lines)
+
+  def as_dataframe(self) -> pd.DataFrame:
+    return pd.DataFrame(
+      data=[
+        {"check": f.check, "fields": f.fields, "rows": f.rows, "sample": f.sample}
+        for f in self.failures
+      ],
+      columns=["check", "fields", "rows", "sample"]
+    )
+
+def _arrow_strings(column: pd.Series) -> "pa.Array":
+  import pyarrow as pa
+
+  try:
+    return pa.array(column, type=pa.string(), from_pandas=True)
+  except (pa.ArrowInvalid, pa.ArrowTypeError):
+    # values that are not strings are checked in their string representation
+    return pa.array(column.astype("string"), type=pa.string(), from_pandas=True)
+
+def _not_matching(column: pd.Series, pattern: str) -> pd.Series:
+  import pyarrow.compute as pc
+
+  matches = pc.match_substring_regex(_arrow_strings(column), pattern).fill_null(True)
+  return pd.Series(~matches.to_numpy(zero_copy_only=False), index=column.index)
+
+def _castable(column: pd.Series, arrow_type: str) -> bool:
+  import pyarrow as pa
+  import pyarrow.compute as pc
+
+  # a cast of the whole column is much cheaper than a regular expression, so it is tried first
+  # and the values are only matched one by one if some of them can not be cast
+  try:
+    pc.cast(_arrow_strings(column), arrow_type)
+    return True
+  except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+    return False
+
+def _none_invalid(column: pd.Series) -> pd.Series:
+  return pd.Series(False, index=column.index)
+
+def _invalid_integers(column: pd.Series) -> pd.Series:
+  if pd.api.types.is_bool_dtype(column.dtype):
+    return ~_none_invalid(column)
+  if pd.api.types.is_integer_dtype(column.dtype):
+    return _none_invalid(column)
+  if pd.api.types.is_float_dtype(column.dtype):
+    values = column.to_numpy(dtype="float64", na_value=np.nan)
+    return pd.Series(np.isinf(values) | (np.isfinite(values) & (values % 1 != 0)), index=column.index)
+  if _castable(column, "int64"):
+    return _none_invalid(column)
+
+  return _not_matching(column, INTEGER_PATTERN)
+
+def _invalid_numbers(column: pd.Series) -> pd.Series:
+  if pd.api.types.is_bool_dtype(column.dtype):
+    return ~_none_invalid(column)
+  if pd.api.types.is_numeric_dtype(column.dtype) or _castable(column, "float64"):
+    return _none_invalid(column)
+
+  return _not_matching(column, NUMBER_PATTERN)
+
+def _invalid_booleans(column: pd.Series) -> pd.Series:
+  if pd.api.types.is_bool_dtype(column.dtype):
+    return _none_invalid(column)
+
+  return ~column.astype("string").isin(BOOLEAN_VALUES)
+
+def _invalid_dates(column: pd.Series) -> pd.Series:
+  import pyarrow.compute as pc
+
+  if pd.api.types.is_datetime64_any_dtype(column.dtype) or _castable(column, "date32"):
+    return _none_invalid(column)
+
+  # the pattern checks the shape of the value, and the parsed date must keep the day of the
+  # month, as strptime rolls days that do not exist (2022-02-30) over to the next month
+  values = _arrow_strings(column)
+  dates = pc.strptime(pc.utf8_slice_codeunits(values, 0, 10), format="%Y-%m-%d", unit="s", error_is_null=True)
+  parsed_days = pc.utf8_lpad(pc.cast(pc.day(dates), "string"), width=2, padding="0")
+  existing = pc.equal(parsed_days, pc.utf8_slice_codeunits(values, 8, 10)).fill_null(False)
+  invalid = _not_matching(column, DATE_PATTERN).to_numpy() | (
+    ~existing.to_numpy(zero_copy_only=False) & column.notna().to_numpy()
+  )
+
+  return pd.Series(invalid, index=column.index)
+
+def _invalid_strings(column: pd.Series) -> pd.Series:
+  if isinstance(column.dtype, pd.CategoricalDtype):
+    # check the categories once and map the result to the rows through their codes
+    invalid_categories = _invalid_strings(pd.Series(column.cat.categories)).to_numpy(dtype=bool)
+    # null rows have code -1, which picks the trailing False
+    invalid_categories = np.append(invalid_categories, False)
+    return pd.Series(invalid_categories[column.cat.codes.to_numpy()], index=column.index)
+  if pd.api.types.is_string_dtype(column.dtype) and column.dtype != object:
+    return _none_invalid(column)
+  if column.dtype == object:
+    # infer_dtype scans the column in C, so mixed columns are the only ones checked value by value
+    if pd.api.types.infer_dtype(column, skipna=True) in ("string", "empty"):
+      return _none_invalid(column)
+    return ~column.map(lambda value: isinstance(value, str))
+
+  return ~_none_invalid(column)
+
+TYPE_CHECKS = {
+  "integer": _invalid_integers,
+  "number": _invalid_numbers,
+  "boolean": _invalid_booleans,
+  "date": _invalid_dates,
+  "string": _invalid_strings
+}
+
+def _invalid_uris(column: pd.Series) -> pd.Series:
+  return _not_matching(column, URI_PATTERN)
+
+FORMAT_CHECKS = {
+  "uri": _invalid_uris
+}
+
+def _sample(df: pd.DataFrame, mask: pd.Series, fields: List[str], sample_size: int) -> list:
+  sample = df.loc[mask, fields].head(sample_size)
+  if len(fields) == 1:
+    return sample[fields[0]].tolist()
+  return [tuple(row) for row in sample.itertuples(index=False)]
+
+def validate(
+  data: Union[pd.DataFrame, "pa.Table"],
+  schema: Schema,
+  sample_size: int = 5) -> ValidationReport:
+  """Validate a dataframe or an Arrow table against a schema.
+
+  Args:
+      data (Union[pd.DataFrame, pa.Table]): The data to be validated.
+      schema (Schema): The schema the data should conform to.
+      sample_size (int, optional): Number of failing values kept in each failure. Defaults to 5.
+
+  Returns:
+      ValidationReport: The report with the checks that failed, if any.
+  """
+  if not isinstance(data, pd.DataFrame):
+    data = data.to_pandas()
+
+  failures = []
+
+  def check(name: str, fields: List[str], mask: pd.Series) -> None:
+    rows = int(mask.sum())
+    if rows > 0:
+      failures.append(
+        ValidationFailure(name, fields, rows, _sample(data, mask, fields, sample_size))
+      )
+
+  for field in schema.fields:
+    if field.name not in data.columns:
+      failures.append(ValidationFailure("missing", [field.name], len(data), []))
+      continue
+
+    column = data[field.name]
+    not_null = column.notna()
+
+    if field.required or field.name in schema.primary_key:
+      check("required", [field.name], ~not_null)
+
+    type_check = TYPE_CHECKS.get(field.type)
+    if type_check is not None:
+      check("type", [field.name], type_check(column) & not_null)
+
+    format_check = FORMAT_CHECKS.get(field.form)
+    if format_check is not None:
+      check("format", [field.name], format_check(column) & not_null)
+
+  primary_key = [name for name in schema.primary_key if name in data.columns]
+  if primary_key and len(primary_key) == len(schema.primary_key):
+    check("primary_key", primary_key, data.duplicated(subset=primary_key, keep=False))
+
+  return ValidationReport(len(data), failures)
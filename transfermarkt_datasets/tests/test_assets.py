@@ -1,11 +1,16 @@
 
+import gzip
+import json
 import unittest
+import tempfile
+import pathlib
 
 import pandas as pd
 
 from transfermarkt_datasets.core.asset import (
     Asset,
-    RawAsset
+    RawAsset,
+    InvalidPreparedDF
 )
 from transfermarkt_datasets.core.schema import Schema, Field
 
@@ -24,6 +29,61 @@ class TestAsset(unittest.TestCase):
             1000
         )
 
+    def test_load_raw(self):
+
+        class BaseGamesAsset(RawAsset):
+            name = "games"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            at = BaseGamesAsset(base_path=tmpdir)
+
+            games = {
+                2020: [{"href": "/1", "home_club": {"href": "/a"}}],
+                2021: [{"href": "/2", "home_club": {"href": "/b", "name": "b"}, "attendance": 100}] * 2,
+                2022: []
+            }
+            for season, rows in games.items():
+                season_path = pathlib.Path(at.raw_files_path) / str(season)
+                season_path.mkdir(parents=True)
+                with gzip.open(season_path / at.raw_file_name, "wt") as f:
+                    for row in rows:
+                        f.write(json.dumps(row) + "\n")
+
+            at.load_raw(seasons=list(games.keys()), max_workers=2)
+
+            self.assertEqual(len(at.raw_df), 3)
+            self.assertEqual(list(at.raw_df["season"]), [2020, 2021, 2021])
+            self.assertTrue(at.raw_df["season_file"].iloc[0].endswith("2020/games.json.gz"))
+            # fields that are missing in some seasons are merged into a common schema
+            self.assertEqual(at.raw_df["home_club"].iloc[0], {"href": "/a", "name": None})
+            self.assertTrue(pd.isna(at.raw_df["attendance"].iloc[0]))
+
+    def test_load_raw_mixed_types(self):
+
+        class BaseGamesAsset(RawAsset):
+            name = "games"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            at = BaseGamesAsset(base_path=tmpdir)
+
+            # the type of "attendance" changes after the first block that the reader infers types from
+            games = {
+                2020: [{"href": f"/{i}", "attendance": i} for i in range(200000)] + [{"href": "/x", "attendance": "n/a"}],
+                2021: [{"href": "/y", "attendance": 100}]
+            }
+            for season, rows in games.items():
+                season_path = pathlib.Path(at.raw_files_path) / str(season)
+                season_path.mkdir(parents=True)
+                with gzip.open(season_path / at.raw_file_name, "wt") as f:
+                    for row in rows:
+                        f.write(json.dumps(row) + "\n")
+
+            at.load_raw(seasons=list(games.keys()), max_workers=2)
+
+            self.assertEqual(len(at.raw_df), 200002)
+            self.assertEqual(at.raw_df["attendance"].iloc[200000], "n/a")
+            self.assertEqual(list(at.raw_df["season"].iloc[-2:]), [2020, 2021])
+
     def test_string_representation(self):
 
         class SomeAsset(Asset):
@@ -125,3 +185,137 @@ class TestAsset(unittest.TestCase):
 
         self.assertTrue(df.equals(df_expected))
 
+
+    def test_load_from_prep_prefers_parquet(self):
+
+        class TestAsset(Asset):
+            name = "some_asset"
+            file_name = "some_asset.csv.gz"
+
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+
+                self.schema = Schema(
+                    fields=[
+                        Field(name="col1", type="integer"),
+                        Field(name="col2", type="string")
+                    ]
+                )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prep_path = pathlib.Path(tmpdir) / "data" / "prep"
+            prep_path.mkdir(parents=True)
+
+            at = TestAsset(base_path=tmpdir)
+
+            pd.DataFrame(
+                data={"col1": [1, 2], "col2": ["a", "b"]}
+            ).to_csv(at.prep_path, index=False)
+
+            at.load_from_prep()
+            self.assertEqual(len(at.prep_df), 2)
+
+            pd.DataFrame(
+                data={"col1": [3], "col2": ["c"]}
+            ).to_parquet(at.prep_parquet_path, index=False)
+
+            at.load_from_prep()
+            self.assertEqual(list(at.prep_df["col2"]), ["c"])
+
+    def test_load_from_prep_schema_dtypes(self):
+
+        class TestAsset(Asset):
+            name = "some_asset"
+            file_name = "some_asset.csv.gz"
+
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+
+                self.schema = Schema(
+                    fields=[
+                        Field(name="some_id", type="integer"),
+                        Field(name="some_date", type="date"),
+                        Field(name="some_code", type="string", tags=["categorical"]),
+                        Field(name="some_value", type="number")
+                    ]
+                )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prep_path = pathlib.Path(tmpdir) / "data" / "prep"
+            prep_path.mkdir(parents=True)
+
+            at = TestAsset(base_path=tmpdir)
+
+            df = pd.DataFrame(
+                data={
+                    "some_id": [1, None],
+                    "some_date": ["2022-01-01", "2022-01-02"],
+                    "some_code": ["GB1", "GB1"],
+                    "some_value": [1, 2]
+                }
+            )
+
+            for write in [
+                lambda: df.to_csv(at.prep_path, index=False),
+                lambda: df.to_parquet(at.prep_parquet_path, index=False)
+            ]:
+                write()
+                at.load_from_prep()
+
+                self.assertEqual(
+                    [str(dtype) for dtype in at.prep_df.dtypes[["some_id", "some_code", "some_value"]]],
+                    ["Int64", "category", "float64"]
+                )
+                self.assertTrue(
+                    pd.api.types.is_datetime64_any_dtype(at.prep_df["some_date"])
+                )
+
+    def test_load_from_prep_projection_and_filters(self):
+
+        class TestAsset(Asset):
+            name = "some_asset"
+            file_name = "some_asset.csv.gz"
+
+            def __init__(self, *args, **kwargs) -> None:
+                super().__init__(*args, **kwargs)
+
+                self.schema = Schema(
+                    fields=[
+                        Field(name="some_id", type="integer"),
+                        Field(name="season", type="integer"),
+                        Field(name="competition_id", type="string"),
+                        Field(name="goals", type="integer")
+                    ]
+                )
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prep_path = pathlib.Path(tmpdir) / "data" / "prep"
+            prep_path.mkdir(parents=True)
+
+            at = TestAsset(base_path=tmpdir)
+
+            df = pd.DataFrame(
+                data={
+                    "some_id": [1, 2, 3, 4],
+                    "season": [2019, 2020, 2021, 2022],
+                    "competition_id": ["GB1", "ES1", "GB1", "GB1"],
+                    "goals": [0, 1, 2, 3]
+                }
+            )
+
+            for write in [
+                lambda: df.to_csv(at.prep_path, index=False),
+                lambda: df.to_parquet(at.prep_parquet_path, index=False)
+            ]:
+                write()
+                sliced_df = at.load_from_prep(
+                    columns=["goals", "some_id"],
+                    filters=[("season", ">=", 2020), ("competition_id", "in", ["GB1"])]
+                )
+
+                self.assertEqual(list(sliced_df.columns), ["goals", "some_id"])
+                self.assertEqual(list(sliced_df["some_id"]), [3, 4])
+                self.assertFalse(at.prep_df_loaded)
+
+            with self.assertRaises(InvalidPreparedDF):
+                at.load_from_prep(columns=["not_a_column"])
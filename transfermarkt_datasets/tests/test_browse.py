@@ -0,0 +1,101 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.browse import InvalidBrowser
+from transfermarkt_datasets.core.dataset import Dataset
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeAppearancesAsset(Asset):
+    name = "some_appearances"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="appearance_id", type="string"),
+                Field(name="date", type="date"),
+                Field(name="player_id", type="integer"),
+                Field(name="goals", type="integer")
+            ],
+            primary_key=["appearance_id"]
+        )
+
+class TestBrowse(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        self.dataset = Dataset(
+            base_path=self.tmpdir.name,
+            catalog_path=str(pathlib.Path(self.tmpdir.name) / "catalog.duckdb")
+        )
+        asset = SomeAppearancesAsset(base_path=self.tmpdir.name)
+        pathlib.Path(asset.prep_location).mkdir(parents=True, exist_ok=True)
+        self.df = pd.DataFrame(
+            data={
+                "appearance_id": [f"a{i:02d}" for i in range(23)],
+                "date": pd.date_range("2020-01-01", periods=23).strftime("%Y-%m-%d"),
+                "player_id": [i % 4 for i in range(23)],
+                "goals": [None if i % 5 == 0 else i % 3 for i in range(23)]
+            }
+        )
+        self.df["goals"] = self.df["goals"].astype("Int64")
+        self.df.to_parquet(asset.prep_parquet_path, index=False)
+        self.dataset.assets = {asset.name: asset}
+
+    def tearDown(self) -> None:
+        self.dataset.catalog.close()
+        self.tmpdir.cleanup()
+
+    def pages(self, browser):
+        pages, cursor = [], None
+        while True:
+            page, cursor = browser.page(after=cursor)
+            pages.append(page)
+            if cursor is None:
+                return pages
+
+    def test_pages(self):
+
+        browser = self.dataset.browse("some_appearances", page_size=10)
+        pages = self.pages(browser)
+        self.assertEqual([len(page) for page in pages], [10, 10, 3])
+        self.assertEqual(
+            pd.concat(pages)["appearance_id"].tolist(),
+            self.df["appearance_id"].tolist()
+        )
+        self.assertEqual(browser.count(), 23)
+
+    def test_sort_with_ties_and_nulls(self):
+
+        # goals have ties and nulls, which are sorted last, and the primary key breaks the ties
+        browser = self.dataset.browse("some_appearances", sort_by="goals", descending=True, page_size=4)
+        rows = pd.concat(self.pages(browser))
+        expected = self.df.sort_values(
+            by=["goals", "appearance_id"], ascending=[False, True], na_position="last", kind="stable"
+        )
+        self.assertEqual(rows["appearance_id"].tolist(), expected["appearance_id"].tolist())
+
+    def test_filters(self):
+
+        browser = self.dataset.browse(
+            "some_appearances",
+            sort_by="date",
+            filters=[("player_id", "in", ["1", 2]), ("date", ">=", "2020-01-10")],
+            columns=["appearance_id", "player_id"],
+            page_size=3
+        )
+        rows = pd.concat(self.pages(browser))
+        expected = self.df[self.df["player_id"].isin([1, 2]) & (self.df["date"] >= "2020-01-10")]
+        self.assertEqual(list(rows.columns), ["appearance_id", "player_id"])
+        self.assertEqual(rows["appearance_id"].tolist(), expected["appearance_id"].tolist())
+        self.assertEqual(browser.count(), len(expected))
+
+        with self.assertRaises(InvalidBrowser):
+            self.dataset.browse("some_appearances", sort_by="minutes")
+        with self.assertRaises(InvalidBrowser):
+            self.dataset.browse("some_appearances", filters=[("goals", "like", 1)])
@@ -0,0 +1,101 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.catalog import Catalog, AssetNotInCatalog
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeAsset(Asset):
+    def __init__(self, name, *args, **kwargs) -> None:
+        self.name = name
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="season", type="integer"),
+                Field(name="date", type="date")
+            ]
+        )
+
+class TestCatalog(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        df = pd.DataFrame(
+            data={
+                "game_id": [1, 2, 3],
+                "season": ["2020", "2021", "2022"],
+                "date": ["2020-08-01", "2021-08-01", "2022-08-01"]
+            }
+        )
+
+        self.assets = {
+            "csv_asset": SomeAsset("csv_asset", base_path=self.tmpdir.name),
+            "parquet_asset": SomeAsset("parquet_asset", base_path=self.tmpdir.name)
+        }
+        pathlib.Path(self.assets["csv_asset"].prep_location).mkdir(parents=True)
+        df.to_csv(self.assets["csv_asset"].prep_path, index=False)
+        df.to_parquet(self.assets["parquet_asset"].prep_parquet_path, index=False)
+
+        self.database_path = str(pathlib.Path(self.tmpdir.name) / "catalog.duckdb")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_query(self):
+
+        catalog = Catalog(self.assets, self.database_path)
+
+        for asset_name in ["csv_asset", "parquet_asset"]:
+            relation = catalog.relation(asset_name)
+            df = catalog.query(
+                f"SELECT season, date FROM {relation} WHERE season >= ? ORDER BY season",
+                [2021]
+            )
+            self.assertEqual(list(df["season"]), [2021, 2022])
+            self.assertTrue(pd.api.types.is_datetime64_any_dtype(df["date"]))
+
+        with self.assertRaises(AssetNotInCatalog):
+            catalog.relation("not_an_asset")
+
+        catalog.close()
+
+    def test_registration_is_persisted(self):
+
+        catalog = Catalog(self.assets, self.database_path)
+        catalog.register_assets()
+        catalog.close()
+
+        catalog = Catalog(self.assets, self.database_path)
+        # the csv asset table was persisted, so it can be queried without registering it again
+        df = catalog.query('SELECT count(*) AS n FROM "csv_asset"')
+        self.assertEqual(df["n"][0], 3)
+        catalog.close()
+
+    def test_arrow_partitions(self):
+
+        catalog = Catalog(self.assets, self.database_path)
+        relation = catalog.relation("parquet_asset")
+
+        progress = []
+        table = catalog.arrow_partitions(
+            [
+                (f"SELECT game_id, date FROM {relation} WHERE season = ?", [season])
+                for season in [2022, 2019, 2020, 2021]
+            ],
+            max_workers=2,
+            on_progress=lambda done, total: progress.append((done, total))
+        )
+        # partitions are in the order of the queries, whatever the order they finish in
+        self.assertEqual(table.column("game_id").to_pylist(), [3, 1, 2])
+        self.assertEqual(table.column_names, ["game_id", "date"])
+        self.assertEqual(progress, [(1, 4), (2, 4), (3, 4), (4, 4)])
+
+        with self.assertRaises(ValueError):
+            catalog.arrow_partitions([])
+
+        catalog.close()
@@ -3,12 +3,17 @@ import pathlib
 import unittest
 import pytest
 from transfermarkt_datasets.core.dataset import Dataset
+from transfermarkt_datasets.core.registry import ASSETS, ASSETS_PATH, LazyAssets
 from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.schema import Schema, Field
+
+import pandas as pd
 
 from frictionless.package import Package
 
 import tempfile
 
+import subprocess
 import sys
 from os import path
 
@@ -125,3 +130,87 @@ class BaseSomethingAsset(Asset):
             dp_excluded.resource_names,
             ["file1"]
         )
+
+    def test_prep_cache_eviction(self):
+
+        class SomeAsset(Asset):
+            def __init__(self, name, *args, **kwargs) -> None:
+                self.name = name
+                super().__init__(*args, **kwargs)
+                self.schema = Schema(fields=[Field(name="value", type="integer")])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            td = Dataset(base_path=tmpdir)
+
+            df = pd.DataFrame(data={"value": range(1000)})
+            nbytes = df.astype("Int64").memory_usage(deep=True).sum()
+            td.prep_cache.max_bytes = 2 * nbytes
+
+            td.assets = {}
+            for name in ["a", "b", "c"]:
+                asset = SomeAsset(name, base_path=tmpdir)
+                pathlib.Path(asset.prep_location).mkdir(parents=True, exist_ok=True)
+                df.to_csv(asset.prep_path, index=False)
+                asset.cache = td.prep_cache
+                td.assets[name] = asset
+
+            # assets are loaded lazily, on first access
+            self.assertFalse(td.assets["a"].prep_df_loaded)
+            self.assertEqual(len(td.assets["a"].prep_df), 1000)
+            self.assertTrue(td.assets["a"].prep_df_loaded)
+
+            td.assets["b"].prep_df
+            td.assets["a"].prep_df # "b" becomes the least recently used
+            td.assets["c"].prep_df
+
+            self.assertEqual(td.prep_cache.asset_names, ["a", "c"])
+            self.assertFalse(td.assets["b"].prep_df_loaded)
+            self.assertLessEqual(td.prep_cache.current_bytes, td.prep_cache.max_bytes)
+
+            # evicted assets are reloaded transparently
+            self.assertEqual(len(td.assets["b"].prep_df), 1000)
+            self.assertEqual(td.prep_cache.asset_names, ["c", "b"])
+
+    def test_registry(self):
+
+        # every asset module is in the registry, and every registry entry has its module
+        asset_modules = [
+            file.stem for file in ASSETS_PATH.glob("*.py") if not file.name.startswith("__")
+        ]
+        self.assertEqual(
+            sorted(module for module, _ in ASSETS.values()),
+            sorted(asset_modules)
+        )
+
+        td = Dataset()
+
+        # assets are only instantiated on first access
+        self.assertIsInstance(td.assets, LazyAssets)
+        self.assertEqual(td.asset_names, list(ASSETS.keys()))
+        self.assertEqual(td.assets.loaded, {})
+
+        games = td.assets["cur_games"]
+        self.assertEqual(games.name, "cur_games")
+        self.assertIs(games.cache, td.prep_cache)
+        self.assertEqual(games.prep_location, f"{td.base_path}/data/prep")
+        self.assertEqual(list(td.assets.loaded.keys()), ["cur_games"])
+
+        self.assertEqual(
+            {asset.name for asset in td.assets.values()},
+            set(ASSETS.keys())
+        )
+
+    def test_heavy_dependencies_are_lazy(self):
+
+        output = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys; from transfermarkt_datasets.core.dataset import Dataset; Dataset(); "
+                "print([m for m in ('boto3', 'frictionless') if m in sys.modules])"
+            ],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+
+        self.assertEqual(output.strip(), "[]")
@@ -0,0 +1,133 @@
+import importlib.util
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.catalog import Catalog
+from transfermarkt_datasets.core.export import (
+    export_partitions,
+    export_query,
+    UnsupportedExportFormat
+)
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeAsset(Asset):
+    name = "some_asset"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="date", type="date")
+            ]
+        )
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        asset = SomeAsset(base_path=self.tmpdir.name)
+        pathlib.Path(asset.prep_location).mkdir(parents=True)
+        pd.DataFrame(
+            data={
+                "game_id": range(1000),
+                "date": ["2020-08-01"] * 1000
+            }
+        ).to_parquet(asset.prep_parquet_path, index=False)
+
+        self.catalog = Catalog({"some_asset": asset})
+        self.query = f"SELECT * FROM {self.catalog.relation('some_asset')} WHERE game_id < 500"
+
+    def tearDown(self) -> None:
+        self.catalog.close()
+        self.tmpdir.cleanup()
+
+    def test_export_formats(self):
+
+        readers = {
+            "csv": pd.read_csv,
+            "parquet": pd.read_parquet,
+            "xlsx": pd.read_excel
+        }
+
+        for format, read in readers.items():
+            file = export_query(
+                self.catalog,
+                self.query,
+                format=format,
+                column_names={"game_id": "Game ID"},
+                batch_size=100
+            )
+
+            self.assertEqual(file.rows, 500)
+
+            df = read(io.BytesIO(file.read()))
+            file.close()
+
+            self.assertEqual(list(df.columns), ["Game ID", "date"])
+            self.assertEqual(len(df), 500)
+
+    def test_export_partitions(self):
+
+        relation = self.catalog.relation("some_asset")
+        queries = [
+            (f"SELECT * FROM {relation} WHERE game_id >= ? AND game_id < ?", [start, start + 100])
+            for start in range(0, 500, 100)
+        ]
+
+        progress = []
+        for format, read in [("csv", pd.read_csv), ("parquet", pd.read_parquet)]:
+            file = export_partitions(
+                self.catalog,
+                queries,
+                format=format,
+                column_names={"game_id": "Game ID"},
+                batch_size=30,
+                max_workers=2,
+                on_progress=lambda done, total: progress.append(done)
+            )
+            self.assertEqual(file.rows, 500)
+
+            df = read(io.BytesIO(file.read()))
+            file.close()
+
+            # partitions are written in the order of the queries
+            self.assertEqual(df["Game ID"].tolist(), list(range(500)))
+
+        self.assertEqual(progress, [1, 2, 3, 4, 5] * 2)
+
+    def test_export_file(self):
+
+        file = export_query(self.catalog, self.query, format="csv")
+        self.assertIsInstance(file, io.BufferedReader)
+        # the export only lives on as long as the file is open
+        self.assertFalse(os.path.exists(file.name))
+        file.close()
+
+    @unittest.skipUnless(importlib.util.find_spec("streamlit.testing"), "streamlit is not installed")
+    def test_download_button(self):
+        from streamlit.testing.v1 import AppTest
+
+        def app():
+            import streamlit as st
+            st.download_button("Download", data=st.session_state["export_file"], file_name="export.csv")
+
+        file = export_query(self.catalog, self.query, format="csv")
+        at = AppTest.from_function(app)
+        at.session_state["export_file"] = file
+        at.run()
+        file.close()
+
+        self.assertEqual(len(at.exception), 0)
+
+    def test_unsupported_format(self):
+
+        with self.assertRaises(UnsupportedExportFormat):
+            export_query(self.catalog, self.query, format="json")
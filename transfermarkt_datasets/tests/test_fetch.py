@@ -0,0 +1,241 @@
+import asyncio
+import gzip
+import json
+import pathlib
+import tempfile
+import time
+import unittest
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from transfermarkt_datasets.core.fetch import (
+    Fetcher,
+    JsonLinesWriter,
+    ResponseCache,
+    TokenBucket
+)
+
+class StubAPI:
+    """A local HTTP server that serves a JSON document per player id and fails on demand."""
+
+    def __init__(self, failures=None, broken=None) -> None:
+        # number of times each player id answers with an error before succeeding
+        self.failures = dict(failures or {})
+        # number of times each player id answers with a truncated JSON body before succeeding
+        self.broken = dict(broken or {})
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        player_id = int(request.match_info["player_id"])
+        self.requests.append(player_id)
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if player_id == 404:
+                return web.Response(status=404)
+            if self.failures.get(player_id, 0) > 0:
+                self.failures[player_id] -= 1
+                return web.Response(status=503, headers={"Retry-After": "0"})
+            if self.broken.get(player_id, 0) > 0:
+                self.broken[player_id] -= 1
+                return web.Response(text='{"player_id": ', content_type="application/json")
+            return web.json_response({"player_id": player_id})
+        finally:
+            self.in_flight -= 1
+
+    async def start(self) -> TestServer:
+        app = web.Application()
+        app.router.add_get("/players/{player_id}", self.handle)
+        server = TestServer(app)
+        await server.start_server()
+        return server
+
+class TestFetch(unittest.IsolatedAsyncioTestCase):
+
+    async def fetch(self, api, player_ids, fetcher=None):
+        server = await api.start()
+        fetcher = fetcher or Fetcher(concurrency=4, backoff_base=0.01)
+        results = {}
+
+        def on_result(player_id, document):
+            results[player_id] = document
+
+        requests = [(player_id, str(server.make_url(f"/players/{player_id}"))) for player_id in player_ids]
+        try:
+            async with aiohttp.ClientSession() as session:
+                stats = await fetcher.fetch_all(session, requests, on_result)
+        finally:
+            await server.close()
+
+        return results, stats
+
+    async def test_bounded_concurrency(self):
+
+        api = StubAPI()
+        results, stats = await self.fetch(api, range(20), Fetcher(concurrency=3))
+
+        self.assertEqual(stats["fetched"], 20)
+        self.assertEqual(results[7], {"player_id": 7})
+        self.assertLessEqual(api.max_in_flight, 3)
+
+    async def test_retries(self):
+
+        api = StubAPI(failures={1: 2, 2: 10})
+        fetcher = Fetcher(concurrency=2, max_retries=3, backoff_base=0.01)
+        results, stats = await self.fetch(api, [1, 2, 3, 404], fetcher)
+
+        # 1 succeeds on its third attempt, 2 fails more times than it is retried
+        self.assertEqual(results[1], {"player_id": 1})
+        self.assertNotIn(2, results)
+        self.assertEqual(api.requests.count(2), 4)
+        # a 404 is a permanent failure, which is not retried
+        self.assertIsNone(results[404])
+        self.assertEqual(api.requests.count(404), 1)
+        self.assertEqual(stats, {"fetched": 3, "failed": 1})
+
+    async def test_broken_json(self):
+
+        api = StubAPI(broken={1: 1, 2: 10})
+        fetcher = Fetcher(concurrency=2, max_retries=2, backoff_base=0.01)
+        results, stats = await self.fetch(api, [1, 2, 3], fetcher)
+
+        # a broken body is retried, and it fails the request only, not the whole run
+        self.assertEqual(results[1], {"player_id": 1})
+        self.assertNotIn(2, results)
+        self.assertEqual(api.requests.count(2), 3)
+        self.assertEqual(results[3], {"player_id": 3})
+        self.assertEqual(stats, {"fetched": 2, "failed": 1})
+
+    async def test_resume_through_cache(self):
+
+        api = StubAPI()
+        server = await api.start()
+        fetcher = Fetcher(concurrency=2, backoff_base=0.01)
+        urls = {player_id: str(server.make_url(f"/players/{player_id}")) for player_id in range(20)}
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir, ttl=60)
+
+            async def run(stop_after=None):
+                # players that are fresh in the cache are not requested again
+                requests = [(player_id, url) for player_id, url in urls.items() if not cache.is_fresh(url)]
+                done = asyncio.Event()
+
+                def on_result(player_id, document):
+                    cache.put(urls[player_id], document)
+                    if stop_after is not None and len(api.requests) >= stop_after:
+                        done.set()
+
+                async with aiohttp.ClientSession() as session:
+                    task = asyncio.create_task(fetcher.fetch_all(session, requests, on_result))
+                    if stop_after is None:
+                        return await task
+                    await done.wait()
+                    task.cancel()
+                    with self.assertRaises(asyncio.CancelledError):
+                        await task
+
+            try:
+                # the first run is interrupted after a few responses
+                await run(stop_after=5)
+                cached = {player_id for player_id, url in urls.items() if cache.is_fresh(url)}
+                self.assertTrue(0 < len(cached) < 20)
+
+                # the next run only requests the players that are not in the cache yet
+                api.requests = []
+                stats = await run()
+            finally:
+                await server.close()
+
+            self.assertEqual(sorted(api.requests), sorted(set(urls) - cached))
+            self.assertEqual(stats, {"fetched": 20 - len(cached), "failed": 0})
+            self.assertTrue(all(cache.is_fresh(url) for url in urls.values()))
+
+    async def test_token_bucket(self):
+
+        bucket = TokenBucket(rate=50, capacity=5)
+
+        start = time.monotonic()
+        for _ in range(15):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        # the first 5 tokens are a burst, the other 10 come at 50 per second
+        self.assertGreaterEqual(elapsed, 0.18)
+
+class TestJsonLinesWriter(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = str(pathlib.Path(self.tmpdir.name) / "market_values.json.gz")
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def read(self):
+        with gzip.open(self.path, "rt") as f:
+            return [json.loads(line) for line in f]
+
+    def test_write(self):
+
+        with JsonLinesWriter(self.path, flush_every=2) as writer:
+            for player_id in range(3):
+                writer.write({"player_id": player_id})
+
+        self.assertEqual(self.read(), [{"player_id": 0}, {"player_id": 1}, {"player_id": 2}])
+
+    def test_empty(self):
+
+        # a file is written even if there are no documents, so that it replaces the previous one
+        with JsonLinesWriter(self.path):
+            pass
+
+        self.assertEqual(self.read(), [])
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_content_addressed(self):
+
+        cache = ResponseCache(self.tmpdir.name)
+        first_hash = cache.put("https://api/players/1", {"list": []})
+        second_hash = cache.put("https://api/players/2", {"list": []})
+        cache.put("https://api/players/3", None)
+
+        # identical responses are stored once
+        self.assertEqual(first_hash, second_hash)
+        objects = list(pathlib.Path(self.tmpdir.name, "objects").glob("*/*.json.gz"))
+        self.assertEqual(len(objects), 2)
+
+        self.assertEqual(cache.get("https://api/players/2"), {"list": []})
+        self.assertIsNone(cache.get("https://api/players/3"))
+        self.assertIn("https://api/players/3", cache)
+        with self.assertRaises(KeyError):
+            cache.get("https://api/players/4")
+
+    def test_ttl(self):
+
+        ResponseCache(self.tmpdir.name).put("https://api/players/1", {"list": []})
+
+        self.assertTrue(ResponseCache(self.tmpdir.name, ttl=60).is_fresh("https://api/players/1"))
+        stale_cache = ResponseCache(self.tmpdir.name, ttl=0)
+        time.sleep(0.01)
+        self.assertFalse(stale_cache.is_fresh("https://api/players/1"))
+        # stale documents can still be read
+        self.assertEqual(stale_cache.get("https://api/players/1"), {"list": []})
+
+        # freshness can be checked as of an earlier time, such as the start of a run
+        cache = ResponseCache(self.tmpdir.name, ttl=60)
+        self.assertFalse(cache.is_fresh("https://api/players/1", at=time.time() + 120))
+        self.assertTrue(cache.is_fresh("https://api/players/1", at=time.time() - 30))
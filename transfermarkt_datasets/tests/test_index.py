@@ -0,0 +1,114 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset, InvalidPreparedDF
+from transfermarkt_datasets.core.index import KeyIndex
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeValuationsAsset(Asset):
+    name = "some_valuations"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="player_id", type="integer"),
+                Field(name="date", type="date"),
+                Field(name="club_id", type="integer"),
+                Field(name="competition_id", type="string", tags=["categorical"]),
+                Field(name="value", type="number")
+            ],
+            primary_key=["player_id", "date"]
+        )
+        self.schema.foreign_keys = [
+            {"fields": "club_id", "reference": {"resource": "some_clubs", "fields": "club_id"}},
+            {"fields": "competition_id", "reference": {"resource": "some_competitions", "fields": "competition_id"}}
+        ]
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.asset = SomeValuationsAsset(base_path=self.tmpdir.name)
+        pathlib.Path(self.asset.prep_location).mkdir(parents=True)
+
+        self.df = pd.DataFrame(
+            data={
+                "player_id": [i % 7 for i in range(100)],
+                "date": pd.date_range("2020-01-01", periods=100).strftime("%Y-%m-%d"),
+                "club_id": [None if i % 10 == 0 else i % 3 for i in range(100)],
+                "competition_id": ["GB1" if i % 2 else "ES1" for i in range(100)],
+                "value": [float(i) for i in range(100)]
+            }
+        )
+        self.df["club_id"] = self.df["club_id"].astype("Int64")
+        # small row groups, so that lookups read only some of them
+        self.df.to_parquet(self.asset.prep_parquet_path, index=False, row_group_size=16)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def expected(self, mask):
+        return self.df[mask]["value"].tolist()
+
+    def test_rows_for(self):
+
+        self.assertEqual(self.asset.indexed_fields, ["player_id", "date", "club_id", "competition_id"])
+
+        rows = self.asset.rows_for(player_id=3)
+        self.assertEqual(rows["value"].tolist(), self.expected(self.df["player_id"] == 3))
+        self.assertEqual(list(rows.columns), self.asset.schema.field_names)
+        self.assertFalse(self.asset.prep_df_loaded)
+
+        # values are matched in the type of the key, lists match any value and keys are combined
+        rows = self.asset.rows_for(player_id=["1", 2], competition_id="GB1", columns=["value"])
+        self.assertEqual(list(rows.columns), ["value"])
+        self.assertEqual(
+            rows["value"].tolist(),
+            self.expected(self.df["player_id"].isin([1, 2]) & (self.df["competition_id"] == "GB1"))
+        )
+
+        self.assertTrue(self.asset.rows_for(club_id=[None, 99]).empty)
+
+        with self.assertRaises(InvalidPreparedDF):
+            self.asset.rows_for(value=1.0)
+
+    def test_get(self):
+
+        row = self.asset.get(player_id=5, date="2020-01-06")
+        self.assertEqual(row["value"], 5.0)
+        self.assertEqual(row["date"], pd.Timestamp("2020-01-06"))
+
+        self.assertIsNone(self.asset.get(player_id=5, date="2020-01-07"))
+
+        with self.assertRaises(InvalidPreparedDF):
+            self.asset.get(player_id=5)
+
+    def test_index_is_persisted(self):
+
+        index = self.asset.index("player_id")
+        path = pathlib.Path(self.asset.index_location) / "some_valuations.player_id.index.parquet"
+        self.assertTrue(path.exists())
+        # rows 3, 10, ..., 94 are in every row group but the last one (rows 96 to 99)
+        self.assertEqual(index.row_groups(index.positions(3)).tolist(), list(range(6)))
+        self.assertEqual(index.row_groups(index.positions([])).tolist(), [])
+
+        loaded = KeyIndex.load(str(path))
+        self.assertEqual(loaded.positions(3).tolist(), index.positions(3).tolist())
+
+        # the index is rebuilt when the prepared file changes
+        self.df.head(10).to_parquet(self.asset.prep_parquet_path, index=False)
+        os.utime(self.asset.prep_parquet_path, ns=(0, 0))
+        self.assertEqual(len(self.asset.rows_for(player_id=3)), 1)
+
+    def test_csv_only(self):
+
+        os.remove(self.asset.prep_parquet_path)
+        self.df.to_csv(self.asset.prep_path, index=False)
+
+        rows = self.asset.rows_for(club_id=2)
+        self.assertEqual(rows["value"].tolist(), self.expected(self.df["club_id"] == 2))
@@ -0,0 +1,102 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.dataset import Dataset
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeGamesAsset(Asset):
+    name = "some_games"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="club_id", type="integer")
+            ],
+            primary_key=["game_id"]
+        )
+        self.schema.foreign_keys = [
+            {"fields": "club_id", "reference": {"resource": "some_clubs", "fields": "club_id"}},
+            {"fields": "club_id", "reference": {"resource": "missing_asset", "fields": "club_id"}}
+        ]
+
+class SomeAppearancesAsset(Asset):
+    name = "some_appearances"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="club_id", type="integer")
+            ]
+        )
+        self.schema.foreign_keys = [
+            {
+                "fields": ["game_id", "club_id"],
+                "reference": {"resource": "some_games", "fields": ["game_id", "club_id"]}
+            }
+        ]
+
+class SomeClubsAsset(Asset):
+    name = "some_clubs"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(fields=[Field(name="club_id", type="integer")])
+
+class TestIntegrity(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        self.dataset = Dataset(
+            base_path=self.tmpdir.name,
+            catalog_path=str(pathlib.Path(self.tmpdir.name) / "catalog.duckdb")
+        )
+        self.dataset.assets = {}
+
+        data = {
+            SomeClubsAsset: {"club_id": [1, 2]},
+            SomeGamesAsset: {"game_id": [1, 2, 3, 4, 5], "club_id": [1, 2, 3, 3, None]},
+            SomeAppearancesAsset: {"game_id": [1, 1, 2, 9], "club_id": [1, 2, 2, 1]}
+        }
+        for asset_class, columns in data.items():
+            asset = asset_class(base_path=self.tmpdir.name)
+            pathlib.Path(asset.prep_location).mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(data=columns).astype("Int64").to_parquet(asset.prep_parquet_path, index=False)
+            self.dataset.assets[asset.name] = asset
+
+    def tearDown(self) -> None:
+        self.dataset.catalog.close()
+        self.tmpdir.cleanup()
+
+    def test_check_integrity(self):
+
+        report = self.dataset.check_integrity(max_workers=2)
+
+        self.assertFalse(report.valid)
+        orphans = {
+            (o.relationship["from"], o.relationship["to"]): o for o in report.orphans
+        }
+
+        # null keys are not orphans
+        games_orphans = orphans[("some_games", "some_clubs")]
+        self.assertEqual((games_orphans.rows, games_orphans.keys), (2, 1))
+        self.assertEqual(games_orphans.sample.to_dict("records"), [{"club_id": 3, "orphan_rows": 2}])
+
+        appearances_orphans = orphans[("some_appearances", "some_games")]
+        self.assertEqual((appearances_orphans.rows, appearances_orphans.keys), (2, 2))
+        self.assertEqual(
+            sorted(map(tuple, appearances_orphans.sample[["game_id", "club_id"]].values.tolist())),
+            [(1, 2), (9, 1)]
+        )
+
+        # relationships to assets that do not exist are reported but do not stop the check
+        self.assertEqual(list(report.errors.keys()), ["some_games(club_id) -> missing_asset(club_id)"])
+        self.assertEqual(len(report.as_dataframe()), 2)
@@ -0,0 +1,92 @@
+import gzip
+import json
+import pathlib
+import tempfile
+import unittest
+
+from transfermarkt_datasets.core.manifest import (
+    Manifest,
+    file_stats,
+    incremental_vars
+)
+
+class TestManifest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = self.tmpdir.name
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def write(self, season, asset_name, rows):
+        path = pathlib.Path(self.directory, str(season), f"{asset_name}.json.gz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+    def test_file_stats(self):
+
+        self.write(2023, "games", [{"game_id": 1}, {"game_id": 2}])
+        stats = file_stats(str(pathlib.Path(self.directory, "2023", "games.json.gz")))
+
+        self.assertEqual(stats["rows"], 2)
+        self.assertGreater(stats["bytes"], 0)
+
+        # the hash does not depend on the compression, only on the content
+        self.write(2024, "games", [{"game_id": 1}, {"game_id": 2}])
+        other_stats = file_stats(str(pathlib.Path(self.directory, "2024", "games.json.gz")))
+        self.assertEqual(stats["sha256"], other_stats["sha256"])
+
+    def test_scan_and_changes(self):
+
+        self.write(2023, "games", [{"game_id": 1}])
+        self.write(2024, "games", [{"game_id": 2}])
+
+        manifest = Manifest(self.directory)
+        self.assertEqual(manifest.scan(), [(2023, "games"), (2024, "games")])
+        manifest.save()
+
+        built_path = str(pathlib.Path(self.directory, "built_manifest.json"))
+        pathlib.Path(manifest.path).rename(built_path)
+
+        # the 2024 season is scraped again and changes, 2023 is scraped again with the same content
+        self.write(2023, "games", [{"game_id": 1}])
+        self.write(2024, "games", [{"game_id": 2}, {"game_id": 3}])
+        self.write(2024, "clubs", [{"club_id": 1}])
+
+        manifest = Manifest(self.directory)
+        manifest.entries = Manifest(self.directory, path=built_path).entries
+        self.assertEqual(manifest.scan(), [(2024, "clubs"), (2024, "games")])
+        self.assertEqual(manifest.get(2024, "games")["rows"], 2)
+
+        self.assertEqual(
+            incremental_vars(manifest, built_path),
+            {"incremental_seasons": [2024]}
+        )
+        self.assertEqual(incremental_vars(manifest, "missing.json"), {})
+
+    def test_is_frozen(self):
+
+        self.write(2023, "games", [{"game_id": 1}])
+        manifest = Manifest(self.directory)
+        manifest.record(2023, "games")
+        manifest.save()
+
+        manifest = Manifest(self.directory)
+        self.assertTrue(manifest.is_frozen(2023, "games", current_season=2024))
+        self.assertFalse(manifest.is_frozen(2023, "games", current_season=2023))
+        self.assertFalse(manifest.is_frozen(2023, "clubs", current_season=2024))
+
+        # a file that is not the one in the manifest is not frozen
+        self.write(2023, "games", [{"game_id": 1}, {"game_id": 2}])
+        self.assertFalse(manifest.is_frozen(2023, "games", current_season=2024))
+
+        # nor is a file that was scraped again with the same size but a different content
+        self.write(2023, "games", [{"game_id": 1}])
+        manifest.record(2023, "games")
+        size = manifest.get(2023, "games")["bytes"]
+        self.write(2023, "games", [{"game_id": 2}])
+        self.assertEqual(pathlib.Path(self.directory, "2023", "games.json.gz").stat().st_size, size)
+        self.assertFalse(manifest.is_frozen(2023, "games", current_season=2024))
@@ -0,0 +1,122 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.dataset import Dataset
+from transfermarkt_datasets.core.mart import InvalidMart
+from transfermarkt_datasets.core.schema import Schema, Field
+
+class SomeValuationsAsset(Asset):
+    name = "some_valuations"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="player_id", type="integer"),
+                Field(name="season", type="integer"),
+                Field(name="value", type="integer")
+            ]
+        )
+        self.schema.foreign_keys = [
+            {"fields": "player_id", "reference": {"resource": "some_players", "fields": "player_id"}}
+        ]
+
+class SomePlayersAsset(Asset):
+    name = "some_players"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="player_id", type="integer"),
+                Field(name="name", type="string"),
+                Field(name="club_id", type="integer")
+            ],
+            primary_key=["player_id"]
+        )
+        self.schema.foreign_keys = [
+            {"fields": "club_id", "reference": {"resource": "some_clubs", "fields": "club_id"}}
+        ]
+
+class SomeClubsAsset(Asset):
+    name = "some_clubs"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="club_id", type="integer"),
+                Field(name="name", type="string")
+            ],
+            primary_key=["club_id"]
+        )
+
+class TestMart(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        self.dataset = Dataset(
+            base_path=self.tmpdir.name,
+            catalog_path=str(pathlib.Path(self.tmpdir.name) / "catalog.duckdb")
+        )
+        self.dataset.assets = {}
+
+        data = {
+            SomeClubsAsset: {"club_id": [1, 2], "name": ["Arsenal", "Chelsea"]},
+            SomePlayersAsset: {"player_id": [1, 2, 3], "name": ["Saka", "Palmer", "Nobody"], "club_id": [1, 2, 9]},
+            SomeValuationsAsset: {"player_id": [1, 1, 2, 3], "season": [2022, 2023, 2023, 2023], "value": [10, 20, 30, 1]}
+        }
+        for asset_class, columns in data.items():
+            asset = asset_class(base_path=self.tmpdir.name)
+            pathlib.Path(asset.prep_location).mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(data=columns).to_parquet(asset.prep_parquet_path, index=False)
+            self.dataset.assets[asset.name] = asset
+
+    def tearDown(self) -> None:
+        self.dataset.catalog.close()
+        self.tmpdir.cleanup()
+
+    def test_mart(self):
+
+        mart = self.dataset.mart(
+            "some_valuations",
+            joins=["some_players", "some_clubs"],
+            columns={
+                "season": "season",
+                "value": "value",
+                "some_players.name": "player_name",
+                "some_clubs.name": "club_name"
+            },
+            filters=[("season", "=", 2023)]
+        ).sort_values("value")
+
+        # joined assets without filters keep the rows that have no match
+        self.assertEqual(mart["player_name"].tolist(), ["Nobody", "Saka", "Palmer"])
+        self.assertEqual(mart["club_name"].fillna("").tolist(), ["", "Arsenal", "Chelsea"])
+
+        mart = self.dataset.mart(
+            "some_valuations",
+            joins=["some_players"],
+            columns=["value", "some_players.name"],
+            filters=[("some_players.name", "in", ["Saka", "Palmer"]), ("value", ">", 10)]
+        ).sort_values("value")
+        self.assertEqual(mart.to_dict("records"), [{"value": 20, "name": "Saka"}, {"value": 30, "name": "Palmer"}])
+
+        mart = self.dataset.mart("some_valuations", columns=["season"], distinct=True)
+        self.assertEqual(sorted(mart["season"].tolist()), [2022, 2023])
+
+        self.assertTrue(self.dataset.mart("some_players", filters=[("name", "in", [])]).empty)
+
+    def test_invalid_mart(self):
+
+        with self.assertRaises(InvalidMart):
+            self.dataset.mart("some_valuations", columns=["some_players.name"])
+        with self.assertRaises(InvalidMart):
+            self.dataset.mart("some_valuations", joins=["some_clubs"])
+        with self.assertRaises(InvalidMart):
+            self.dataset.mart("some_players", joins=["some_clubs"], columns=["name", "some_clubs.name"])
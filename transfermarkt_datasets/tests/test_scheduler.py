@@ -0,0 +1,117 @@
+import importlib.util
+import unittest
+
+@unittest.skipUnless(importlib.util.find_spec("twisted"), "twisted is not installed")
+class TestScheduler(unittest.TestCase):
+
+    class SomeAsset:
+        def __init__(self, name, parent=None) -> None:
+            self.name = name
+            self.parent = parent
+
+    def setUp(self) -> None:
+        from twisted.internet import defer
+
+        clubs = self.SomeAsset("clubs", self.SomeAsset("competitions"))
+        players = self.SomeAsset("players", clubs)
+        appearances = self.SomeAsset("appearances", players)
+        self.assets = [clubs, players, appearances]
+
+        # crawls are started by the scheduler and completed by the tests
+        self.started = []
+        self.pending = {}
+
+        def crawl(season, asset_obj):
+            d = defer.Deferred()
+            self.started.append((season, asset_obj.name))
+            self.pending[(season, asset_obj.name)] = d
+            return d
+
+        self.crawl = crawl
+
+    def schedule(self, seasons, max_parallel=10, skip=None):
+        from transfermarkt_datasets.core.scheduler import schedule_crawls
+
+        self.result = None
+
+        def done(failed):
+            self.result = failed
+
+        d = schedule_crawls(self.crawl, self.assets, seasons, max_parallel, skip=skip)
+        d.addCallback(done)
+
+    def complete(self, season, asset_name, error=None):
+        d = self.pending.pop((season, asset_name))
+        if error is None:
+            d.callback(None)
+        else:
+            d.errback(error)
+
+    def test_parents_first(self):
+
+        self.schedule([2020, 2021])
+        self.assertEqual(self.started, [(2020, "clubs"), (2021, "clubs")])
+
+        # seasons progress independently of each other
+        self.complete(2021, "clubs")
+        self.assertEqual(self.started[-1], (2021, "players"))
+        self.assertNotIn((2020, "players"), self.started)
+
+        self.complete(2020, "clubs")
+        self.complete(2020, "players")
+        self.assertEqual(self.started[-1], (2020, "appearances"))
+
+        for key in list(self.pending):
+            self.complete(*key)
+        self.complete(2021, "appearances")
+        self.assertEqual(self.result, [])
+
+    def test_max_parallel(self):
+
+        self.assets = self.assets[:1]
+        self.schedule([2018, 2019, 2020, 2021], max_parallel=2)
+        self.assertEqual(len(self.pending), 2)
+
+        self.complete(*self.started[0])
+        self.assertEqual(len(self.pending), 2)
+        self.assertEqual(len(self.started), 3)
+
+        while self.pending:
+            self.complete(*next(iter(self.pending)))
+        self.assertEqual(len(self.started), 4)
+        self.assertEqual(self.result, [])
+
+    def test_failed_parent(self):
+
+        self.schedule([2020])
+        self.complete(2020, "clubs", error=RuntimeError("blocked"))
+
+        # the crawls that depend on a failed crawl are skipped
+        self.assertEqual(self.started, [(2020, "clubs")])
+        self.assertEqual(
+            sorted(self.result),
+            [(2020, "appearances"), (2020, "clubs"), (2020, "players")]
+        )
+
+    def test_skip(self):
+
+        self.schedule([2020], skip=lambda season, asset_obj: asset_obj.name == "clubs")
+        self.assertEqual(self.started, [(2020, "players")])
+
+        self.complete(2020, "players")
+        self.complete(2020, "appearances")
+        self.assertEqual(self.result, [])
+
+    def test_skip_error(self):
+
+        def skip(season, asset_obj):
+            if asset_obj.name == "players":
+                raise OSError("manifest is not readable")
+            return False
+
+        self.schedule([2020], skip=skip)
+        self.complete(2020, "clubs")
+
+        # the run still finishes, with the crawl that could not start and its children as failed
+        self.assertEqual(self.started, [(2020, "clubs")])
+        self.assertEqual(sorted(self.result), [(2020, "appearances"), (2020, "players")])
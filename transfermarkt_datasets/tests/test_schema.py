@@ -37,3 +37,23 @@ class TestSchema(unittest.TestCase):
             schema.get_fields_by_tag("t2"),
             [Field(name="f2", type="t1", tags=["t1"])]
         )
+
+    def test_pandas_dtypes(self):
+
+        schema = Schema(
+            fields=[
+                Field(name="f1", type="integer"),
+                Field(name="f2", type="string"),
+                Field(name="f3", type="string", tags=["categorical"]),
+                Field(name="f4", type="date"),
+            ]
+        )
+
+        self.assertEqual(
+            schema.pandas_dtypes,
+            {"f1": "Int64", "f2": "string", "f3": "category"}
+        )
+        self.assertEqual(
+            schema.date_field_names,
+            ["f4"]
+        )
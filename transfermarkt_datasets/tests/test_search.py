@@ -0,0 +1,82 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset, InvalidPreparedDF
+from transfermarkt_datasets.core.schema import Schema, Field
+from transfermarkt_datasets.core.search import NameIndex, normalize
+
+class SomePlayersAsset(Asset):
+    name = "some_players"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="player_id", type="integer"),
+                Field(name="name", type="string")
+            ],
+            primary_key=["player_id"]
+        )
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.asset = SomePlayersAsset(base_path=self.tmpdir.name)
+        pathlib.Path(self.asset.prep_location).mkdir(parents=True)
+
+        self.df = pd.DataFrame(
+            data={
+                "player_id": [1, 2, 3, 4, 5, 6],
+                "name": ["Kylian Mbappé", "Ethan Mbappé", "Lionel Messi", "Luka Modrić", None, "Mason Mount"]
+            }
+        )
+        self.df.to_parquet(self.asset.prep_parquet_path, index=False)
+
+    def tearDown(self) -> None:
+        self.tmpdir.cleanup()
+
+    def test_normalize(self):
+
+        self.assertEqual(normalize("  Luka  Modrić "), "luka modric")
+        self.assertEqual(normalize("N'Golo Kanté"), "n golo kante")
+
+    def test_search(self):
+
+        matches = self.asset.search("mbappe")
+        self.assertEqual(list(matches.columns), ["player_id", "name", "score"])
+        self.assertEqual(sorted(matches["player_id"].head(2).tolist()), [1, 2])
+
+        # words that start with the query rank first
+        self.assertEqual(sorted(self.asset.search("mo", k=2)["name"].tolist()), ["Luka Modrić", "Mason Mount"])
+        self.assertEqual(self.asset.search("kylian mbape", k=1)["player_id"].tolist(), [1])
+        self.assertEqual(len(self.asset.search("me", k=1)), 1)
+
+        self.assertTrue(self.asset.search("").empty)
+        self.assertTrue(self.asset.search("xyz").empty)
+
+        with self.assertRaises(InvalidPreparedDF):
+            self.asset.search("mbappe", field_name="club")
+
+    def test_index_is_persisted(self):
+
+        index = self.asset.name_index()
+        self.assertEqual(len(index), 5)
+        path = pathlib.Path(self.asset.index_location) / "some_players.name.trigrams.parquet"
+        self.assertTrue(path.exists())
+
+        loaded = NameIndex.load(str(path), self.df["player_id"], self.df["name"])
+        self.assertEqual(
+            loaded.search("messi")["key"].tolist(),
+            index.search("messi")["key"].tolist()
+        )
+
+        # the index is rebuilt when the prepared file changes
+        self.df.head(2).to_parquet(self.asset.prep_parquet_path, index=False)
+        os.utime(self.asset.prep_parquet_path, ns=(0, 0))
+        self.assertTrue(self.asset.search("messi").empty)
+        self.assertEqual(len(self.asset.name_index()), 2)
@@ -0,0 +1,86 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+
+from transfermarkt_datasets.core.asset import Asset
+from transfermarkt_datasets.core.dataset import Dataset
+from transfermarkt_datasets.core.schema import Schema, Field
+from transfermarkt_datasets.core.stats import stats_query, write_stats
+
+class SomeGamesAsset(Asset):
+    name = "some_games"
+    # the prepared files are named after the dbt model, not after the asset
+    file_name = "games.csv.gz"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="date", type="date"),
+                Field(name="competition_id", type="string")
+            ],
+            primary_key=["game_id"]
+        )
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+        self.dataset = Dataset(
+            base_path=self.tmpdir.name,
+            catalog_path=str(pathlib.Path(self.tmpdir.name) / "catalog.duckdb")
+        )
+        self.asset = SomeGamesAsset(base_path=self.tmpdir.name)
+        self.dataset.assets = {self.asset.name: self.asset}
+
+        pathlib.Path(self.asset.prep_location).mkdir(parents=True)
+        pd.DataFrame(
+            data={
+                "game_id": [1, 2, 3, 4],
+                "date": pd.to_datetime(["2021-08-01", "2022-05-01", None, "2020-01-15"]),
+                "competition_id": ["GB1", "GB1", "ES1", None]
+            }
+        ).to_parquet(self.asset.prep_parquet_path, index=False)
+
+    def tearDown(self) -> None:
+        self.dataset.catalog.close()
+        self.tmpdir.cleanup()
+
+    def test_stats(self):
+
+        # without a statistics file, they are computed on the catalog
+        self.assertIsNone(self.asset.stats)
+        computed = self.dataset.get_stats("some_games")
+
+        write_stats(self.dataset.catalog, "some_games")
+        stats = self.asset.stats
+        self.assertIsNotNone(stats)
+        pd.testing.assert_frame_equal(stats, computed, check_dtype=False)
+
+        self.assertEqual(list(stats.index), ["game_id", "date", "competition_id"])
+        self.assertEqual(self.asset.row_count, 4)
+        self.assertEqual(stats["nulls"].tolist(), [0, 1, 1])
+        self.assertEqual(stats["distinct"].tolist(), [4, 3, 2])
+        self.assertEqual((stats.at["date", "min"], stats.at["date", "max"]), ("2020-01-15", "2022-05-01"))
+        self.assertEqual(sorted(stats.at["competition_id", "sample_values"]), ["ES1", "GB1"])
+
+        # the schema sample values come from the statistics, without loading the asset
+        schema = self.asset.schema_as_dataframe()
+        self.assertEqual(sorted(schema.at["competition_id", "sample_values"]), ["ES1", "GB1"])
+        self.assertFalse(self.asset.prep_df_loaded)
+
+    def test_stats_from_dbt_export(self):
+
+        # the dbt export names the statistics file after the model, like the other prepared files
+        relation = self.dataset.catalog.relation("some_games")
+        query = stats_query(relation, self.asset.schema.duckdb_types)
+        path = pathlib.Path(self.asset.prep_location) / "games.stats.json"
+        self.dataset.catalog.execute(f"COPY ({query}) TO '{path}' (FORMAT JSON)")
+
+        self.assertEqual(self.asset.stats_path, str(path))
+        self.assertEqual(self.asset.row_count, 4)
+        self.assertEqual(self.asset.stats.at["date", "max"], "2022-05-01")
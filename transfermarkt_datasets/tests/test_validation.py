@@ -0,0 +1,132 @@
+import pathlib
+import tempfile
+import unittest
+
+import pandas as pd
+import pyarrow as pa
+
+from transfermarkt_datasets.core.asset import Asset, FailedAssetValidation
+from transfermarkt_datasets.core.schema import Schema, Field
+from transfermarkt_datasets.core.validation import validate
+
+class SomeAsset(Asset):
+    name = "some_asset"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.schema = Schema(
+            fields=[
+                Field(name="game_id", type="integer"),
+                Field(name="date", type="date"),
+                Field(name="attendance", type="number"),
+                Field(name="url", type="string", form="uri"),
+                Field(name="competition_id", type="string", tags=["categorical"], required=True)
+            ],
+            primary_key=["game_id"]
+        )
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.schema = SomeAsset().schema
+
+    def failures(self, df):
+        # missing values are sampled as None or NaN depending on the column type
+        return {
+            (failure.check, tuple(failure.fields)): [None if pd.isna(value) else value for value in failure.sample]
+            for failure in validate(df, self.schema).failures
+        }
+
+    def test_valid(self):
+
+        df = pd.DataFrame(
+            data={
+                "game_id": [1, 2, None],
+                "date": ["2022-08-01", "2022-08-02", None],
+                "attendance": [100.5, None, 3],
+                "url": ["https://www.transfermarkt.co.uk/spielbericht/index/spielbericht/1", None, "http://a.b/c"],
+                "competition_id": ["GB1", "GB1", "ES1"]
+            }
+        )
+        # the same data with the schema types, as text (as read from a CSV file) and as an Arrow table
+        for data in [
+            df.iloc[:2],
+            SomeAsset().apply_schema_dtypes(df.iloc[:2]),
+            df.iloc[:2].astype("string"),
+            pa.Table.from_pandas(df.iloc[:2])
+        ]:
+            report = validate(data, self.schema)
+            self.assertTrue(report.valid, str(report))
+
+        # primary key fields are required
+        self.assertEqual(self.failures(df), {("required", ("game_id",)): [None]})
+
+    def test_types_and_formats(self):
+
+        df = pd.DataFrame(
+            data={
+                "game_id": ["1", "2.5", "3", "x"],
+                "date": ["2022-08-01 20:00:00", "2022-02-30", "01/08/2022", "2022-08-01"],
+                "attendance": ["1e3", "100", "many", None],
+                "url": ["https://a.b/c", "www.a.b/c", "https://a.b/c", "not a url"],
+                "competition_id": pd.Categorical(["GB1", None, "ES1", "GB1"])
+            }
+        )
+
+        self.assertEqual(
+            self.failures(df),
+            {
+                ("type", ("game_id",)): ["2.5", "x"],
+                ("type", ("date",)): ["2022-02-30", "01/08/2022"],
+                ("type", ("attendance",)): ["many"],
+                ("format", ("url",)): ["www.a.b/c", "not a url"],
+                ("required", ("competition_id",)): [None]
+            }
+        )
+
+    def test_primary_key(self):
+
+        df = pd.DataFrame(
+            data={
+                "game_id": [1, 2, 1, 3],
+                "date": ["2022-08-01"] * 4,
+                "attendance": [1, 2, 3, 4],
+                "url": ["https://a.b/c"] * 4,
+                "competition_id": ["GB1"] * 4
+            }
+        )
+
+        report = validate(df, self.schema)
+        self.assertEqual(len(report.failures), 1)
+        self.assertEqual(report.failures[0].check, "primary_key")
+        self.assertEqual(report.failures[0].rows, 2)
+
+        self.assertEqual(
+            self.failures(df.drop(columns=["url"])),
+            {
+                ("missing", ("url",)): [],
+                ("primary_key", ("game_id",)): [1, 1]
+            }
+        )
+
+    def test_asset_validate(self):
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            asset = SomeAsset(base_path=tmpdir)
+            pathlib.Path(asset.prep_location).mkdir(parents=True)
+
+            pd.DataFrame(
+                data={
+                    "game_id": [1, 1],
+                    "date": ["2022-08-01", "2022-08-01"],
+                    "attendance": [1, 2],
+                    "url": ["https://a.b/c", "https://a.b/d"],
+                    "competition_id": ["GB1", "GB1"]
+                }
+            ).to_csv(asset.prep_path, index=False)
+
+            with self.assertRaises(FailedAssetValidation):
+                asset.validate()
+
+            report = asset.validate(raise_exception=False)
+            self.assertEqual(report.failures[0].check, "primary_key")